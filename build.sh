@@ -1,6 +1,6 @@
 #!/bin/sh
 
-python manage.py migrate --no-input
+python manage.py migrate --fake-initial --no-input
 python manage.py collectstatic --no-input
 gunicorn core.wsgi --bind 0.0.0.0:8000
 
@@ -108,6 +108,17 @@ if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached to share entries between gunicorn workers
+
+CACHES = {
+    'default': {
+        'BACKEND': config("CACHE_BACKEND", default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config("CACHE_LOCATION", default='swift-api'),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -165,6 +176,133 @@ INFURA = config("INFURA", default=None)
 ETH_API_KEY = config("ETHAPIKEY", default=None)
 BNB_API_KEY = config("BNBAPIKEY", default=None)
 BLOCK_CYPHER = config("BLOCKCYPHER", default=None)
+# Key pools (helper/api_keys.py): comma-separated lists, falling back to the single keys above
+ETH_API_KEYS = config("ETHAPIKEYS", default=ETH_API_KEY or "", cast=Csv())
+BNB_API_KEYS = config("BNBAPIKEYS", default=BNB_API_KEY or "", cast=Csv())
+BLOCK_CYPHER_TOKENS = config("BLOCKCYPHERS", default=BLOCK_CYPHER or "", cast=Csv())
+API_KEY_BENCH_SECONDS = config("API_KEY_BENCH_SECONDS", default=60, cast=int)  # how long a rate-limited key sits out
+# Transaction history paging (get_transaction/ `limit`)
+TRANSACTION_PAGE_LIMIT = config("TRANSACTION_PAGE_LIMIT", default=10, cast=int)
+TRANSACTION_PAGE_MAX_LIMIT = config("TRANSACTION_PAGE_MAX_LIMIT", default=50, cast=int)
+# Transactions per BlockCypher /full page (BlockCypher default 10, at most 50)
+BLOCKCYPHER_TX_LIMIT = config("BLOCKCYPHER_TX_LIMIT", default=10, cast=int)
+# Local transaction store (helper/tx_store.py): history is served from the database and the
+# chain head is re-synced at most once per TX_SYNC_INTERVAL seconds (needs wallet migration 0002)
+TX_STORE_ENABLED = config("TX_STORE_ENABLED", default=False, cast=bool)
+TX_SYNC_INTERVAL = config("TX_SYNC_INTERVAL", default=30, cast=int)
+TX_SYNC_PAGE_SIZE = config("TX_SYNC_PAGE_SIZE", default=50, cast=int)
+TX_SYNC_MAX_PAGES = config("TX_SYNC_MAX_PAGES", default=5, cast=int)
+# Permanent cache of finalized transactions (helper/tx_cache.py): in-process LRU over a SQLite file
+TX_CACHE_MEMORY_SIZE = config("TX_CACHE_MEMORY_SIZE", default=10000, cast=int)
+TX_CACHE_PATH = config("TX_CACHE_PATH", default=str(BASE_DIR / "tx_cache.sqlite3"))
+# Local DOGE UTXO index (helper/utxo_index.py) for addresses this service sends from: balance
+# reads use it once an address has sent, coin selection always (needs wallet migration 0003)
+UTXO_INDEX_ENABLED = config("UTXO_INDEX_ENABLED", default=False, cast=bool)
+UTXO_SYNC_INTERVAL = config("UTXO_SYNC_INTERVAL", default=30, cast=int)
+UTXO_FEE_PER_BYTE = {"doge": 1000}  # Satoshis per byte, only used to size input selection
+
+# Pooled upstream HTTP client (helper/http_client.py)
+HTTP_CONNECT_TIMEOUT = config("HTTP_CONNECT_TIMEOUT", default=5.0, cast=float)
+HTTP_READ_TIMEOUT = config("HTTP_READ_TIMEOUT", default=20.0, cast=float)
+HTTP_POOL_MAXSIZE = config("HTTP_POOL_MAXSIZE", default=10, cast=int)
+# Larger pools for hosts that take batched and concurrent fan-out traffic
+HTTP_POOL_SIZES = {
+    "api.blockcypher.com": 20,
+    "api.mainnet-beta.solana.com": 20,
+    "mainnet.infura.io": 20,
+    "bsc-dataseed.binance.org": 20,
+    "api.trongrid.io": 20,
+}
+# Host-wide token buckets for quota-limited upstreams (helper/rate_limit.py), shared by all workers
+# through a SQLite file: host -> (requests per second, burst) and host -> requests per day
+RATE_LIMIT_PATH = config("RATE_LIMIT_PATH", default=str(BASE_DIR / "rate_limits.sqlite3"))
+RATE_LIMIT_MAX_WAIT = config("RATE_LIMIT_MAX_WAIT", default=10.0, cast=float)  # longest a call queues for a token
+RATE_LIMITS = {
+    "api.etherscan.io": (5, 5),
+    "api.bscscan.com": (5, 5),
+    "api.blockcypher.com": (3, 3),
+    "api.mainnet-beta.solana.com": (10, 10),
+    "api.trongrid.io": (15, 15),
+}
+RATE_LIMITS_DAILY = {
+    "api.etherscan.io": 100000,
+    "api.bscscan.com": 100000,
+    "api.blockcypher.com": 2000,
+}
+# Shared Web3 clients (helper/web3_registry.py) are probed in the background at this interval
+WEB3_HEALTH_INTERVAL = config("WEB3_HEALTH_INTERVAL", default=30.0, cast=float)
+# Upper bound on aggregate3 calldata per eth_call (helper/evm_multicall.py)
+MULTICALL_MAX_CALLDATA = config("MULTICALL_MAX_CALLDATA", default=100000, cast=int)
+# Solana JSON-RPC endpoint (helper/solana_rpc.py)
+SOLANA_RPC_URL = config("SOLANA_RPC_URL", default="https://api.mainnet-beta.solana.com")
+SOLANA_RPC_BATCH_SIZE = config("SOLANA_RPC_BATCH_SIZE", default=50, cast=int)
+SOLANA_RPC_CONCURRENCY = config("SOLANA_RPC_CONCURRENCY", default=5, cast=int)  # when the endpoint rejects batches
+SOLANA_TX_LIMIT = config("SOLANA_TX_LIMIT", default=10, cast=int)
+# TronGrid (helper/tron_client.py)
+TRON_API_URL = config("TRON_API_URL", default="https://api.trongrid.io")
+TRON_API_KEY = config("TRON_API_KEY", default=None)
+TRON_REF_BLOCK_TTL = config("TRON_REF_BLOCK_TTL", default=30, cast=int)
+TRON_READ_CONCURRENCY = config("TRON_READ_CONCURRENCY", default=8, cast=int)
+TRONGRID_TX_LIMIT = config("TRONGRID_TX_LIMIT", default=20, cast=int)
+
+# Balance cache (helper/balance_cache.py): seconds an entry may be served, per symbol
+BALANCE_CACHE_TTLS = {
+    "btc": 60,
+    "doge": 60,
+    "eth": 15,
+    "wdoge": 15,
+    "usdt": 10,
+    "bnb": 10,
+    "sol": 5,
+    "trx": 10,
+}
+# Beyond the TTL a cached balance is still served (and refreshed in the background) up to this age;
+# older entries make the request wait for the upstream
+BALANCE_MAX_STALENESS = {
+    "btc": 600,
+    "doge": 600,
+    "eth": 120,
+    "wdoge": 120,
+    "usdt": 60,
+    "bnb": 60,
+    "sol": 30,
+    "trx": 60,
+}
+# How often each chain head is re-read; an entry cached at an older head is treated as a miss.
+# Chains without an entry (SOL, TRON) rely on the TTL alone
+CHAIN_HEAD_POLL_INTERVALS = {
+    "btc": 30,
+    "doge": 20,
+    "eth": 6,
+    "bnb": 3,
+}
+# CoinGecko price snapshot (helper/coingeko_api.py), served stale-while-revalidate like balances
+PRICE_CACHE_TTL = config("PRICE_CACHE_TTL", default=60, cast=int)
+PRICE_MAX_STALENESS = config("PRICE_MAX_STALENESS", default=600, cast=int)
+
+# Single-flight coalescing of identical upstream lookups (helper/single_flight.py)
+SINGLE_FLIGHT_DIR = config("SINGLE_FLIGHT_DIR", default=None)  # lock/result files, owned by the app user with mode 0o700; unset coalesces per worker only
+SINGLE_FLIGHT_WAIT = config("SINGLE_FLIGHT_WAIT", default=30.0, cast=float)  # longest a worker waits on another worker's call
+SINGLE_FLIGHT_RETENTION = config("SINGLE_FLIGHT_RETENTION", default=60, cast=int)
+
+# Upstream fan-out
+UPSTREAM_MAX_WORKERS = config("UPSTREAM_MAX_WORKERS", default=16, cast=int)
+WALLET_IMPORT_DEADLINE = config("WALLET_IMPORT_DEADLINE", default=6.0, cast=float)
+# Enrichments applied when a wallet import does not pass `include`
+WALLET_IMPORT_DEFAULT_INCLUDE = config("WALLET_IMPORT_DEFAULT_INCLUDE", default="balances,prices,keys", cast=Csv())
+DERIVATION_PROCESSES = config("DERIVATION_PROCESSES", default=2, cast=int)  # per gunicorn worker, so kept small
+WALLET_BATCH_MAX_PHRASES = config("WALLET_BATCH_MAX_PHRASES", default=1000, cast=int)
+WALLET_BATCH_DEADLINE = config("WALLET_BATCH_DEADLINE", default=60.0, cast=float)
+DISCOVERY_GAP_LIMIT = config("DISCOVERY_GAP_LIMIT", default=20, cast=int)
+DISCOVERY_MAX_ACCOUNTS = config("DISCOVERY_MAX_ACCOUNTS", default=5, cast=int)
+# Ceilings on the client-supplied gap_limit and max_accounts of generate_wallet/discover/
+DISCOVERY_GAP_LIMIT_MAX = config("DISCOVERY_GAP_LIMIT_MAX", default=50, cast=int)
+DISCOVERY_ACCOUNT_LIMIT_MAX = config("DISCOVERY_ACCOUNT_LIMIT_MAX", default=10, cast=int)
+WALLET_DISCOVERY_DEADLINE = config("WALLET_DISCOVERY_DEADLINE", default=20.0, cast=float)
+PORTFOLIO_MAX_ITEMS = config("PORTFOLIO_MAX_ITEMS", default=200, cast=int)
+PORTFOLIO_DEADLINE = config("PORTFOLIO_DEADLINE", default=10.0, cast=float)
+ACTIVITY_MAX_ITEMS = config("ACTIVITY_MAX_ITEMS", default=20, cast=int)
+ACTIVITY_DEADLINE = config("ACTIVITY_DEADLINE", default=15.0, cast=float)
 # AUTHTOKEN=config("AUTHTOKEN")
 
 HASHKEY= bytes(config("HASHKEY"), 'utf-8')
@@ -181,6 +319,7 @@ TRANSAK_SANDBOX = True  # Set to False for production
 MOONPAY_API_KEY = config("MOONPAYKEY", default=None)
 MOONPAY_SANDBOX = True  # Set to False for production
 LIFI_API_KEY = config("LIFIKEY", default=None)
+LIFI_API_KEYS = config("LIFIKEYS", default=LIFI_API_KEY or "", cast=Csv())
 
 NINJA_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
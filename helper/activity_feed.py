@@ -0,0 +1,104 @@
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
+from django.conf import settings
+from helper.concurrency import run_with_deadline
+from helper.pagination import TransactionPage, decode_cursor, encode_cursor, page_limit
+from helper.tx_store import get_history_page, to_epoch_seconds
+from helper.tx_record import ActivityRecord
+from home.wallet_schema import PortfolioItem
+
+# One newest-first feed over many (symbol, address) histories. Every chain's first page is fetched
+# concurrently; after that heapq.merge pulls rows lazily, so a chain's next page is only fetched
+# once the merge has consumed everything before it. The feed cursor stores, per chain, the native
+# cursor of the page holding its next unread row and how many rows of that page were already read.
+
+FEED_CURSOR = "feed"
+
+class _ChainStream:
+    def __init__(self, item: PortfolioItem, limit: int, page_cursor: Optional[str], skip: int):
+        self.item = item
+        self.limit = limit
+        self.page_cursor = page_cursor
+        self.skip = skip
+        self.first_page: Optional[TransactionPage] = None
+        self.exhausted = False
+
+    @property
+    def key(self) -> str:
+        return stream_key(self.item)
+
+    def fetch(self, cursor: Optional[str]) -> TransactionPage:
+        return get_history_page(self.item.symbol, self.item.address, self.limit, cursor)
+
+    def rows(self) -> Iterator[Tuple[int, "_ChainStream", Optional[str], int, TransactionPage]]:
+        """(timestamp, stream, page cursor, index in page, page) for every unread row, newest first."""
+        page_cursor, page, skip = self.page_cursor, self.first_page, self.skip
+        while True:
+            if page is None:
+                try:
+                    page = self.fetch(page_cursor)
+                except Exception as e:
+                    print(f"Activity feed stopped reading {self.key}: {e}")
+                    return
+            for index in range(skip, len(page)):
+                yield to_epoch_seconds(page[index].timestamp) or 0, self, page_cursor, index, page
+            if page.next_cursor is None:
+                self.exhausted = True
+                return
+            page_cursor, page, skip = page.next_cursor, None, 0
+
+def stream_key(item: PortfolioItem) -> str:
+    return f"{item.symbol.value}:{item.address}"
+
+def _resume_position(stream: _ChainStream, last_read) -> Optional[List]:
+    """Where `stream` continues on the next feed page, or None once it has nothing left."""
+    if last_read is None:
+        return None if stream.exhausted else [stream.page_cursor, stream.skip]
+    _, _, page_cursor, index, page = last_read
+    if index + 1 < len(page):
+        return [page_cursor, index + 1]
+    return [page.next_cursor, 0] if page.next_cursor is not None else None
+
+def get_activity_feed(items: List[PortfolioItem], limit: Optional[int] = None, cursor: Optional[str] = None) -> TransactionPage:
+    """A page of the merged history of every (symbol, address) in `items`, newest first."""
+    if len(items) > settings.ACTIVITY_MAX_ITEMS:
+        raise ValueError(f"At most {settings.ACTIVITY_MAX_ITEMS} items can be combined in one feed")
+    limit = page_limit(limit)
+    items = list({stream_key(item): item for item in items}.values())
+    positions: Dict[str, List] = decode_cursor(FEED_CURSOR, cursor) or {}
+    if cursor and not set(positions) <= {stream_key(item) for item in items}:
+        raise ValueError("Cursor does not belong to these items")
+
+    # A stream missing from a cursor was exhausted on an earlier page
+    streams = [
+        _ChainStream(item, limit, *positions.get(stream_key(item), [None, 0]))
+        for item in items
+        if not cursor or stream_key(item) in positions
+    ]
+    outcomes = run_with_deadline({stream.key: (lambda stream=stream: stream.fetch(stream.page_cursor)) for stream in streams}, timeout=settings.ACTIVITY_DEADLINE)
+    ready = []
+    for stream in streams:
+        outcome = outcomes[stream.key]
+        if outcome.ok:
+            stream.first_page = outcome.value
+            ready.append(stream)
+        else:
+            # Left at its position so the next feed page retries it
+            print(f"Activity feed skipped {stream.key}: {outcome.error}")
+    if streams and not ready:
+        raise Exception("No transaction history could be fetched for these items")
+
+    merged = heapq.merge(*(stream.rows() for stream in ready), key=lambda row: row[0], reverse=True)
+    entries: List[ActivityRecord] = []
+    last_read: Dict[str, Tuple] = {}
+    for row in merged:
+        _, stream, _, index, page = row
+        entries.append(ActivityRecord(page[index], stream.item.symbol, stream.item.address))
+        last_read[stream.key] = row
+        if len(entries) == limit:
+            break
+
+    next_positions = {stream.key: _resume_position(stream, last_read.get(stream.key)) for stream in ready}
+    next_positions.update({stream.key: [stream.page_cursor, stream.skip] for stream in streams if stream not in ready})
+    next_positions = {key: position for key, position in next_positions.items() if position is not None}
+    return TransactionPage(entries, next_cursor=encode_cursor(FEED_CURSOR, next_positions) if next_positions else None)
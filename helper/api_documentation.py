@@ -22,6 +22,11 @@ Generates wallet addresses for the following cryptocurrencies based on the provi
 
 This endpoint ensures deterministic wallet generation for seamless integration with external platforms.
 
+Optional fields:
+- "chains": only derive the listed symbols, e.g. ["btc", "eth"]
+- "include": enrichments to add, any of "balances", "prices", "keys".
+  Pass an empty list to get addresses only, with no network calls.
+
 Usage Example:
 {
   "wallets": {
@@ -55,6 +60,9 @@ fourth_description = """
 Fetches the transaction history for the provided wallet address and cryptocurrency symbol.
 Each transaction includes an identifier to distinguish between received and sent transactions.
 
+Results are paged, newest first. `limit` sets the page size (default 10, at most 50). To get the next
+page, pass the response's `next_cursor` back as `cursor`. `next_cursor` is null on the last page.
+
 Transaction DTO Example:
 {
   "data": [
@@ -67,7 +75,8 @@ Transaction DTO Example:
   ],
   "status_code": 200,
   "success": true,
-  "message": "string"
+  "message": "string",
+  "next_cursor": "string"
 }
 """
 
@@ -0,0 +1,59 @@
+import random
+import sqlite3
+from typing import Optional
+from django.conf import settings
+from helper import rate_limit
+
+# Pools of API keys per provider. Each call takes the key with the most quota left in the shared
+# rate-limit buckets; a key that gets a rate-limit error is benched for API_KEY_BENCH_SECONDS on
+# every worker, and the call is retried once with another key.
+
+# provider -> (settings name of its key list, API host the keys are used against)
+PROVIDERS = {
+    "etherscan": ("ETH_API_KEYS", "api.etherscan.io"),
+    "bscscan": ("BNB_API_KEYS", "api.bscscan.com"),
+    "blockcypher": ("BLOCK_CYPHER_TOKENS", "api.blockcypher.com"),
+    "lifi": ("LIFI_API_KEYS", "li.quest"),
+}
+PROVIDER_BY_HOST = {host: provider for provider, (_, host) in PROVIDERS.items()}
+
+def _keys(provider: str):
+    return [key for key in getattr(settings, PROVIDERS[provider][0]) if key]
+
+def get_api_key(provider: str, exclude: Optional[str] = None) -> Optional[str]:
+    """
+    The key to use for the next `provider` call: the one with the most quota left among those not
+    benched. When every key is benched the pool is used as a whole rather than failing outright.
+    """
+    keys = [key for key in _keys(provider) if key != exclude]
+    if len(keys) <= 1:
+        return keys[0] if keys else None
+    host = PROVIDERS[provider][1]
+    try:
+        benched = rate_limit.benched(host)
+        usable = [key for key in keys if rate_limit.key_id(key) not in benched] or keys
+        # Random tie-break so idle keys share the load instead of the first one taking it all
+        return max(usable, key=lambda key: (rate_limit.remaining(host, key), random.random()))
+    except sqlite3.Error as e:
+        print(f"API key pool unavailable for {provider}: {e}")
+        return random.choice(keys)
+
+def is_rate_limited(response) -> bool:
+    # Etherscan-style APIs answer 200 with "Max rate limit reached" in a short error body
+    return response.status_code == 429 or (len(response.content) < 512 and b"rate limit" in response.content.lower())
+
+def replacement_key(host: str, key: str) -> Optional[str]:
+    """Bench a rate-limited key and return another usable key of the same pool, if there is one."""
+    provider = PROVIDER_BY_HOST.get(host)
+    if provider is None or key not in _keys(provider):
+        return None
+    try:
+        rate_limit.bench(host, key, settings.API_KEY_BENCH_SECONDS)
+        benched = rate_limit.benched(host)
+    except sqlite3.Error as e:
+        print(f"API key pool unavailable for {provider}: {e}")
+        return None
+    print(f"{provider} key {rate_limit.key_id(key)} hit its rate limit; benched for {settings.API_KEY_BENCH_SECONDS}s")
+    if all(rate_limit.key_id(other) in benched for other in _keys(provider) if other != key):
+        return None
+    return get_api_key(provider, exclude=key)
@@ -0,0 +1,93 @@
+from functools import partial, wraps
+from typing import Callable, Optional
+from django.conf import settings
+from django.core.cache import cache
+from helper import http_client
+from helper.swr_cache import CachedValue, get_or_refresh, invalidate
+from helper.web3_registry import get_web3
+from home.wallet_schema import Symbols
+
+# Balance cache keyed by (symbol, address). An entry is fresh until its per-symbol TTL
+# runs out or the chain head moves past the height it was fetched at, whichever comes first.
+
+# Chain whose head height invalidates each symbol's cached balances
+HEAD_CHAINS = {
+    Symbols.BTC: "btc",
+    Symbols.DODGE: "doge",
+    Symbols.ETH: "eth",
+    Symbols.WDODGE: "eth",
+    Symbols.BNB: "bnb",
+    Symbols.USDT: "bnb",
+}
+
+EVM_SYMBOLS = {Symbols.ETH, Symbols.WDODGE, Symbols.BNB, Symbols.USDT}
+
+# Token sends also spend the chain's native coin on fees
+FEE_SYMBOLS = {
+    Symbols.USDT: Symbols.BNB,
+    Symbols.WDODGE: Symbols.ETH,
+}
+
+def _blockcypher_height(coin: str) -> int:
+    return http_client.get(f"https://api.blockcypher.com/v1/{coin}/main").json()["height"]
+
+HEAD_READERS = {
+    "btc": lambda: _blockcypher_height("btc"),
+    "doge": lambda: _blockcypher_height("doge"),
+    "eth": lambda: get_web3("ETH").eth.block_number,
+    "bnb": lambda: get_web3("BNB").eth.block_number,
+}
+
+def get_chain_head(chain: str) -> Optional[int]:
+    """Latest known head height of `chain`, re-read at most once per CHAIN_HEAD_POLL_INTERVALS[chain]."""
+    if chain not in settings.CHAIN_HEAD_POLL_INTERVALS:
+        return None
+    key = f"chain_head:{chain}"
+    height = cache.get(key)
+    if height is None:
+        try:
+            height = HEAD_READERS[chain]()
+        except Exception as e:
+            print(f"Chain head lookup failed for {chain}: {e}")
+            return None
+        cache.set(key, height, settings.CHAIN_HEAD_POLL_INTERVALS[chain])
+    return height
+
+def _head_for(symbol: Symbols) -> Optional[int]:
+    chain = HEAD_CHAINS.get(symbol)
+    return get_chain_head(chain) if chain else None
+
+def balance_key(symbol: Symbols, address: str) -> str:
+    # EVM addresses are case-insensitive; checksummed and lowercase forms share an entry
+    return f"balance:{symbol.value}:{address.lower() if symbol in EVM_SYMBOLS else address}"
+
+def cached_balance(symbol: Symbols, fetch: Optional[Callable[[str], float]]) -> Optional[Callable[[str], CachedValue]]:
+    """
+    Wrap a single-address balance handler with the cache; the wrapper keeps the handler's name and
+    returns a CachedValue so the response can report the balance's age. Stale entries within
+    BALANCE_MAX_STALENESS are served at once and refreshed in the background.
+    """
+    if fetch is None:
+        return None
+
+    @wraps(fetch)
+    def wrapper(address: str) -> CachedValue:
+        return get_or_refresh(
+            balance_key(symbol, address),
+            partial(fetch, address),
+            ttl=settings.BALANCE_CACHE_TTLS.get(symbol.value, 10),
+            max_staleness=settings.BALANCE_MAX_STALENESS.get(symbol.value, 0),
+            version=_head_for(symbol),
+        )
+    return wrapper
+
+def evict_after_send(symbol: Symbols, from_address: str, to_address: str):
+    """
+    Invalidate the cached balances a successful send has just changed, including the sender's fee
+    balance. Refreshes that started before the send cannot bring the old balance back.
+    """
+    keys = [balance_key(symbol, from_address), balance_key(symbol, to_address)]
+    if symbol in FEE_SYMBOLS:
+        keys.append(balance_key(FEE_SYMBOLS[symbol], from_address))
+    for key in keys:
+        invalidate(key)
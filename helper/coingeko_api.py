@@ -1,7 +1,9 @@
 from coingecko import CoinGecko
+from django.conf import settings
+from helper.swr_cache import get_or_refresh
 
 cg = CoinGecko()
-def get_coins_value():
+def fetch_coins_value():
   val = cg.get_simple_price(ids=["bitcoin",
         "ethereum",
         "tether",
@@ -12,6 +14,9 @@ def get_coins_value():
   # item = cg.get_coin_ohlc(id='bitcoin', days=7, vs_currency='usd')
   return val
 
+def get_coins_value():
+  return get_or_refresh("coin_prices", fetch_coins_value, ttl=settings.PRICE_CACHE_TTL, max_staleness=settings.PRICE_MAX_STALENESS).value
+
 def get_market_data_days(id:str, days:int, vs_currency:str):
   val = cg.get_coin_ohlc(id=id, days=days, vs_currency=vs_currency)
   return val
\ No newline at end of file
@@ -0,0 +1,80 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+# Process-wide, bounded pool for upstream I/O fan-out
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Process pool for CPU-bound work such as key derivation. Workers come from a forkserver rather than
+# fork(): gunicorn workers already run executor and health-check threads, which fork would copy mid-flight.
+# Tasks must be importable without the Django app registry (see helper.derivation.derive_keys).
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+class TaskOutcome(NamedTuple):
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared upstream executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.UPSTREAM_MAX_WORKERS,
+                    thread_name_prefix="upstream",
+                )
+    return _executor
+
+def _closing_connections(task: Callable, *args) -> Any:
+    # Executor threads outlive requests, so Django's request hooks never recycle their connections:
+    # drop unusable ones before the task and close whatever it opened afterwards
+    close_old_connections()
+    try:
+        return task(*args)
+    finally:
+        connections.close_all()
+
+def submit(task: Callable, *args) -> Future:
+    """Run `task(*args)` on the shared upstream executor; database connections it opens are closed when it ends."""
+    return get_executor().submit(_closing_connections, task, *args)
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared CPU-bound process pool, creating it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=settings.DERIVATION_PROCESSES,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+    return _process_pool
+
+def run_with_deadline(tasks: Dict[Hashable, Callable[[], Any]], timeout: float) -> Dict[Hashable, TaskOutcome]:
+    """
+    Run every task concurrently and wait at most `timeout` seconds overall.
+    Tasks that fail or miss the deadline come back with ok=False instead of raising.
+    """
+    futures = {key: submit(task) for key, task in tasks.items()}
+    done, _ = wait(futures.values(), timeout=timeout)
+
+    outcomes: Dict[Hashable, TaskOutcome] = {}
+    for key, future in futures.items():
+        if future not in done:
+            future.cancel()
+            outcomes[key] = TaskOutcome(ok=False, error="deadline exceeded")
+            continue
+        try:
+            outcomes[key] = TaskOutcome(ok=True, value=future.result())
+        except Exception as ex:
+            outcomes[key] = TaskOutcome(ok=False, error=str(ex))
+    return outcomes
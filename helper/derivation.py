@@ -0,0 +1,129 @@
+from functools import cached_property
+from typing import Any, Dict, List, Tuple
+from bip_utils import (
+    Bip32Slip10Ed25519, Bip32Utils, Bip39SeedGenerator,
+    Bip44, Bip44Changes, Bip44Coins, Bip44ConfGetter
+)
+from bitcoinlib.keys import HDKey
+from home.wallet_schema import Symbols
+
+# BIP44 coin used to derive each supported symbol. Tokens share their host chain's key.
+SYMBOL_COINS = {
+    Symbols.ETH: Bip44Coins.ETHEREUM,
+    Symbols.USDT: Bip44Coins.ETHEREUM,
+    Symbols.WDODGE: Bip44Coins.ETHEREUM,
+    Symbols.BNB: Bip44Coins.BINANCE_SMART_CHAIN,
+    Symbols.SOL: Bip44Coins.SOLANA,
+    Symbols.DODGE: Bip44Coins.DOGECOIN,
+    Symbols.TRON: Bip44Coins.TRON,
+}
+
+BTC_ACCOUNT_PATH = "m/84'/0'/0'"
+
+class DerivationContext:
+    """
+    Derives wallets for one mnemonic. The BIP39 seed, the master node of each curve and
+    every hardened purpose/coin/account node are computed once and shared between chains,
+    so ETH, BNB, USDT and WDOGE all reuse the same m/44'/60'/0' node.
+    Nothing is derived until a chain is asked for.
+    """
+
+    def __init__(self, seed_phrase: str):
+        self.seed_bytes = Bip39SeedGenerator(seed_phrase).Generate()
+        self._masters: Dict[type, Any] = {}
+        self._purposes: Dict[type, Any] = {}
+        self._accounts: Dict[Tuple[type, int, int], Any] = {}
+        self._external_chains: Dict[Tuple[Any, int], Bip44] = {}
+        self._btc_external_chains: Dict[int, HDKey] = {}
+
+    def _master(self, bip32_class: type):
+        if bip32_class not in self._masters:
+            self._masters[bip32_class] = bip32_class.FromSeed(self.seed_bytes)
+        return self._masters[bip32_class]
+
+    def _purpose(self, bip32_class: type):
+        if bip32_class not in self._purposes:
+            self._purposes[bip32_class] = self._master(bip32_class).ChildKey(Bip32Utils.HardenIndex(44))
+        return self._purposes[bip32_class]
+
+    def account(self, coin: Bip44Coins, account_index: int = 0) -> Bip44:
+        """Return the m/44'/coin'/account' node for `coin`, wrapped with the coin's BIP44 config."""
+        conf = Bip44ConfGetter.GetConfig(coin)
+        bip32_class = conf.Bip32Class()
+        cache_key = (bip32_class, conf.CoinIndex(), account_index)
+        if cache_key not in self._accounts:
+            self._accounts[cache_key] = (
+                self._purpose(bip32_class)
+                .ChildKey(Bip32Utils.HardenIndex(conf.CoinIndex()))
+                .ChildKey(Bip32Utils.HardenIndex(account_index))
+            )
+        return Bip44(self._accounts[cache_key], conf)
+
+    def wallet(self, coin: Bip44Coins, account_index: int = 0, address_index: int = 0) -> Bip44:
+        """Return the external-chain address node, equivalent to DeriveDefaultPath() for index 0."""
+        account = self.account(coin, account_index)
+        # Ed25519 coins such as Solana stop at the (hardened) account level
+        if Bip44ConfGetter.GetConfig(coin).Bip32Class() is Bip32Slip10Ed25519:
+            return account
+        return account.Change(Bip44Changes.CHAIN_EXT).AddressIndex(address_index)
+
+    @cached_property
+    def btc_root(self) -> HDKey:
+        return HDKey.from_seed(self.seed_bytes)
+
+    @cached_property
+    def btc_account(self) -> HDKey:
+        return self.btc_root.subkey_for_path(BTC_ACCOUNT_PATH)
+
+    def btc_wallet(self, address_index: int = 0) -> HDKey:
+        return self.btc_account.subkey_for_path(f"0/{address_index}")
+
+    def _btc_external_chain(self, account_index: int) -> HDKey:
+        if account_index not in self._btc_external_chains:
+            account = self.btc_account if account_index == 0 else self.btc_root.subkey_for_path(f"m/84'/0'/{account_index}'")
+            self._btc_external_chains[account_index] = account.child_private(0)
+        return self._btc_external_chains[account_index]
+
+    def _external_chain(self, coin: Bip44Coins, account_index: int) -> Bip44:
+        if (coin, account_index) not in self._external_chains:
+            self._external_chains[(coin, account_index)] = self.account(coin, account_index).Change(Bip44Changes.CHAIN_EXT)
+        return self._external_chains[(coin, account_index)]
+
+    def is_account_only(self, symbol: Symbols) -> bool:
+        """Ed25519 chains such as Solana have one address per (hardened) account and no address index."""
+        return symbol in SYMBOL_COINS and Bip44ConfGetter.GetConfig(SYMBOL_COINS[symbol]).Bip32Class() is Bip32Slip10Ed25519
+
+    def address_window(self, symbol: Symbols, account_index: int, start: int, count: int) -> List[str]:
+        """
+        Derive `count` consecutive external addresses from `start`, reusing the cached account and
+        change nodes so each address costs a single non-hardened child derivation.
+        For account-only chains the window runs over account indexes instead.
+        """
+        indexes = range(start, start + count)
+        if symbol == Symbols.BTC:
+            chain = self._btc_external_chain(account_index)
+            return [chain.child_private(index).address() for index in indexes]
+        coin = SYMBOL_COINS[symbol]
+        if self.is_account_only(symbol):
+            return [self.account(coin, index).PublicKey().ToAddress() for index in indexes]
+        chain = self._external_chain(coin, account_index)
+        return [chain.AddressIndex(index).PublicKey().ToAddress() for index in indexes]
+
+    def keys(self, symbol: Symbols) -> Tuple[str, str]:
+        """Return the (address, private key hex) pair for `symbol` at the default path."""
+        if symbol == Symbols.BTC:
+            btc_wallet = self.btc_wallet()
+            return btc_wallet.address(), btc_wallet.private_hex
+        if symbol not in SYMBOL_COINS:
+            raise ValueError(f"Unsupported symbol: {symbol}")
+        wallet = self.wallet(SYMBOL_COINS[symbol])
+        return wallet.PublicKey().ToAddress(), wallet.PrivateKey().Raw().ToHex()
+
+def derive_keys(seed_phrase: str, symbols: List[Symbols]) -> Dict[Symbols, Tuple[str, str]]:
+    """
+    Derive (address, private key) for each of `symbols`. Runs on the forkserver process pool, so this
+    module imports nothing that needs the Django app registry.
+    """
+    # Seed, master and shared account nodes are derived once per import
+    ctx = DerivationContext(seed_phrase)
+    return {symbol: ctx.keys(symbol) for symbol in symbols}
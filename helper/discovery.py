@@ -0,0 +1,68 @@
+from functools import partial
+from typing import Iterable, List, Optional
+from django.conf import settings
+from helper.concurrency import run_with_deadline
+from helper.derivation import DerivationContext
+from helper.generate_wallet import WALLET_SPECS
+from helper.wallet_balance import get_address_activity
+from home.wallet_schema import ChainDiscoveryResult, DiscoveredAddress, Symbols
+
+# BIP44 account discovery: scan external addresses window by window until `gap_limit`
+# consecutive addresses are unused, and stop at the first account with no activity.
+
+def _scan_account(ctx: DerivationContext, symbol: Symbols, account_index: int, gap_limit: int) -> List[DiscoveredAddress]:
+    found: List[DiscoveredAddress] = []
+    start, last_used = 0, -1
+    while start - (last_used + 1) < gap_limit:
+        window = ctx.address_window(symbol, account_index, start, gap_limit)
+        activity = get_address_activity(symbol, window)
+        for offset, address in enumerate(window):
+            balance, used = activity.get(address, (0, False))
+            if used:
+                index = start + offset
+                last_used = index
+                account = index if ctx.is_account_only(symbol) else account_index
+                found.append(DiscoveredAddress(symbol=symbol, account=account, index=0 if ctx.is_account_only(symbol) else index, address=address, balance=round(balance, 6)))
+        start += gap_limit
+    return found
+
+def discover_chain(ctx: DerivationContext, symbol: Symbols, gap_limit: int, max_accounts: int) -> List[DiscoveredAddress]:
+    """Discover every used address of one chain, one batched activity lookup per address window."""
+    # Account-only chains walk the account axis itself as the address window
+    if ctx.is_account_only(symbol):
+        return _scan_account(ctx, symbol, 0, gap_limit)
+
+    found: List[DiscoveredAddress] = []
+    for account_index in range(max_accounts):
+        account_found = _scan_account(ctx, symbol, account_index, gap_limit)
+        if not account_found:
+            break
+        found.extend(account_found)
+    return found
+
+def _bounded(name: str, value: Optional[int], default: int, ceiling: int) -> int:
+    # Every address in a window costs an upstream lookup, so client values are capped
+    if value is None:
+        return default
+    if value < 1:
+        raise ValueError(f"{name} must be at least 1")
+    return min(value, ceiling)
+
+def discover_wallets_from_seed(seed_phrase, chains: Optional[Iterable[Symbols]] = None, gap_limit: Optional[int] = None, max_accounts: Optional[int] = None) -> List[ChainDiscoveryResult]:
+    gap_limit = _bounded("gap_limit", gap_limit, settings.DISCOVERY_GAP_LIMIT, settings.DISCOVERY_GAP_LIMIT_MAX)
+    max_accounts = _bounded("max_accounts", max_accounts, settings.DISCOVERY_MAX_ACCOUNTS, settings.DISCOVERY_ACCOUNT_LIMIT_MAX)
+    ctx = DerivationContext(seed_phrase)
+    requested = [symbol for symbol in WALLET_SPECS if chains is None or symbol in chains]
+
+    # Derive the shared account nodes up front so concurrent chains only read the caches
+    for symbol in requested:
+        ctx.address_window(symbol, 0, 0, 1)
+
+    outcomes = run_with_deadline(
+        {symbol: partial(discover_chain, ctx, symbol, gap_limit, max_accounts) for symbol in requested},
+        timeout=settings.WALLET_DISCOVERY_DEADLINE,
+    )
+    return [
+        ChainDiscoveryResult(symbol=symbol, addresses=outcomes[symbol].value or [], success=outcomes[symbol].ok, error=outcomes[symbol].error)
+        for symbol in requested
+    ]
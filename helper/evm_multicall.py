@@ -0,0 +1,113 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from web3 import Web3
+from django.conf import settings
+from helper.web3_registry import get_contract, get_web3
+
+# Batched EVM balance reads through Multicall3 (same address on Ethereum, BSC and most EVM chains).
+# Native balances use Multicall3.getEthBalance, token balances use ERC-20 balanceOf; every call
+# is packed into aggregate3 with allowFailure so one bad pair does not fail the whole batch.
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+GET_ETH_BALANCE_SELECTOR = "4d2301cc"
+BALANCE_OF_SELECTOR = "70a08231"
+
+# ABI-encoded size of one aggregate3 entry with a single-address argument:
+# tuple offset, target, allowFailure, bytes offset, bytes length and 36 bytes of calldata padded to 64
+CALL_ENCODED_SIZE = 32 * 5 + 64
+
+NONCE_BATCH_SIZE = 100  # eth_getTransactionCount calls per JSON-RPC batch
+
+class BalanceCall(NamedTuple):
+    owner: str
+    token: Optional[str] = None  # None for the chain's native coin
+
+def _encode(call: BalanceCall) -> Dict:
+    owner = Web3.to_checksum_address(call.owner)
+    selector = BALANCE_OF_SELECTOR if call.token else GET_ETH_BALANCE_SELECTOR
+    return {
+        "target": Web3.to_checksum_address(call.token or MULTICALL3_ADDRESS),
+        "allowFailure": True,
+        "callData": bytes.fromhex(selector + owner[2:].lower().rjust(64, "0")),
+    }
+
+def _chunk_by_calldata(calls: List[BalanceCall]) -> Iterable[List[BalanceCall]]:
+    per_chunk = max(1, settings.MULTICALL_MAX_CALLDATA // CALL_ENCODED_SIZE)
+    for start in range(0, len(calls), per_chunk):
+        yield calls[start:start + per_chunk]
+
+def get_evm_balances(chain: str, calls: Iterable[BalanceCall]) -> Dict[BalanceCall, int]:
+    """
+    Resolve raw (smallest unit) balances for many (owner, token) pairs on one chain,
+    one aggregate3 eth_call per calldata-sized chunk. Pairs that failed are left out.
+    """
+    valid: List[BalanceCall] = []
+    for call in dict.fromkeys(calls):
+        if Web3.is_address(call.owner) and (call.token is None or Web3.is_address(call.token)):
+            valid.append(call)
+        else:
+            print(f"Skipping invalid EVM balance call: {call}")
+
+    multicall = get_contract(chain, MULTICALL3_ADDRESS, MULTICALL3_ABI)
+    balances: Dict[BalanceCall, int] = {}
+    for chunk in _chunk_by_calldata(valid):
+        try:
+            results = multicall.functions.aggregate3([_encode(call) for call in chunk]).call()
+        except Exception as e:
+            print(f"Multicall error on {chain}: {e}")
+            continue
+        for call, (success, return_data) in zip(chunk, results):
+            if success and len(return_data) >= 32:
+                balances[call] = int.from_bytes(return_data[:32], "big")
+    return balances
+
+def get_transaction_counts(chain: str, owners: Iterable[str]) -> Dict[str, int]:
+    """
+    Nonces (transactions sent) for many addresses on one chain, as JSON-RPC batches of
+    eth_getTransactionCount; the EVM exposes no nonce to contracts, so Multicall3 cannot read them.
+    Addresses in a batch that failed are left out.
+    """
+    valid = [owner for owner in dict.fromkeys(owners) if Web3.is_address(owner)]
+    web3 = get_web3(chain)
+    counts: Dict[str, int] = {}
+    for start in range(0, len(valid), NONCE_BATCH_SIZE):
+        chunk = valid[start:start + NONCE_BATCH_SIZE]
+        try:
+            with web3.batch_requests() as batch:
+                for owner in chunk:
+                    batch.add(web3.eth.get_transaction_count(Web3.to_checksum_address(owner)))
+                results = batch.execute()
+        except Exception as e:
+            print(f"Transaction count batch error on {chain}: {e}")
+            continue
+        counts.update(zip(chunk, (int(count) for count in results)))
+    return counts
@@ -1,120 +1,153 @@
-from typing import List
-from bip_utils import (
-   Bip39SeedGenerator, Bip44,
-    Bip44Coins
-)
-from bitcoinlib.keys import HDKey
+from functools import partial
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 from mnemonic import Mnemonic
 from django.conf import settings
 from helper.coingeko_api import get_coins_value
-from helper.wallet_balance import get_bnb_balance_and_history, get_btc_balance_and_history, get_dodge_balance, get_wdodge_balance, get_eth_balance_and_history, get_sol_balance_and_history, get_tron_balance, get_usdt_balance
-from home.wallet_schema import Symbols, WalletInfoResponse
+from helper.concurrency import TaskOutcome, get_process_pool, run_with_deadline
+from helper.derivation import derive_keys
+from helper.wallet_balance import get_bnb_balance_and_history, get_btc_balance_and_history, get_dodge_balance, get_wdodge_balance, get_eth_balance_and_history, get_sol_balance_and_history, get_usdt_balance, balance_lookup_tasks, unpack_balance_outcomes
+from home.wallet_schema import BatchWalletResult, Symbols, WalletEnrichment, WalletInfoResponse
+
+class WalletSpec(NamedTuple):
+    name: str
+    icon: str
+    id_name: str
+    coin_id: str
+    balance: Callable[[str], float]
+
+# Chains returned by a wallet import, in response order
+WALLET_SPECS = {
+    Symbols.BTC: WalletSpec("Bitcoin", "btc_icon.svg", "bitcoin", "bitcoin", get_btc_balance_and_history),
+    Symbols.ETH: WalletSpec("Ethereum", "eth_icon.svg", "ethereum", "ethereum", get_eth_balance_and_history),
+    Symbols.USDT: WalletSpec("USDT BEP20", "usdt_icon.svg", "tether", "tether", get_usdt_balance),
+    Symbols.SOL: WalletSpec("Solana", "sol_icon.svg", "solana", "solana", get_sol_balance_and_history),
+    Symbols.DODGE: WalletSpec("Dogecoin (NATIVE)", "doge_icon.svg", "dogecoin", "dogecoin", get_dodge_balance),
+    # Using same price as native DOGE
+    Symbols.WDODGE: WalletSpec("Wrapped Dogecoin", "doge_icon.svg", "wrapped dogecoin", "dogecoin", get_wdodge_balance),
+    Symbols.BNB: WalletSpec("BNB BEP20", "bnb_iicon.svg", "binancecoin", "binancecoin", get_bnb_balance_and_history),
+}
 
 def generate_mnemonic():
     mnemo = Mnemonic("english")
     return mnemo.generate(strength=128)
 
-def generate_wallets_from_seed(seed_phrase)-> List[WalletInfoResponse]:
-    # Generate seed from mnemonic
-    seed_bytes = Bip39SeedGenerator(seed_phrase).Generate()
+def _resolve_include(include: Optional[Iterable[WalletEnrichment]]) -> Set[WalletEnrichment]:
+    if include is None:
+        return {WalletEnrichment(item) for item in settings.WALLET_IMPORT_DEFAULT_INCLUDE}
+    return set(include)
+
+def _build_wallet_info(outcome: Optional[TaskOutcome], coin_value: Optional[Dict], coin_id: str, private_key: Optional[str], **fields) -> WalletInfoResponse:
+    """
+    Combine derived keys with whichever enrichments were requested. `outcome` is None when balances
+    were not requested and `coin_value` is None when prices were not; failed lookups are flagged unavailable.
+    """
+    info = dict(fields, private_key=private_key, balance_available=None)
+    if outcome is not None:
+        balance = outcome.value if outcome.ok else 0
+        if not outcome.ok:
+            print(f"Balance unavailable for {fields.get('symbols')}: {outcome.error}")
+        info.update(balance=round(balance, 6), balance_available=outcome.ok)
+    if coin_value is not None:
+        market = coin_value.get(coin_id, {})
+        usd = market.get('usd', 0)
+        info.update(volume=usd, changes=round(market.get('usd_24h_change', 0), 3))
+        if outcome is not None:
+            info.update(price=info['balance'] * usd)
+    return WalletInfoResponse(**info)
+
+def _fetch_enrichments(include: Set[WalletEnrichment], balance_tasks: Dict[Symbols, Callable], timeout: float) -> Tuple[Dict, Optional[Dict]]:
+    """Run the requested price and balance lookups concurrently; nothing touches the network if neither was requested."""
+    tasks = dict(balance_tasks) if WalletEnrichment.BALANCES in include else {}
+    if WalletEnrichment.PRICES in include:
+        tasks["prices"] = get_coins_value
+    if not tasks:
+        return {}, None
+
+    outcomes = run_with_deadline(tasks, timeout=timeout)
+    coin_value = None
+    if WalletEnrichment.PRICES in include:
+        coin_value = outcomes["prices"].value if outcomes["prices"].ok else {}
+        if not outcomes["prices"].ok:
+            print(f"Price lookup unavailable: {outcomes['prices'].error}")
+    return outcomes, coin_value
+
+def _requested_chains(chains: Optional[Iterable[Symbols]]) -> List[Symbols]:
+    return [symbol for symbol in WALLET_SPECS if chains is None or symbol in chains]
+
+def generate_wallets_from_seed(seed_phrase, chains: Optional[Iterable[Symbols]] = None, include: Optional[Iterable[WalletEnrichment]] = None)-> List[WalletInfoResponse]:
+    base_url = f"{settings.SITE_URL}/media/icons"
+    include = _resolve_include(include)
+    requested = _requested_chains(chains)
+    keys = derive_keys(seed_phrase, requested)
+
+    outcomes, coinValue = _fetch_enrichments(
+        include,
+        {symbol: partial(WALLET_SPECS[symbol].balance, keys[symbol][0]) for symbol in requested},
+        settings.WALLET_IMPORT_DEADLINE,
+    )
 
-    # Derive wallets for each blockchain
     wallets = []
-    coinValue = get_coins_value()
-    base_url = f"{settings.SITE_URL}/media/icons"
+    for symbol in requested:
+        spec = WALLET_SPECS[symbol]
+        address, private_key = keys[symbol]
+        wallets.append(_build_wallet_info(
+            outcomes.get(symbol), coinValue, spec.coin_id,
+            private_key if WalletEnrichment.KEYS in include else None,
+            name=spec.name, icon_url=f'{base_url}/{spec.icon}', idName=spec.id_name, symbols=symbol, address=address,
+        ))
+    return wallets
+
+def generate_wallets_from_seeds(seed_phrases: List[str], chains: Optional[Iterable[Symbols]] = None, include: Optional[Iterable[WalletEnrichment]] = None) -> List[BatchWalletResult]:
+    """
+    Import many phrases in one job. Key derivation runs on the process pool, then every
+    resulting address is grouped by chain so each chain gets a single batched balance lookup.
+    """
+    if len(seed_phrases) > settings.WALLET_BATCH_MAX_PHRASES:
+        raise ValueError(f"At most {settings.WALLET_BATCH_MAX_PHRASES} phrases can be imported per batch")
 
-    # Bitcoin (BTC)
-    btc_seed = Mnemonic.to_seed(seed_phrase)
-    hdkey = HDKey.from_seed(btc_seed)
-    btc_wallet = hdkey.subkey_for_path("m/84'/0'/0'/0/0")
-    btc_balance = get_btc_balance_and_history(btc_wallet.address())
-
-    # Bitcoin Calculation
-    price_bitcoin = btc_balance * coinValue['bitcoin']['usd']
-    change_bitcoin_hr = coinValue['bitcoin']['usd_24h_change']
-    volume_bitcoin = coinValue['bitcoin']['usd']
-    btc_private_key = HDKey().private_hex
-    btc_info = WalletInfoResponse(name="Bitcoin", icon_url=f'{base_url}/btc_icon.svg', idName='bitcoin', symbols=Symbols.BTC, volume=volume_bitcoin, address=btc_wallet.address(), private_key=btc_private_key, balance=round(btc_balance, 6), price=price_bitcoin, changes=round(change_bitcoin_hr, 3))
-    wallets.append(btc_info)
-
-    # Ethereum (ETH)
-    eth_wallet = Bip44.FromSeed(seed_bytes, Bip44Coins.ETHEREUM).DeriveDefaultPath()
-    eth_balance = get_eth_balance_and_history(eth_wallet.PublicKey().ToAddress())
-
-    # ethereum Calculate
-    price_ethereum =eth_balance * coinValue['ethereum']['usd']
-    change_ethereum_hr = coinValue['ethereum']['usd_24h_change']
-    volume_ethereum = coinValue['ethereum']['usd']
-    eth_info = WalletInfoResponse(name="Ethereum", icon_url=f'{base_url}/eth_icon.svg', idName= 'ethereum', symbols= Symbols.ETH, volume=volume_ethereum, address=eth_wallet.PublicKey().ToAddress(),private_key= eth_wallet.PrivateKey().Raw().ToHex(),balance= round(eth_balance,6), price=price_ethereum, changes=round(change_ethereum_hr, 3))
-    wallets.append(eth_info)
-
-    # USDT BEP20
-    usdt_balance = get_usdt_balance(eth_wallet.PublicKey().ToAddress())
-
-    price_tether =usdt_balance * coinValue['tether']['usd']
-    change_tether_hr = coinValue['tether']['usd_24h_change']
-    volume_tether = coinValue['tether']['usd']
-    usdt_info =  WalletInfoResponse(name="USDT BEP20", icon_url=f'{base_url}/usdt_icon.svg', idName='tether', symbols= Symbols.USDT, volume=volume_tether, address=eth_wallet.PublicKey().ToAddress(),private_key=eth_wallet.PrivateKey().Raw().ToHex(),balance=round(usdt_balance, 6), price=price_tether, changes=round(change_tether_hr, 3))
-    wallets.append(usdt_info)
-
-    # Solana (SOL)
-    sol_wallet = Bip44.FromSeed(seed_bytes, Bip44Coins.SOLANA).DeriveDefaultPath()
-    sol_balance = get_sol_balance_and_history(sol_wallet.PublicKey().ToAddress())
-
-    price_solana =sol_balance * coinValue['solana']['usd']
-    change_solana_hr = coinValue['solana']['usd_24h_change']
-    volume_solana = coinValue['solana']['usd']
-    sol_info = WalletInfoResponse(name="Solana", icon_url=f'{base_url}/sol_icon.svg', idName='solana', symbols= Symbols.SOL, volume=volume_solana, address=sol_wallet.PublicKey().ToAddress(),private_key= sol_wallet.PrivateKey().Raw().ToHex(),balance= round(sol_balance, 6), price=price_solana, changes=round(change_solana_hr, 3))
-    wallets.append(sol_info)
-
-    # Tron (TRX)
-    # trx_wallet = Bip44.FromSeed(seed_bytes, Bip44Coins.TRON).DeriveDefaultPath()
-    # tron_balance = get_tron_balance(trx_wallet.PublicKey().ToAddress())
-    # price_tron =sol_balance * coinValue['tron']['usd']
-    # change_tron_hr = coinValue['tron']['usd_24h_change']
-    # volume_tron = coinValue['tron']['usd']
-    # tron_info = WalletInfoResponse(name="Tron", icon_url=f'{base_url}/tron_icon.svg', idName='tron', symbols= Symbols.TRON, volume= volume_tron, address=trx_wallet.PublicKey().ToAddress(),private_key= trx_wallet.PrivateKey().Raw().ToHex(),balance= round(tron_balance, 6), price=price_tron, changes=round(change_tron_hr, 3))
-    # wallets.append(tron_info)
-
-    # XRP (Ripple)
-    xrp_wallet = Bip44.FromSeed(seed_bytes, Bip44Coins.RIPPLE).DeriveDefaultPath()
-    # wallets["XRP"]
-    xrp_wallet_info = {
-      "name": "Ripple",
-      "address": xrp_wallet.PublicKey().ToAddress(),
-      "private_key": xrp_wallet.PrivateKey().Raw().ToHex(),
-      "balance": 0,
-    }
-
-    # Doge Wallets
-    doge_wallet = Bip44.FromSeed(seed_bytes, Bip44Coins.DOGECOIN).DeriveDefaultPath()
-    doge_balance = get_dodge_balance(doge_wallet.PublicKey().ToAddress())
-
-    price_doge = doge_balance * coinValue['dogecoin']['usd']
-    change_doge_hr = coinValue['dogecoin']['usd_24h_change']
-    volume_doge = coinValue['dogecoin']['usd']
-
-    doge_info = WalletInfoResponse(name="Dogecoin (NATIVE)", icon_url=f'{base_url}/doge_icon.svg', idName='dogecoin', symbols=Symbols.DODGE, volume=volume_doge, address=doge_wallet.PublicKey().ToAddress(), private_key=doge_wallet.PrivateKey().Raw().ToHex(), balance=round(doge_balance, 6), price=price_doge, changes=round(change_doge_hr, 3))
-    wallets.append(doge_info)
-
-    # WDoge Wallets
-    wdoge_balance = get_wdodge_balance(eth_wallet.PublicKey().ToAddress())
-    
-    price_wdoge = wdoge_balance * coinValue['dogecoin']['usd']  # Using same price as native DOGE
-    change_wdoge_hr = coinValue['dogecoin']['usd_24h_change']
-    volume_wdoge = coinValue['dogecoin']['usd']
-
-    wdoge_info = WalletInfoResponse(name="Wrapped Dogecoin", icon_url=f'{base_url}/doge_icon.svg', idName='wrapped dogecoin', symbols=Symbols.WDODGE, volume=volume_wdoge, address=eth_wallet.PublicKey().ToAddress(), private_key=eth_wallet.PrivateKey().Raw().ToHex(), balance=round(wdoge_balance, 6), price=price_wdoge, changes=round(change_wdoge_hr, 3))
-    wallets.append(wdoge_info)
-
-    # BNB Wallets
-    binance_wallet = Bip44.FromSeed(seed_bytes, Bip44Coins.BINANCE_SMART_CHAIN).DeriveDefaultPath()
-    bnb_balance = get_bnb_balance_and_history(binance_wallet.PublicKey().ToAddress())
-
-    price_bnb =bnb_balance * coinValue['binancecoin']['usd']
-    change_bnb_hr = coinValue['binancecoin']['usd_24h_change']
-    volume_bnb = coinValue['binancecoin']['usd']
-
-    bnb_info = WalletInfoResponse(name="BNB BEP20", icon_url=f'{base_url}/bnb_iicon.svg', idName='binancecoin', symbols= Symbols.BNB, volume=volume_bnb, address=binance_wallet.PublicKey().ToAddress(),private_key=binance_wallet.PrivateKey().Raw().ToHex(),balance=round(bnb_balance, 6), price=round(price_bnb, 6), changes=round(change_bnb_hr, 3))
-    wallets.append(bnb_info)
-    return wallets
\ No newline at end of file
+    base_url = f"{settings.SITE_URL}/media/icons"
+    include = _resolve_include(include)
+    requested = _requested_chains(chains)
+    pool = get_process_pool()
+    futures = [pool.submit(derive_keys, phrase, requested) for phrase in seed_phrases]
+
+    derived: List[Optional[Dict[Symbols, Tuple[str, str]]]] = []
+    errors: Dict[int, str] = {}
+    for index, future in enumerate(futures):
+        try:
+            derived.append(future.result())
+        except Exception as ex:
+            derived.append(None)
+            errors[index] = str(ex)
+
+    # One batched lookup per chain across every phrase
+    addresses: Dict[Symbols, List[str]] = {symbol: [] for symbol in requested}
+    for keys in derived:
+        for symbol, (address, _) in (keys or {}).items():
+            addresses[symbol].append(address)
+    outcomes, coinValue = _fetch_enrichments(include, balance_lookup_tasks(addresses), settings.WALLET_BATCH_DEADLINE)
+    outcomes = unpack_balance_outcomes(outcomes, requested)
+
+    results: List[BatchWalletResult] = []
+    for index, keys in enumerate(derived):
+        if keys is None:
+            results.append(BatchWalletResult(index=index, success=False, error=errors[index]))
+            continue
+        wallets = []
+        for symbol in requested:
+            spec = WALLET_SPECS[symbol]
+            address, private_key = keys[symbol]
+            outcome = None
+            if symbol in outcomes:
+                chain_outcome = outcomes[symbol]
+                if chain_outcome.ok and address in chain_outcome.value:
+                    outcome = TaskOutcome(ok=True, value=chain_outcome.value[address])
+                else:
+                    outcome = TaskOutcome(ok=False, error=chain_outcome.error or "balance unavailable")
+            wallets.append(_build_wallet_info(
+                outcome, coinValue, spec.coin_id,
+                private_key if WalletEnrichment.KEYS in include else None,
+                name=spec.name, icon_url=f'{base_url}/{spec.icon}', idName=spec.id_name, symbols=symbol, address=address,
+            ))
+        results.append(BatchWalletResult(index=index, wallets=wallets))
+    return results
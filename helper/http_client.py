@@ -0,0 +1,81 @@
+import os
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from helper import api_keys, rate_limit
+
+# Per-process registry of keep-alive sessions, one connection pool per upstream host.
+# Every upstream call (BlockCypher, Etherscan, BscScan, Solana, TronGrid, Li.Fi, Paybis, ...)
+# should go through here instead of the module-level requests.get/post.
+
+class UpstreamSession(requests.Session):
+    """requests.Session that applies the default (connect, read) timeout when the caller gives none."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+        self.headers["Accept-Encoding"] = "gzip, deflate"
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        headers = {**self.headers, **(kwargs.get("headers") or {})}
+        rate_limit.throttle(url, kwargs.get("params"), headers)
+        response = super().request(method, url, **kwargs)
+        key = rate_limit.api_key(url, kwargs.get("params"), headers)
+        if key and api_keys.is_rate_limited(response):
+            # Retry once per remaining key of the pool; the limited key sits out for a while
+            replacement = api_keys.replacement_key(urlsplit(url).netloc.lower(), key)
+            if replacement:
+                url, kwargs = _swap_key(url, kwargs, key, replacement)
+                return self.request(method, url, **kwargs)
+        return response
+
+def _swap_key(url: str, kwargs: dict, key: str, replacement: str):
+    """`url` and request kwargs with every occurrence of `key` replaced by `replacement`."""
+    kwargs = dict(kwargs)
+    for name in ("params", "headers"):
+        if isinstance(kwargs.get(name), dict):
+            kwargs[name] = {field: replacement if value == key else value for field, value in kwargs[name].items()}
+    return url.replace(key, replacement), kwargs
+
+_sessions: Dict[str, UpstreamSession] = {}
+_sessions_lock = threading.Lock()
+
+def _create_session(host: str) -> UpstreamSession:
+    session = UpstreamSession(timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT))
+    pool_size = settings.HTTP_POOL_SIZES.get(host, settings.HTTP_POOL_MAXSIZE)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session(url: str) -> UpstreamSession:
+    """Return the pooled session for the host of `url`, creating it on first use."""
+    host = urlsplit(url).netloc.lower()
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _sessions[host] = _create_session(host)
+    return session
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_session(url).request(method, url, **kwargs)
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+def _reset_after_fork():
+    # Sockets must not be shared with the parent (gunicorn --preload forks after import)
+    global _sessions_lock
+    _sessions.clear()
+    _sessions_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,40 @@
+import base64
+import json
+from typing import Any, Iterable, Optional
+from django.conf import settings
+
+# Opaque history cursors. A cursor wraps the chain's native paging token (Etherscan page number,
+# BlockCypher block height, Solana signature, TronGrid fingerprint) together with the chain it
+# belongs to, so clients can only hand it back to the same chain.
+
+class TransactionPage(list):
+    """A page of history rows; `next_cursor` is None on the last page."""
+
+    def __init__(self, items: Iterable = (), next_cursor: Optional[str] = None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+def encode_cursor(chain: str, position: Any) -> Optional[str]:
+    if position is None:
+        return None
+    raw = json.dumps({"c": chain, "p": position}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(chain: str, cursor: Optional[str]) -> Any:
+    """Native paging token inside `cursor`, or None for the first page."""
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(data, dict) or data.get("c") != chain:
+        raise ValueError("Cursor does not belong to this chain")
+    return data.get("p")
+
+def page_limit(limit: Optional[int]) -> int:
+    if limit is None:
+        return settings.TRANSACTION_PAGE_LIMIT
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, settings.TRANSACTION_PAGE_MAX_LIMIT)
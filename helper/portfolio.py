@@ -0,0 +1,50 @@
+from typing import Dict, List
+from django.conf import settings
+from helper.coingeko_api import get_coins_value
+from helper.concurrency import run_with_deadline
+from helper.generate_wallet import WALLET_SPECS
+from helper.wallet_balance import balance_lookup_tasks, unpack_balance_outcomes
+from home.wallet_schema import PortfolioEntry, PortfolioItem, PortfolioResponse, Symbols
+
+# CoinGecko ids for every symbol a portfolio can hold
+COIN_IDS = {symbol: spec.coin_id for symbol, spec in WALLET_SPECS.items()}
+COIN_IDS[Symbols.TRON] = "tron"
+
+def get_portfolio(items: List[PortfolioItem]) -> PortfolioResponse:
+    """
+    Value many (symbol, address) pairs in one pass: pairs are grouped by chain, every chain's batch
+    lookup runs concurrently next to a single price snapshot, and failures are reported per item.
+    """
+    if len(items) > settings.PORTFOLIO_MAX_ITEMS:
+        raise ValueError(f"At most {settings.PORTFOLIO_MAX_ITEMS} items can be valued per request")
+
+    addresses: Dict[Symbols, List[str]] = {}
+    for item in items:
+        addresses.setdefault(item.symbol, []).append(item.address)
+
+    tasks = balance_lookup_tasks(addresses)
+    tasks["prices"] = get_coins_value
+    outcomes = run_with_deadline(tasks, timeout=settings.PORTFOLIO_DEADLINE)
+    prices = outcomes.pop("prices")
+    if not prices.ok:
+        print(f"Price lookup unavailable: {prices.error}")
+    coin_value = prices.value if prices.ok else {}
+    outcomes = unpack_balance_outcomes(outcomes, addresses)
+
+    entries: List[PortfolioEntry] = []
+    total_value = 0
+    for item in items:
+        outcome = outcomes.get(item.symbol)
+        if outcome is None or not outcome.ok:
+            entries.append(PortfolioEntry(symbol=item.symbol, address=item.address, success=False, error=outcome.error if outcome else "unsupported symbol"))
+            continue
+        if item.address not in outcome.value:
+            entries.append(PortfolioEntry(symbol=item.symbol, address=item.address, success=False, error="balance unavailable"))
+            continue
+
+        balance = round(outcome.value[item.address], 6)
+        usd = coin_value.get(COIN_IDS.get(item.symbol), {}).get("usd")
+        value = balance * usd if usd is not None else None
+        total_value += value or 0
+        entries.append(PortfolioEntry(symbol=item.symbol, address=item.address, balance=balance, price=usd, value=value))
+    return PortfolioResponse(items=entries, total_value=total_value, prices_available=prices.ok)
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+from django.conf import settings
+
+# Host-wide token buckets for upstreams with quotas. The buckets live in a SQLite file, so every
+# worker process on the host draws from the same budget. A caller that finds a bucket empty reserves
+# the next token and sleeps until it is due, instead of being rejected, as long as the wait stays
+# under RATE_LIMIT_MAX_WAIT. Buckets are kept per host and per API key (a hash, never the key itself).
+
+# Query parameters and headers that carry an upstream API key
+KEY_PARAMS = ("apikey", "token")
+KEY_HEADERS = ("TRON-PRO-API-KEY", "x-lifi-api-key")
+
+class RateLimitExceeded(Exception):
+    """The wait for a token would exceed RATE_LIMIT_MAX_WAIT."""
+
+_local = threading.local()
+
+def _db() -> sqlite3.Connection:
+    # One connection per thread, reopened after a fork
+    if getattr(_local, "pid", None) != os.getpid():
+        conn = sqlite3.connect(settings.RATE_LIMIT_PATH, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS benched_keys (name TEXT PRIMARY KEY, until REAL NOT NULL)")
+        _local.conn, _local.pid = conn, os.getpid()
+    return _local.conn
+
+def api_key(url: str, params=None, headers=None) -> Optional[str]:
+    """The upstream API key a request carries in its query parameters or headers, if any."""
+    if isinstance(params, dict):
+        for name in KEY_PARAMS:
+            if params.get(name):
+                return str(params[name])
+    query = parse_qs(urlsplit(url).query)
+    for name in KEY_PARAMS:
+        if query.get(name):
+            return query[name][0]
+    for name in KEY_HEADERS:
+        if headers and headers.get(name):
+            return headers[name]
+    return None
+
+def key_id(key: Optional[str]) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()[:16] if key else "anonymous"
+
+def key_buckets(host: str, key: Optional[str]) -> List[Tuple[str, float, float]]:
+    """(bucket name, tokens per second, capacity) for every quota on `host` that applies to `key`."""
+    buckets = []
+    if host in settings.RATE_LIMITS:
+        per_second, burst = settings.RATE_LIMITS[host]
+        buckets.append((f"{host}:{key_id(key)}:second", float(per_second), float(burst)))
+    if host in settings.RATE_LIMITS_DAILY:
+        per_day = settings.RATE_LIMITS_DAILY[host]
+        buckets.append((f"{host}:{key_id(key)}:day", per_day / 86400.0, float(per_day)))
+    return buckets
+
+def buckets_for(url: str, params=None, headers=None) -> List[Tuple[str, float, float]]:
+    return key_buckets(urlsplit(url).netloc.lower(), api_key(url, params, headers))
+
+def remaining(host: str, key: Optional[str]) -> float:
+    """Tokens currently left for `key` on `host`: the smallest of its buckets (inf when no quota applies)."""
+    left = float("inf")
+    for name, rate, capacity in key_buckets(host, key):
+        row = _db().execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+        tokens = capacity if row is None else min(capacity, row[0] + (time.time() - row[1]) * rate)
+        left = min(left, tokens)
+    return left
+
+def bench(host: str, key: Optional[str], seconds: float):
+    """Take `key` out of rotation on `host` for `seconds`, for every worker."""
+    conn = _db()
+    conn.execute("INSERT OR REPLACE INTO benched_keys (name, until) VALUES (?, ?)", (f"{host}:{key_id(key)}", time.time() + seconds))
+
+def benched(host: str) -> Set[str]:
+    """key_id of every key on `host` that is currently out of rotation."""
+    rows = _db().execute("SELECT name FROM benched_keys WHERE name LIKE ? AND until > ?", (f"{host}:%", time.time())).fetchall()
+    return {name.rsplit(":", 1)[1] for (name,) in rows}
+
+def _reserve(name: str, rate: float, capacity: float, max_wait: float) -> float:
+    """Take one token from `name`, possibly on credit, and return how long to wait before using it."""
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        now = time.time()
+        row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+        tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+        if wait > max_wait:
+            conn.execute("ROLLBACK")
+            raise RateLimitExceeded(f"Rate limit for {name.split(':')[0]} would need a {wait:.1f}s wait")
+        conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)", (name, tokens - 1, now))
+        conn.execute("COMMIT")
+        return wait
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+def throttle(url: str, params=None, headers=None):
+    """Block until the request may be sent under every applicable bucket; raises RateLimitExceeded if that is too far off."""
+    for name, rate, capacity in buckets_for(url, params, headers):
+        try:
+            wait = _reserve(name, rate, capacity, settings.RATE_LIMIT_MAX_WAIT)
+        except sqlite3.Error as e:
+            # The limiter must never take the upstream call down with it
+            print(f"Rate limiter unavailable for {name}: {e}")
+            return
+        if wait > 0:
+            time.sleep(wait)
@@ -1,12 +1,10 @@
-from web3 import Web3
-
+from helper.web3_registry import get_web3
 from home.wallet_schema import SendTransactionDTO
 
-# Connect to Binance Smart Chain RPC
-web3 = Web3(Web3.HTTPProvider("https://bsc-dataseed.binance.org/"))
-
 def send_bnb(req: SendTransactionDTO):
     try:
+        # Shared Binance Smart Chain client
+        web3 = get_web3("BNB")
         account = web3.eth.account.from_key(req.private_key)
 
         if not web3.is_address(req.to_address):
@@ -1,5 +1,6 @@
 import blockcypher
 from django.conf import settings
+from helper.api_keys import get_api_key
 from home.wallet_schema import SendTransactionDTO
 
 def send_btc(req: SendTransactionDTO, coin_symbol="btc"):
@@ -16,14 +17,14 @@ def send_btc(req: SendTransactionDTO, coin_symbol="btc"):
             to_address=req.to_address,
             to_satoshis=satoshi,
             coin_symbol=coin_symbol,
-            api_key=settings.BLOCK_CYPHER
+            api_key=get_api_key("blockcypher")
         )
 
         # Fetch transaction details for confirmation
         tx_details = blockcypher.get_transaction_details(
             tx_hash, 
             coin_symbol=coin_symbol,
-            api_key=settings.BLOCK_CYPHER
+            api_key=get_api_key("blockcypher")
         )
 
         # Optional: Log or return tx_details if needed
@@ -1,5 +1,7 @@
 import blockcypher
 from django.conf import settings
+from helper.api_keys import get_api_key
+from helper.utxo_index import spend_utxos
 from home.wallet_schema import SendTransactionDTO
 
 def send_doge(req: SendTransactionDTO, coin_symbol="doge"):
@@ -10,6 +12,11 @@ def send_doge(req: SendTransactionDTO, coin_symbol="doge"):
         # Validate recipient address
         validate_coin(req.to_address, coin_symbol)
 
+        if settings.UTXO_INDEX_ENABLED:
+            # Inputs come from the local UTXO index, which also checks the key against from_address;
+            # BlockCypher only builds and relays the transaction
+            return spend_utxos(coin_symbol, req.private_key, req.from_address, req.to_address, satoshi)
+
         # Optional: Validate sender's address matches private key
         pubkey = blockcypher.get_pubkey_from_privkey(req.private_key, coin_symbol=coin_symbol)
         derived_address = blockcypher.pubkey_to_address(pubkey, coin_symbol=coin_symbol)
@@ -22,7 +29,7 @@ def send_doge(req: SendTransactionDTO, coin_symbol="doge"):
             to_address=req.to_address,
             to_satoshis=satoshi,
             coin_symbol=coin_symbol,
-            api_key=settings.BLOCK_CYPHER
+            api_key=get_api_key("blockcypher")
         )
 
         # Optional: could log or return details
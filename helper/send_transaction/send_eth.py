@@ -1,13 +1,10 @@
-from web3 import Web3
 from eth_account import Account
-from django.conf import settings
+from helper.web3_registry import get_web3
 from home.wallet_schema import SendTransactionDTO
 
-infura_url = f'https://mainnet.infura.io/v3/{settings.INFURA}'
-web3 = Web3(Web3.HTTPProvider(infura_url))
-
 def send_eth(req: SendTransactionDTO):
     try:
+        web3 = get_web3("ETH")
         account = Account.from_key(req.private_key)
 
         if not web3.is_address(req.to_address):
@@ -1,19 +1,13 @@
-from tronpy import Tron
-
+from helper.tron_client import broadcast, build_trx_transfer
 from home.wallet_schema import SendTransactionDTO
 
 def send_trx(req:SendTransactionDTO):
     try:
-        client = Tron()
-        sender = client.get_account(req.private_key)
-        if sender is not req.from_address:
+        # Built against the cached reference block and signed locally
+        sender, txn = build_trx_transfer(req.private_key, req.to_address, int(req.amount * 1e6))
+        if sender != req.from_address:
             raise Exception("Invalid address")
 
-        txn = (
-            client.trx.transfer(sender["address"], req.to_address, int(req.amount * 1e6))
-            .build()
-            .sign(req.private_key)
-        )
-        return txn.broadcast().get("txid")
+        return broadcast(txn).get("txid")
     except Exception as ex:
-        raise str(ex)
\ No newline at end of file
+        raise RuntimeError(f"TRX transfer failed: {ex}")
@@ -1,14 +1,14 @@
 from web3 import Web3
 from eth_account import Account
+from helper.web3_registry import USDT_BEP20_CONTRACT, get_contract, get_web3, is_healthy
 from home.wallet_schema import SendTransactionDTO
 
 def send_usdt(req: SendTransactionDTO):
     try:
-        # Connect to BSC node
-        rpc_url = "https://bsc-dataseed.binance.org/"
-        web3 = Web3(Web3.HTTPProvider(rpc_url))
+        # Shared BSC client
+        web3 = get_web3("BNB")
 
-        if not web3.is_connected():
+        if not is_healthy("BNB"):
             raise Exception("Failed to connect to Binance Smart Chain node.")
 
         # Sender address from the private key
@@ -17,30 +17,8 @@ def send_usdt(req: SendTransactionDTO):
         if sender_address.lower() != req.from_address.lower():
             raise Exception("Invalid address: from_address does not match private key.")
 
-        # USDT Contract ABI (includes balanceOf and transfer)
-        abi = [
-            {
-                "constant": False,
-                "inputs": [
-                    {"name": "_to", "type": "address"},
-                    {"name": "_value", "type": "uint256"}
-                ],
-                "name": "transfer",
-                "outputs": [{"name": "", "type": "bool"}],
-                "type": "function"
-            },
-            {
-                "constant": True,
-                "inputs": [{"name": "_owner", "type": "address"}],
-                "name": "balanceOf",
-                "outputs": [{"name": "balance", "type": "uint256"}],
-                "type": "function"
-            }
-        ]
-
-        # USDT BEP-20 Contract address on BSC
-        usdt_contract_address = "0x55d398326f99059fF775485246999027B3197955"
-        token_contract = web3.eth.contract(address=Web3.to_checksum_address(usdt_contract_address), abi=abi)
+        # USDT BEP-20 contract on BSC (ABI includes balanceOf and transfer)
+        token_contract = get_contract("BNB", USDT_BEP20_CONTRACT)
 
         # Convert amount to smallest unit (18 decimals for BEP-20 USDT)
         amount_in_wei = int(req.amount * 1e18)
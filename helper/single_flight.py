@@ -0,0 +1,161 @@
+import hashlib
+import os
+import pickle
+import random
+import stat
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Set
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX hosts coalesce within a worker only
+    fcntl = None
+
+# Single-flight coalescing for upstream lookups. Concurrent calls with identical arguments share
+# one in-flight call: threads of the same worker wait on the leader's Future, and other gunicorn
+# workers on the host wait on a per-call file lock and reuse the result file the leader leaves behind.
+# Result files are pickles, so cross-worker sharing only runs in SINGLE_FLIGHT_DIR, and only while that
+# directory is owned by this user and closed to everyone else (0o700); otherwise calls coalesce per worker.
+
+LOCK_POLL_SECONDS = 0.05
+
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+_rejected_dirs: Set[str] = set()
+
+def _call_key(func: Callable, args, kwargs) -> str:
+    signature = f"{func.__module__}.{func.__qualname__}:{args!r}:{sorted(kwargs.items())!r}"
+    return hashlib.sha1(signature.encode()).hexdigest()
+
+def _flight_dir() -> Optional[str]:
+    """SINGLE_FLIGHT_DIR when it is safe to load results from, else None."""
+    path = settings.SINGLE_FLIGHT_DIR
+    if not path:
+        return None
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError as e:
+        error = str(e)
+    else:
+        error = None
+        if not stat.S_ISDIR(info.st_mode):
+            error = "not a directory"
+        elif info.st_uid != os.geteuid():
+            error = f"owned by uid {info.st_uid}"
+        elif stat.S_IMODE(info.st_mode) != 0o700:
+            error = f"mode {oct(stat.S_IMODE(info.st_mode))}, expected 0o700"
+    if error:
+        if path not in _rejected_dirs:
+            _rejected_dirs.add(path)
+            print(f"Single-flight directory {path} rejected ({error}); coalescing within this worker only")
+        return None
+    return path
+
+def _write_result(path: str, result: Any):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        pickle.dump(result, handle)
+    os.replace(tmp_path, path)
+
+def _read_result(path: str, since: float):
+    """Return (True, result) when a result was written at or after `since`."""
+    try:
+        if os.path.getmtime(path) < since:
+            return False, None
+        with open(path, "rb") as handle:
+            return True, pickle.load(handle)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return False, None
+
+def _sweep(directory: str):
+    cutoff = time.time() - settings.SINGLE_FLIGHT_RETENTION
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+        except OSError:
+            pass
+
+def _lead(func: Callable, args, kwargs, result_path: str, directory: str):
+    result = func(*args, **kwargs)
+    try:
+        _write_result(result_path, result)
+    except (OSError, pickle.PicklingError) as e:
+        print(f"Single-flight result not shared for {func.__name__}: {e}")
+    if random.random() < 0.01:
+        _sweep(directory)
+    return result
+
+def _call_across_workers(key: str, func: Callable, args, kwargs):
+    directory = _flight_dir() if fcntl is not None else None
+    if directory is None:
+        return func(*args, **kwargs)
+
+    lock_path = os.path.join(directory, f"{key}.lock")
+    result_path = os.path.join(directory, f"{key}.result")
+    started = time.time()
+    with open(lock_path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another worker is making the same call: wait for it, then reuse its result
+            deadline = started + settings.SINGLE_FLIGHT_WAIT
+            while True:
+                time.sleep(LOCK_POLL_SECONDS)
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.time() >= deadline:
+                        return func(*args, **kwargs)
+            try:
+                found, result = _read_result(result_path, started)
+                if found:
+                    return result
+                return _lead(func, args, kwargs, result_path, directory)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        try:
+            os.utime(lock_path)
+            return _lead(func, args, kwargs, result_path, directory)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _reset_after_fork():
+    global _inflight_lock
+    _inflight.clear()
+    _inflight_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def single_flight(func: Callable) -> Callable:
+    """Decorate an upstream lookup so concurrent identical calls share one execution and its result."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _call_key(func, args, kwargs)
+        with _inflight_lock:
+            future = _inflight.get(key)
+            leader = future is None
+            if leader:
+                future = _inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = _call_across_workers(key, func, args, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as ex:
+            future.set_exception(ex)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+    return wrapper
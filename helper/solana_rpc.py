@@ -0,0 +1,81 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from helper import http_client
+
+# Solana JSON-RPC reads over the pooled HTTP client
+
+SOLANA_MULTIPLE_ACCOUNTS_LIMIT = 100  # getMultipleAccounts accepts at most 100 pubkeys per call
+BASE58_PUBKEY = re.compile(r"^[1-9A-HJ-NP-Za-km-z]{32,44}$")
+
+def rpc_call(method: str, params: List[Any]) -> Any:
+    """Post one JSON-RPC request and return its `result`, raising RuntimeError on an RPC error."""
+    payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+    data = http_client.post(settings.SOLANA_RPC_URL, json=payload).json()
+    if "error" in data:
+        raise RuntimeError(f"Solana RPC {method} failed: {data['error'].get('message', data['error'])}")
+    return data["result"]
+
+def _call_or_none(method: str, params: List[Any]) -> Optional[Any]:
+    try:
+        return rpc_call(method, params)
+    except Exception as e:
+        print(f"Solana RPC {method} failed: {e}")
+        return None
+
+def rpc_batch(calls: List[Tuple[str, List[Any]]]) -> List[Optional[Any]]:
+    """
+    Send many calls as JSON-RPC batches of SOLANA_RPC_BATCH_SIZE and return their results in call order,
+    with None for calls that failed. Endpoints that reject batches get the calls with bounded concurrency instead.
+    """
+    results: List[Optional[Any]] = [None] * len(calls)
+    batches_accepted = True
+    for start in range(0, len(calls), settings.SOLANA_RPC_BATCH_SIZE):
+        chunk = calls[start:start + settings.SOLANA_RPC_BATCH_SIZE]
+        data = None
+        if batches_accepted:
+            payload = [{"jsonrpc": "2.0", "id": start + offset, "method": method, "params": params} for offset, (method, params) in enumerate(chunk)]
+            response = http_client.post(settings.SOLANA_RPC_URL, json=payload)
+            data = response.json() if response.status_code == 200 else None
+            if not isinstance(data, list):
+                print(f"Solana RPC batch rejected ({response.status_code}), falling back to concurrent calls")
+                batches_accepted = False
+        if not batches_accepted:
+            with ThreadPoolExecutor(max_workers=settings.SOLANA_RPC_CONCURRENCY, thread_name_prefix="solana") as pool:
+                for offset, result in enumerate(pool.map(lambda call: _call_or_none(*call), chunk)):
+                    results[start + offset] = result
+            continue
+        for item in data:
+            if "error" in item:
+                print(f"Solana RPC call {item.get('id')} failed: {item['error'].get('message', item['error'])}")
+                continue
+            results[item["id"]] = item.get("result")
+    return results
+
+def get_sol_balances(addresses: Iterable[str]) -> Dict[str, int]:
+    """
+    Return lamport balances for every address, up to 100 per getMultipleAccounts call.
+    Accounts that do not exist on chain have a balance of 0; malformed addresses are left out.
+    """
+    valid = []
+    for address in dict.fromkeys(addresses):
+        if BASE58_PUBKEY.match(address):
+            valid.append(address)
+        else:
+            print(f"Skipping invalid Solana address: {address}")
+
+    balances: Dict[str, int] = {}
+    for start in range(0, len(valid), SOLANA_MULTIPLE_ACCOUNTS_LIMIT):
+        chunk = valid[start:start + SOLANA_MULTIPLE_ACCOUNTS_LIMIT]
+        # A zero-length data slice keeps the response to lamports and metadata only
+        result = rpc_call("getMultipleAccounts", [chunk, {"encoding": "base64", "dataSlice": {"offset": 0, "length": 0}}])
+        for address, account in zip(chunk, result["value"]):
+            balances[address] = account["lamports"] if account else 0
+    return balances
+
+def get_sol_used(addresses: Iterable[str]) -> Dict[str, bool]:
+    """Whether each address has ever signed or received a transaction, one getSignaturesForAddress(limit=1) per address in JSON-RPC batches."""
+    valid = [address for address in dict.fromkeys(addresses) if BASE58_PUBKEY.match(address)]
+    results = rpc_batch([("getSignaturesForAddress", [address, {"limit": 1}]) for address in valid])
+    return {address: bool(result) for address, result in zip(valid, results) if result is not None}
@@ -0,0 +1,61 @@
+import time
+from typing import Any, Callable, NamedTuple, Optional
+from django.core.cache import cache
+from helper.concurrency import submit
+
+# Stale-while-revalidate on top of the Django cache. A fresh entry is returned as is; a stale one
+# that is still within its maximum staleness is returned immediately while a background refresh
+# replaces it; anything older (or missing) is fetched before returning. Every key has a generation,
+# bumped by invalidate(): an entry stored under an older generation counts as missing, so a fetch
+# that was already in flight when the key was invalidated can never be served as fresh afterwards.
+
+# How long a background refresh holds its per-key claim before another one may start
+REFRESH_CLAIM_SECONDS = 30
+# How long a key's generation is remembered; far longer than any upstream fetch takes
+GENERATION_SECONDS = 3600
+
+class CachedValue(NamedTuple):
+    value: Any
+    age: float  # seconds since the value was fetched upstream; 0 for a value fetched by this call
+
+def _generation_key(key: str) -> str:
+    return f"{key}:generation"
+
+def _store(key: str, value: Any, version: Optional[int], timeout: float, generation: int) -> Any:
+    cache.set(key, {"value": value, "version": version, "fetched_at": time.time(), "generation": generation}, timeout)
+    return value
+
+def _refresh(key: str, fetch: Callable[[], Any], version: Optional[int], timeout: float, generation: int):
+    try:
+        _store(key, fetch(), version, timeout, generation)
+    except Exception as e:
+        print(f"Background refresh failed for {key}: {e}")
+    finally:
+        cache.delete(f"{key}:refreshing")
+
+def get_or_refresh(key: str, fetch: Callable[[], Any], ttl: float, max_staleness: float, version: Optional[int] = None) -> CachedValue:
+    """
+    Serve `key` from the cache. An entry is fresh while it is younger than `ttl` and, when `version`
+    is given (e.g. a chain head height), was stored at that version or later.
+    """
+    timeout = max(ttl, max_staleness)
+    found = cache.get_many([key, _generation_key(key)])
+    entry, generation = found.get(key), found.get(_generation_key(key), 0)
+    if entry is not None and entry.get("generation", 0) == generation:
+        age = time.time() - entry["fetched_at"]
+        current = version is None or entry["version"] is None or version <= entry["version"]
+        if age <= ttl and current:
+            return CachedValue(entry["value"], age)
+        if age <= max_staleness:
+            # cache.add is atomic, so only one worker refreshes a given key at a time
+            if cache.add(f"{key}:refreshing", True, REFRESH_CLAIM_SECONDS):
+                submit(_refresh, key, fetch, version, timeout, generation)
+            return CachedValue(entry["value"], age)
+    return CachedValue(_store(key, fetch(), version, timeout, generation), 0.0)
+
+def invalidate(key: str):
+    """Drop `key`; values of fetches already in flight for it are no longer served."""
+    # add() is a no-op when the generation exists, so incr() always has something to bump
+    cache.add(_generation_key(key), 0, GENERATION_SECONDS)
+    cache.incr(_generation_key(key))
+    cache.delete(key)
@@ -0,0 +1,117 @@
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from helper import activity_feed
+from helper.pagination import TransactionPage, decode_cursor, encode_cursor
+from helper.tx_record import TxRecord
+from home.wallet_schema import PortfolioItem, Symbols, TransactionType
+
+def history(prefix, timestamps):
+    return [TxRecord(hash=f"{prefix}{ts}", hashUrl="", transaction_type=TransactionType.RECEIVED, amount=1, timestamp=ts) for ts in sorted(timestamps, reverse=True)]
+
+class FakeHistories:
+    """get_history_page over in-memory histories, paged by offset; records every page fetched."""
+
+    def __init__(self, histories):
+        self.histories = histories
+        self.fetched = []
+        self.failures = {}
+
+    def __call__(self, symbol, address, limit=None, cursor=None):
+        offset = decode_cursor(symbol.value, cursor) or 0
+        self.fetched.append((symbol, address, offset))
+        if self.failures.get((symbol, address), 0):
+            self.failures[(symbol, address)] -= 1
+            raise Exception("upstream down")
+        rows = self.histories[(symbol, address)]
+        page = rows[offset:offset + limit]
+        return TransactionPage(page, next_cursor=encode_cursor(symbol.value, offset + limit) if offset + limit < len(rows) else None)
+
+BTC = PortfolioItem(symbol=Symbols.BTC, address="bc1q")
+ETH = PortfolioItem(symbol=Symbols.ETH, address="0xabc")
+SOL = PortfolioItem(symbol=Symbols.SOL, address="So1")
+
+@override_settings(ACTIVITY_MAX_ITEMS=5, ACTIVITY_DEADLINE=5.0, TRANSACTION_PAGE_LIMIT=10, TRANSACTION_PAGE_MAX_LIMIT=50)
+class ActivityFeedTests(SimpleTestCase):
+    def setUp(self):
+        self.histories = FakeHistories({
+            (Symbols.BTC, "bc1q"): history("btc", [100, 130, 160, 190, 220, 250, 280]),
+            (Symbols.ETH, "0xabc"): history("eth", [105, 110, 115, 300, 310]),
+            (Symbols.SOL, "So1"): history("sol", [10, 20]),
+        })
+        patcher = mock.patch.object(activity_feed, "get_history_page", self.histories)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def walk(self, items, limit):
+        pages, cursor = [], None
+        while True:
+            page = activity_feed.get_activity_feed(items, limit, cursor)
+            pages.append([(entry.symbol, entry.hash) for entry in page])
+            cursor = page.next_cursor
+            if cursor is None or len(pages) > 20:
+                return pages
+
+    def expected(self, items):
+        rows = [(item.symbol, tx) for item in items for tx in self.histories.histories[(item.symbol, item.address)]]
+        return [(symbol, tx.hash) for symbol, tx in sorted(rows, key=lambda row: int(row[1].timestamp), reverse=True)]
+
+    def test_feed_pages_merge_every_history_newest_first_once(self):
+        items = [BTC, ETH, SOL]
+        for limit in (1, 3, 4, 14, 50):
+            with self.subTest(limit=limit):
+                pages = self.walk(items, limit)
+                self.assertTrue(all(len(page) == limit for page in pages[:-1]))
+                self.assertEqual([row for page in pages for row in page], self.expected(items))
+
+    def test_entries_carry_their_source(self):
+        entry = activity_feed.get_activity_feed([BTC, ETH], 1)[0]
+        self.assertEqual((entry.symbol, entry.address, entry.hash), (Symbols.ETH, "0xabc", "eth310"))
+        self.assertEqual(entry.as_dict()["symbol"], "eth")
+
+    def test_older_pages_are_only_fetched_when_the_merge_reaches_them(self):
+        activity_feed.get_activity_feed([BTC, ETH, SOL], 3)
+        # Rows 310, 300 and 280: no chain needed a second page
+        self.assertEqual(sorted(offset for _, _, offset in self.histories.fetched), [0, 0, 0])
+
+    def test_exhausted_histories_drop_out_of_the_cursor(self):
+        page = activity_feed.get_activity_feed([ETH, SOL], 6)
+        positions = decode_cursor(activity_feed.FEED_CURSOR, page.next_cursor)
+        self.assertEqual(set(positions), {"sol:So1"})
+        self.histories.fetched.clear()
+        rest = activity_feed.get_activity_feed([ETH, SOL], 6, page.next_cursor)
+        self.assertEqual([entry.hash for entry in rest], ["sol10"])
+        self.assertEqual({symbol for symbol, _, _ in self.histories.fetched}, {Symbols.SOL})
+        self.assertIsNone(rest.next_cursor)
+
+    def test_duplicate_items_are_merged_once(self):
+        pages = self.walk([SOL, SOL], 10)
+        self.assertEqual(pages, [[(Symbols.SOL, "sol20"), (Symbols.SOL, "sol10")]])
+
+    def test_failed_history_is_retried_on_the_next_page(self):
+        self.histories.failures[(Symbols.ETH, "0xabc")] = 1
+        first = activity_feed.get_activity_feed([BTC, ETH], 3)
+        self.assertEqual([entry.hash for entry in first], ["btc280", "btc250", "btc220"])
+        rows = [entry.hash for entry in first]
+        cursor = first.next_cursor
+        while cursor:
+            page = activity_feed.get_activity_feed([BTC, ETH], 3, cursor)
+            rows += [entry.hash for entry in page]
+            cursor = page.next_cursor
+        self.assertCountEqual(rows, [hash for _, hash in self.expected([BTC, ETH])])
+
+    def test_feed_fails_when_no_history_can_be_fetched(self):
+        self.histories.failures[(Symbols.SOL, "So1")] = 1
+        with self.assertRaises(Exception):
+            activity_feed.get_activity_feed([SOL], 3)
+
+    def test_cursor_of_other_items_is_rejected(self):
+        cursor = activity_feed.get_activity_feed([BTC, ETH], 2).next_cursor
+        with self.assertRaisesMessage(ValueError, "Cursor does not belong to these items"):
+            activity_feed.get_activity_feed([BTC, SOL], 2, cursor)
+        with self.assertRaises(ValueError):
+            activity_feed.get_activity_feed([BTC], 2, encode_cursor("btc", 2))
+
+    def test_item_count_is_bounded(self):
+        items = [PortfolioItem(symbol=Symbols.BTC, address=f"bc1q{index}") for index in range(6)]
+        with self.assertRaises(ValueError):
+            activity_feed.get_activity_feed(items, 3)
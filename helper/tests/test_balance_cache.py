@@ -0,0 +1,70 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from helper import balance_cache, swr_cache
+from home import wallet_services
+from home.wallet_schema import SendTransactionDTO, Symbols
+
+SENDER, RECIPIENT = "0xSender", "0xRecipient"
+
+class Balances:
+    """A balance handler whose upstream value can be changed, optionally sending while a read is in flight."""
+
+    __name__ = "get_balance"
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+        self.during_fetch = None
+
+    def __call__(self, address):
+        self.calls += 1
+        value = self.value
+        if self.during_fetch:
+            action, self.during_fetch = self.during_fetch, None
+            action()
+        return value
+
+    def send(self, amount):
+        self.value -= amount
+        balance_cache.evict_after_send(Symbols.ETH, SENDER, RECIPIENT)
+
+@override_settings(BALANCE_CACHE_TTLS={"eth": 10}, BALANCE_MAX_STALENESS={"eth": 60}, CHAIN_HEAD_POLL_INTERVALS={})
+class EvictAfterSendTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.balances = Balances(5.0)
+        self.read = balance_cache.cached_balance(Symbols.ETH, self.balances)
+        # Background refreshes run inline so their timing is under the test's control
+        patcher = mock.patch.object(swr_cache, "submit", lambda task, *args: task(*args))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_send_drops_the_cached_balance(self):
+        self.assertEqual(self.read(SENDER).value, 5.0)
+        self.balances.send(2.0)
+        self.assertEqual(self.read(SENDER).value, 3.0)
+
+    def test_read_in_flight_during_a_send_is_not_cached(self):
+        self.balances.during_fetch = lambda: self.balances.send(2.0)
+        self.assertEqual(self.read(SENDER).value, 5.0)
+        self.assertEqual(self.read(SENDER).value, 3.0)
+
+    def test_background_refresh_in_flight_during_a_send_is_not_served(self):
+        self.read(SENDER)
+        with mock.patch.object(swr_cache.time, "time", return_value=swr_cache.time.time() + 30):
+            # Stale: served at once while the refresh runs, and the send lands mid-refresh
+            self.balances.during_fetch = lambda: self.balances.send(2.0)
+            self.assertEqual(self.read(SENDER).value, 5.0)
+            self.assertEqual(self.read(SENDER), (3.0, 0.0))
+
+    def test_failed_send_keeps_the_cached_balances(self):
+        self.read(SENDER)
+        request = SendTransactionDTO(private_key="key", amount=1.0, to_address=RECIPIENT, from_address=SENDER)
+        with mock.patch.object(wallet_services, "send_eth", side_effect=Exception("insufficient funds")), \
+                mock.patch.object(wallet_services, "evict_after_send") as evict:
+            self.assertFalse(wallet_services.send_crypto_transaction(Symbols.ETH, request).success)
+        evict.assert_not_called()
+        self.read(SENDER)
+        self.assertEqual(self.balances.calls, 1)
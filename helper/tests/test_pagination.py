@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase, override_settings
+from helper.pagination import TransactionPage, decode_cursor, encode_cursor, page_limit
+
+class CursorTests(SimpleTestCase):
+    def test_native_positions_round_trip(self):
+        for position in (2, 812345, "5VERv8NMvzbJMEkV8xnrLkEaWRtSz9CosKDYjCJjBRnbJLgp8uirBgmQpjKhoR4tjF3ZpRzrFmBV6UjKdiSZkQUW", [1700000000, 42], {"eth:0xabc": [None, 0]}):
+            with self.subTest(position=position):
+                self.assertEqual(decode_cursor("btc", encode_cursor("btc", position)), position)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor("sol", "a" * 200)
+        self.assertNotIn("=", cursor)
+        self.assertTrue(all(char.isalnum() or char in "-_" for char in cursor))
+
+    def test_no_position_means_no_cursor(self):
+        self.assertIsNone(encode_cursor("eth", None))
+        self.assertIsNone(decode_cursor("eth", None))
+        self.assertIsNone(decode_cursor("eth", ""))
+
+    def test_cursor_of_another_chain_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "Cursor does not belong to this chain"):
+            decode_cursor("bnb", encode_cursor("eth", 3))
+
+    def test_malformed_cursor_is_rejected(self):
+        for cursor in ("not a cursor!", "e30", "WzFd"):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor("eth", cursor)
+
+    def test_page_keeps_its_next_cursor(self):
+        page = TransactionPage([1, 2], next_cursor="abc")
+        self.assertEqual(list(page), [1, 2])
+        self.assertEqual(page.next_cursor, "abc")
+        self.assertIsNone(TransactionPage().next_cursor)
+
+@override_settings(TRANSACTION_PAGE_LIMIT=10, TRANSACTION_PAGE_MAX_LIMIT=50)
+class PageLimitTests(SimpleTestCase):
+    def test_default_limit(self):
+        self.assertEqual(page_limit(None), 10)
+
+    def test_limit_is_capped(self):
+        self.assertEqual(page_limit(25), 25)
+        self.assertEqual(page_limit(5000), 50)
+
+    def test_limit_below_one_is_rejected(self):
+        with self.assertRaises(ValueError):
+            page_limit(0)
@@ -0,0 +1,135 @@
+import os
+import tempfile
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from helper import api_keys, rate_limit
+
+HOST = "api.example.com"
+URL = f"https://{HOST}/api"
+
+class FakeClock:
+    """Stands in for the `time` module: sleeping is recorded but does not move the clock."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+
+class LimiterTestCase(SimpleTestCase):
+    limits = {HOST: (2, 2)}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(
+            RATE_LIMIT_PATH=os.path.join(directory.name, "rate_limits.sqlite3"),
+            RATE_LIMITS=self.limits,
+            RATE_LIMITS_DAILY={},
+            RATE_LIMIT_MAX_WAIT=1.0,
+            API_KEY_BENCH_SECONDS=60,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        # Connections are cached per thread: make this test open its own file
+        rate_limit._local.__dict__.clear()
+        self.addCleanup(rate_limit._local.__dict__.clear)
+        self.clock = FakeClock()
+        patcher = mock.patch.object(rate_limit, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+class TokenBucketTests(LimiterTestCase):
+    def test_burst_is_served_without_waiting(self):
+        rate_limit.throttle(URL)
+        rate_limit.throttle(URL)
+        self.assertEqual(self.clock.slept, [])
+
+    def test_callers_past_the_burst_queue_for_the_next_tokens(self):
+        for _ in range(4):
+            rate_limit.throttle(URL)
+        # 2 tokens per second: the third caller waits half a second, the fourth a full one
+        self.assertEqual(len(self.clock.slept), 2)
+        self.assertAlmostEqual(self.clock.slept[0], 0.5)
+        self.assertAlmostEqual(self.clock.slept[1], 1.0)
+
+    def test_wait_beyond_max_wait_is_rejected(self):
+        for _ in range(4):
+            rate_limit.throttle(URL)
+        with self.assertRaises(rate_limit.RateLimitExceeded):
+            rate_limit.throttle(URL)
+        # The rejected caller did not take a token on credit
+        self.clock.now += 1.5
+        rate_limit.throttle(URL)
+        self.assertEqual(len(self.clock.slept), 2)
+
+    def test_bucket_refills_over_time(self):
+        rate_limit.throttle(URL)
+        rate_limit.throttle(URL)
+        self.assertAlmostEqual(rate_limit.remaining(HOST, None), 0)
+        self.clock.now += 0.5
+        self.assertAlmostEqual(rate_limit.remaining(HOST, None), 1)
+        self.clock.now += 10
+        # Never above the burst capacity
+        self.assertAlmostEqual(rate_limit.remaining(HOST, None), 2)
+        rate_limit.throttle(URL)
+        rate_limit.throttle(URL)
+        self.assertEqual(self.clock.slept, [])
+
+    def test_each_api_key_has_its_own_bucket(self):
+        for key in ("first", "first", "second", "second"):
+            rate_limit.throttle(URL, params={"apikey": key})
+        self.assertEqual(self.clock.slept, [])
+        self.assertAlmostEqual(rate_limit.remaining(HOST, "first"), 0)
+        self.assertAlmostEqual(rate_limit.remaining(HOST, "third"), 2)
+
+    def test_hosts_without_a_quota_are_not_throttled(self):
+        for _ in range(10):
+            rate_limit.throttle("https://api.unlimited.example/")
+        self.assertEqual(self.clock.slept, [])
+        self.assertEqual(rate_limit.remaining("api.unlimited.example", None), float("inf"))
+
+    def test_key_is_read_from_query_string_and_headers(self):
+        self.assertEqual(rate_limit.api_key(f"{URL}?module=account&apikey=abc"), "abc")
+        self.assertEqual(rate_limit.api_key(URL, headers={"TRON-PRO-API-KEY": "tron"}), "tron")
+        self.assertIsNone(rate_limit.api_key(URL))
+
+ETHERSCAN = "api.etherscan.io"
+
+@override_settings(ETH_API_KEYS=["first", "second", "third"])
+class KeyBenchTests(LimiterTestCase):
+    limits = {ETHERSCAN: (5, 5)}
+
+    def test_benched_key_sits_out_until_the_bench_expires(self):
+        rate_limit.bench(ETHERSCAN, "first", 60)
+        self.assertEqual(rate_limit.benched(ETHERSCAN), {rate_limit.key_id("first")})
+        self.assertEqual(rate_limit.benched(HOST), set())
+        self.clock.now += 61
+        self.assertEqual(rate_limit.benched(ETHERSCAN), set())
+
+    def test_rate_limited_key_is_replaced_by_another_of_the_pool(self):
+        replacement = api_keys.replacement_key(ETHERSCAN, "first")
+        self.assertIn(replacement, ("second", "third"))
+        for _ in range(20):
+            self.assertNotEqual(api_keys.get_api_key("etherscan"), "first")
+
+    def test_key_with_most_quota_left_is_picked(self):
+        for _ in range(3):
+            rate_limit.throttle(f"https://{ETHERSCAN}/api", params={"apikey": "second"})
+        rate_limit.throttle(f"https://{ETHERSCAN}/api", params={"apikey": "third"})
+        self.assertEqual(api_keys.get_api_key("etherscan"), "first")
+
+    def test_no_replacement_once_every_key_is_benched(self):
+        rate_limit.bench(ETHERSCAN, "second", 60)
+        rate_limit.bench(ETHERSCAN, "third", 60)
+        self.assertIsNone(api_keys.replacement_key(ETHERSCAN, "first"))
+        # The pool is still used as a whole rather than failing outright
+        self.assertIn(api_keys.get_api_key("etherscan"), ("first", "second", "third"))
+
+    def test_keys_outside_the_pool_are_not_replaced(self):
+        self.assertIsNone(api_keys.replacement_key(ETHERSCAN, "unknown"))
+        self.assertIsNone(api_keys.replacement_key(HOST, "first"))
@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from django.test import SimpleTestCase, override_settings
+from helper import single_flight as flight
+
+def counting_lookup(path):
+    """A slow lookup that logs each execution to `path`, so calls made by forked workers are counted too."""
+    def lookup(value):
+        with open(path, "a") as handle:
+            handle.write(f"{os.getpid()}\n")
+        time.sleep(0.3)
+        return {"value": value}
+    return lookup
+
+class SingleFlightTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.calls_path = os.path.join(self.root, "calls")
+        self.lookup = flight.single_flight(counting_lookup(self.calls_path))
+        flight._rejected_dirs.clear()
+
+    def calls(self):
+        with open(self.calls_path) as handle:
+            return len(handle.read().split())
+
+    def call_concurrently(self, count, value=1):
+        results = [None] * count
+
+        def run(index):
+            results[index] = self.lookup(value)
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+@override_settings(SINGLE_FLIGHT_DIR=None)
+class InProcessTests(SingleFlightTestCase):
+    def test_concurrent_identical_calls_share_one_execution(self):
+        results = self.call_concurrently(8)
+        self.assertEqual(self.calls(), 1)
+        self.assertEqual(results, [{"value": 1}] * 8)
+
+    def test_different_arguments_are_not_coalesced(self):
+        self.lookup(1)
+        self.lookup(2)
+        self.assertEqual(self.calls(), 2)
+
+    def test_later_calls_run_again(self):
+        self.lookup(1)
+        self.lookup(1)
+        self.assertEqual(self.calls(), 2)
+
+    def test_errors_reach_every_waiting_caller(self):
+        started = threading.Event()
+
+        @flight.single_flight
+        def failing():
+            started.set()
+            time.sleep(0.2)
+            raise RuntimeError("upstream down")
+
+        errors = []
+
+        def run():
+            try:
+                failing()
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, ["upstream down"] * 4)
+
+@unittest.skipIf(flight.fcntl is None, "cross-worker coalescing needs fcntl")
+class AcrossWorkersTests(SingleFlightTestCase):
+    def flight_dir(self, mode=0o700):
+        path = os.path.join(self.root, "flight")
+        os.mkdir(path)
+        os.chmod(path, mode)
+        return path
+
+    def run_workers(self, count):
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=self.call_concurrently, args=(4,)) for _ in range(count)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+
+    def test_workers_reuse_the_leaders_result(self):
+        with override_settings(SINGLE_FLIGHT_DIR=self.flight_dir()):
+            self.run_workers(3)
+        self.assertEqual(self.calls(), 1)
+
+    def test_directory_open_to_others_is_not_used(self):
+        with override_settings(SINGLE_FLIGHT_DIR=self.flight_dir(mode=0o755)):
+            self.assertIsNone(flight._flight_dir())
+            self.run_workers(3)
+        # Still coalesced within each worker, but every worker made its own call
+        self.assertEqual(self.calls(), 3)
+
+    def test_missing_directory_is_created_private(self):
+        path = os.path.join(self.root, "new")
+        with override_settings(SINGLE_FLIGHT_DIR=path):
+            self.assertEqual(flight._flight_dir(), path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+
+    def test_unset_directory_disables_sharing(self):
+        with override_settings(SINGLE_FLIGHT_DIR=None):
+            self.assertIsNone(flight._flight_dir())
@@ -0,0 +1,79 @@
+import json
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from helper import tx_export, tx_store
+from home.wallet_schema import Symbols
+
+ADDRESS = "0xabc"
+
+class FakeExplorer:
+    """get_scan_page over an in-memory txlist; refuses pages past 10,000 rows like Etherscan."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+        self.fail_after = None
+
+    def __call__(self, base_url, apikey, params, page, limit, sort="desc"):
+        self.requests.append(dict(params, page=page, offset=limit))
+        if self.fail_after is not None and len(self.requests) > self.fail_after:
+            raise Exception("explorer down")
+        if (page or 1) * limit > 10000:
+            raise Exception("Explorer API error: Result window is too large")
+        end_block = params.get("endblock", float("inf"))
+        rows = sorted((tx for tx in self.rows if int(tx["blockNumber"]) <= end_block), key=lambda tx: -int(tx["blockNumber"]))
+        page_rows = rows[((page or 1) - 1) * limit:(page or 1) * limit]
+        return page_rows, (page or 1) + 1 if len(page_rows) == limit else None
+
+def txlist(blocks, per_block):
+    return [
+        {"hash": f"0x{block}_{index}", "blockNumber": str(block), "to": ADDRESS, "value": str(10**18), "timeStamp": str(1_700_000_000 + block)}
+        for block in range(1, blocks + 1)
+        for index in range(per_block)
+    ]
+
+@override_settings(TX_STORE_ENABLED=False, TRANSACTION_PAGE_MAX_LIMIT=50)
+class ExportTests(SimpleTestCase):
+    def setUp(self):
+        self.explorer = FakeExplorer(txlist(blocks=40, per_block=3))
+        for patcher in (mock.patch.object(tx_store, "get_scan_page", self.explorer), mock.patch.object(tx_store, "get_api_key", lambda provider: "key")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def exported_hashes(self, fmt="ndjson"):
+        return [json.loads(line)["hash"] for line in "".join(tx_export.export_rows(Symbols.ETH, ADDRESS, fmt)).splitlines()]
+
+    def test_explorer_history_is_walked_by_block_range(self):
+        hashes = self.exported_hashes()
+        self.assertEqual(sorted(hashes), sorted(tx["hash"] for tx in self.explorer.rows))
+        self.assertEqual(len(hashes), len(set(hashes)))
+        # Always the first page below the lowest complete block, so the 10,000-row window is never reached
+        self.assertEqual({request["page"] for request in self.explorer.requests}, {1})
+        self.assertEqual([request.get("endblock") for request in self.explorer.requests[:3]], [None, 24, 8])
+
+    def test_block_filling_a_whole_page_is_exported_once(self):
+        self.explorer.rows = txlist(blocks=2, per_block=60)
+        hashes = self.exported_hashes()
+        self.assertEqual(len(hashes), len(set(hashes)))
+        self.assertEqual([request.get("endblock") for request in self.explorer.requests], [None, 1, 0])
+
+    def test_failure_after_the_first_page_aborts_the_csv_stream(self):
+        self.explorer.fail_after = 1
+        chunks = tx_export.export_rows(Symbols.ETH, ADDRESS, "csv")
+        self.assertEqual(next(chunks), tx_export._csv_header())
+        next(chunks)
+        with self.assertRaisesMessage(Exception, "explorer down"):
+            next(chunks)
+
+    def test_ndjson_stream_reports_the_error_before_aborting(self):
+        self.explorer.fail_after = 1
+        chunks = tx_export.export_rows(Symbols.ETH, ADDRESS, "ndjson")
+        next(chunks)
+        self.assertEqual(json.loads(next(chunks)), {"error": "explorer down"})
+        with self.assertRaises(Exception):
+            next(chunks)
+
+    def test_failure_on_the_first_page_is_raised_before_streaming(self):
+        self.explorer.fail_after = 0
+        with self.assertRaises(Exception):
+            tx_export.export_rows(Symbols.ETH, ADDRESS, "csv")
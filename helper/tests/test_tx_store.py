@@ -0,0 +1,113 @@
+import json
+from unittest import mock
+from django.test import TestCase, override_settings
+from helper import tx_store, wallet_transaction
+from helper.wallet_transaction import parse_blockcypher_transactions
+from home.wallet_schema import Symbols
+from wallet.models import ChainTransaction, TransactionSyncState
+
+ADDRESS = "bc1qsender"
+
+def blockcypher_tx(tx_hash, height, inputs=(), outputs=()):
+    """A /full transaction; `inputs` and `outputs` are (address, satoshis) pairs."""
+    return {
+        "hash": tx_hash,
+        "block_height": height,
+        "confirmed": f"2024-01-01T00:{height % 60:02d}:00Z",
+        "inputs": [{"addresses": [owner], "output_value": value} for owner, value in inputs],
+        "outputs": [{"addresses": [owner], "value": value} for owner, value in outputs],
+    }
+
+class FakeBlockCypher:
+    """The BTC page handler over an in-memory history, one transaction per block; positions are `before` heights."""
+
+    def __init__(self, txs):
+        self.txs = txs
+        self.fail_at = None
+
+    def __call__(self, address, limit=None, before=None):
+        if before is not None and before == self.fail_at:
+            raise Exception("BlockCypher down")
+        older = sorted((tx for tx in self.txs if before is None or tx["block_height"] < before), key=lambda tx: -tx["block_height"])
+        page = older[:limit]
+        next_before = page[-1]["block_height"] if len(older) > limit else None
+        return parse_blockcypher_transactions({"txs": page}, address, "btc"), next_before
+
+    def receive(self, heights):
+        self.txs += [blockcypher_tx(f"tx{height}", height, outputs=[(ADDRESS, height)]) for height in heights]
+
+def rows(page):
+    return sorted((tx.hash, tx.transaction_type.value, float(tx.amount)) for tx in page)
+
+@override_settings(TX_STORE_ENABLED=True, TX_SYNC_INTERVAL=0, TX_SYNC_PAGE_SIZE=2, TX_SYNC_MAX_PAGES=3, TRANSACTION_PAGE_LIMIT=10, TRANSACTION_PAGE_MAX_LIMIT=50)
+class StoredHistoryTests(TestCase):
+    def setUp(self):
+        self.upstream = FakeBlockCypher([])
+        patcher = mock.patch.dict(wallet_transaction.TRANSACTION_PAGE_HANDLERS, {Symbols.BTC: self.upstream})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_every_input_and_output_of_a_transaction_is_stored(self):
+        self.upstream.txs = [
+            # Spends three of the address's outputs and takes change back
+            blockcypher_tx("send", 12, inputs=[(ADDRESS, 30_000), (ADDRESS, 20_000), (ADDRESS, 10_000)], outputs=[("bc1qother", 45_000), (ADDRESS, 14_000)]),
+            blockcypher_tx("receive", 11, inputs=[("bc1qother", 99_000)], outputs=[(ADDRESS, 10_000), (ADDRESS, 20_000), (ADDRESS, 30_000)]),
+        ]
+        upstream = wallet_transaction.get_transactions_page(Symbols.BTC, ADDRESS)
+        stored = tx_store.get_stored_transactions_page(Symbols.BTC, ADDRESS)
+        self.assertEqual(rows(stored), rows(upstream))
+        self.assertEqual(ChainTransaction.objects.filter(tx_hash="send", transaction_type="sent").count(), 3)
+
+    def test_resyncing_a_transaction_does_not_duplicate_its_rows(self):
+        self.upstream.txs = [blockcypher_tx("send", 12, inputs=[(ADDRESS, 30_000), (ADDRESS, 20_000)], outputs=[(ADDRESS, 14_000)])]
+        tx_store.get_stored_transactions_page(Symbols.BTC, ADDRESS)
+        tx_store.get_stored_transactions_page(Symbols.BTC, ADDRESS)
+        self.assertEqual(ChainTransaction.objects.filter(tx_hash="send").count(), 3)
+
+    def stored_hashes(self):
+        return set(ChainTransaction.objects.values_list("tx_hash", flat=True))
+
+    def sync(self):
+        tx_store.get_stored_transactions_page(Symbols.BTC, ADDRESS)
+        return TransactionSyncState.objects.get(chain="btc", address=ADDRESS)
+
+    def test_head_walk_out_of_pages_is_resumed_on_later_syncs(self):
+        self.upstream.receive([1, 2])
+        self.sync()
+        # Ten new transactions: one sync walks three pages of two and stops short of the stored head
+        self.upstream.receive(range(3, 13))
+        state = self.sync()
+        self.assertEqual(self.stored_hashes(), {f"tx{height}" for height in [1, 2] + list(range(7, 13))})
+        self.assertEqual(json.loads(state.head_gaps), [7])
+        state = self.sync()
+        self.assertEqual(json.loads(state.head_gaps), [3])
+        state = self.sync()
+        self.assertIsNone(state.head_gaps)
+        self.assertEqual(self.stored_hashes(), {f"tx{height}" for height in range(1, 13)})
+
+    def test_new_gap_while_one_is_pending_is_kept_too(self):
+        self.upstream.receive([1, 2])
+        self.sync()
+        self.upstream.receive(range(3, 13))
+        self.sync()
+        self.upstream.receive(range(13, 23))
+        state = self.sync()
+        self.assertEqual(json.loads(state.head_gaps), [17, 7])
+        while state.head_gaps:
+            state = self.sync()
+        self.assertEqual(self.stored_hashes(), {f"tx{height}" for height in range(1, 23)})
+
+    def test_head_walk_failing_part_way_keeps_its_gap(self):
+        self.upstream.receive([1, 2])
+        self.sync()
+        self.upstream.receive(range(3, 9))
+        self.upstream.fail_at = 7
+        # The stored rows are served and the position of the failed page is kept
+        self.sync()
+        self.assertEqual(self.stored_hashes(), {"tx1", "tx2", "tx7", "tx8"})
+        self.assertEqual(json.loads(TransactionSyncState.objects.get().head_gaps), [7])
+        self.upstream.fail_at = None
+        state = self.sync()
+        while state.head_gaps:
+            state = self.sync()
+        self.assertEqual(self.stored_hashes(), {f"tx{height}" for height in range(1, 9)})
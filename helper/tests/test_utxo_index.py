@@ -0,0 +1,121 @@
+from unittest import mock
+from bitcoin import SIGHASH_ALL, address_to_script, mktx, signature_form
+from blockcypher.utils import double_sha256
+from coincurve import PublicKey
+from django.test import TestCase, override_settings
+from helper import utxo_index
+from helper.derivation import DerivationContext, derive_keys
+from helper.send_transaction import send_btc, send_doge
+from home.wallet_schema import SendTransactionDTO, Symbols
+from wallet.models import UnspentOutput, UtxoSyncState
+
+MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+FEE = 226_000
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+class FakeBlockCypher:
+    """BlockCypher's /addrs, /txs/new and /txs/send for one address holding `utxos` (hash, index, satoshis)."""
+
+    def __init__(self, address, utxos):
+        self.address = address
+        self.utxos = utxos
+        self.requests = []
+        self.relayed = None
+
+    def __call__(self, method, url, params=None, json=None, **kwargs):
+        path = url.split("/main/", 1)[1]
+        self.requests.append((method, path.split("/")[0] if path.startswith("addrs") else path))
+        if path.startswith("addrs/"):
+            txrefs = [{"tx_hash": tx_hash, "tx_output_n": index, "value": value, "block_height": 100} for tx_hash, index, value in self.utxos]
+            return Response({"txrefs": txrefs, "final_balance": sum(value for _, _, value in self.utxos), "hasMore": False})
+        if path == "txs/new":
+            return Response(self.build(json, params))
+        if path == "txs/send":
+            self.relayed = json
+            return Response({"tx": {"hash": "relayed", "inputs": json["tx"]["inputs"]}})
+        raise AssertionError(f"Unexpected BlockCypher call {method} {url}")
+
+    def build(self, skeleton, params):
+        """The unsigned transaction with legacy (P2PKH) preimages, as BlockCypher returns for includeToSignTx."""
+        assert params.get("includeToSignTx") == "true"
+        inputs = skeleton["inputs"]
+        spent = sum(value for tx_hash, index, value in self.utxos if {"prev_hash": tx_hash, "output_index": index} in inputs)
+        (payment,) = skeleton["outputs"]
+        outs = [{"address": payment["addresses"][0], "value": payment["value"]}, {"address": skeleton["change_address"], "value": spent - payment["value"] - FEE}]
+        raw = mktx([f"{item['prev_hash']}:{item['output_index']}" for item in inputs], outs)
+        tosign_tx = [signature_form(raw, i, address_to_script(self.address), SIGHASH_ALL) + "01000000" for i in range(len(inputs))]
+        return {
+            "tx": {"inputs": [dict(item, addresses=[self.address]) for item in inputs]},
+            "tosign": [double_sha256(preimage) for preimage in tosign_tx],
+            "tosign_tx": tosign_tx,
+        }
+
+@override_settings(UTXO_INDEX_ENABLED=True, UTXO_SYNC_INTERVAL=30, UTXO_FEE_PER_BYTE={"doge": 1000})
+class GeneratedWalletSendTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        keys = derive_keys(MNEMONIC, [Symbols.BTC, Symbols.DODGE])
+        cls.btc_address, cls.btc_key = keys[Symbols.BTC]
+        cls.doge_address, cls.doge_key = keys[Symbols.DODGE]
+        cls.doge_recipient = DerivationContext(MNEMONIC).address_window(Symbols.DODGE, 0, 1, 1)[0]
+
+    def setUp(self):
+        self.blockcypher = FakeBlockCypher(self.doge_address, [("aa" * 32, 0, 50_000_000), ("bb" * 32, 1, 30_000_000), ("cc" * 32, 0, 1_000_000)])
+        for patcher in (mock.patch.object(utxo_index.http_client, "request", self.blockcypher), mock.patch.object(utxo_index, "get_api_key", lambda provider: "token")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_generated_doge_wallet_is_spent_from_the_index(self):
+        self.assertTrue(self.doge_address.startswith("D"))
+        tx_hash = utxo_index.spend_utxos("doge", self.doge_key, self.doge_address, self.doge_recipient, 60_000_000)
+        self.assertEqual(tx_hash, "relayed")
+        self.assertEqual(self.blockcypher.requests, [("GET", "addrs"), ("POST", "txs/new"), ("POST", "txs/send")])
+
+        relayed = self.blockcypher.relayed
+        # The two largest outputs cover the amount; every input is signed by the wallet's own key
+        self.assertEqual([item["prev_hash"] for item in relayed["tx"]["inputs"]], ["aa" * 32, "bb" * 32])
+        for tosign, signature, pubkey in zip(relayed["tosign"], relayed["signatures"], relayed["pubkeys"]):
+            self.assertTrue(PublicKey(bytes.fromhex(pubkey)).verify(bytes.fromhex(signature), bytes.fromhex(tosign), hasher=None))
+        self.assertEqual(list(UnspentOutput.objects.values_list("tx_hash", flat=True)), ["cc" * 32])
+
+    def test_send_doge_takes_the_index_path(self):
+        request = SendTransactionDTO(private_key=self.doge_key, amount=0.6, to_address=self.doge_recipient, from_address=self.doge_address, crypto_symbol="doge")
+        with mock.patch.object(send_doge.blockcypher, "get_address_overview") as overview:
+            self.assertEqual(send_doge.send_doge(request), "relayed")
+        overview.assert_called_once_with(address=self.doge_recipient, coin_symbol="doge")
+
+    def test_key_of_another_address_is_rejected_before_indexing(self):
+        with self.assertRaisesMessage(ValueError, "Private key does not match from_address"):
+            utxo_index.spend_utxos("doge", self.btc_key, self.doge_address, self.doge_recipient, 1_000_000)
+        self.assertEqual(self.blockcypher.requests, [])
+        self.assertFalse(UtxoSyncState.objects.exists())
+
+    def test_unsigned_transaction_paying_elsewhere_is_not_signed(self):
+        build = self.blockcypher.build
+        self.blockcypher.build = lambda skeleton, params: build(dict(skeleton, outputs=[{"addresses": [self.doge_address], "value": 60_000_000}]), params)
+        with self.assertRaisesMessage(Exception, "TX Verification Error"):
+            utxo_index.spend_utxos("doge", self.doge_key, self.doge_address, self.doge_recipient, 60_000_000)
+        self.assertIsNone(self.blockcypher.relayed)
+
+    def test_generated_btc_wallet_is_not_spent_from_the_index(self):
+        # Generated BTC wallets are P2WPKH, which the index cannot sign for
+        self.assertTrue(self.btc_address.startswith("bc1q"))
+        with self.assertRaisesMessage(ValueError, "does not support BTC"):
+            utxo_index.spend_utxos("btc", self.btc_key, self.btc_address, "bc1qrecipient", 1_000_000)
+        self.assertEqual(self.blockcypher.requests, [])
+
+        request = SendTransactionDTO(private_key=self.btc_key, amount=0.01, to_address="bc1qrecipient", from_address=self.btc_address)
+        with mock.patch.object(send_btc.blockcypher, "get_address_overview"), \
+                mock.patch.object(send_btc.blockcypher, "get_transaction_details"), \
+                mock.patch.object(send_btc.blockcypher, "simple_spend", return_value="simple") as simple_spend:
+            self.assertEqual(send_btc.send_btc(request), "simple")
+        simple_spend.assert_called_once()
+        self.assertEqual(self.blockcypher.requests, [])
+        self.assertFalse(UtxoSyncState.objects.exists())
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from tronpy import Tron
+from tronpy.keys import PrivateKey
+from tronpy.providers import HTTPProvider
+from django.conf import settings
+from helper import http_client
+
+# Process-wide Tron client and TronGrid REST reads. Transfers are built offline against a cached
+# reference block and signed locally, so a send costs a single broadcast round trip.
+
+USDT_TRC20_CONTRACT = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+class TronAccount(NamedTuple):
+    trx: float
+    usdt: float  # TRC20 USDT
+
+_client: Optional[Tron] = None
+_client_lock = threading.Lock()
+_ref_block: Tuple[Optional[str], float] = (None, 0.0)
+
+def get_tron() -> Tron:
+    """Return the shared Tron client, whose provider session keeps its connections between calls."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                provider = HTTPProvider(settings.TRON_API_URL, timeout=settings.HTTP_READ_TIMEOUT, api_key=settings.TRON_API_KEY)
+                host = urlsplit(settings.TRON_API_URL).netloc.lower()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.HTTP_POOL_SIZES.get(host, settings.HTTP_POOL_MAXSIZE))
+                provider.sess.mount("https://", adapter)
+                provider.sess.mount("http://", adapter)
+                _client = Tron(provider=provider)
+    return _client
+
+def get_ref_block_id() -> str:
+    """Latest solid block id, re-read at most once per TRON_REF_BLOCK_TTL (a reference block stays valid for hours)."""
+    global _ref_block
+    block_id, fetched_at = _ref_block
+    if block_id is None or time.time() - fetched_at > settings.TRON_REF_BLOCK_TTL:
+        block_id = get_tron().get_latest_solid_block_id()
+        _ref_block = (block_id, time.time())
+    return block_id
+
+def build_trx_transfer(private_key: str, to_address: str, amount_sun: int):
+    """Build and sign a TRX transfer without any network call; returns (sender address, signed transaction)."""
+    key = PrivateKey(bytes.fromhex(private_key))
+    sender = key.public_key.to_base58check_address()
+    txn = (
+        get_tron().trx.transfer(sender, to_address, amount_sun)
+        .build(offline=True, ref_block_id=get_ref_block_id())
+        .sign(key)
+    )
+    return sender, txn
+
+def broadcast(txn) -> dict:
+    return get_tron().broadcast(txn)
+
+def trongrid_get(path: str, params: Optional[Dict] = None) -> Dict:
+    headers = {"TRON-PRO-API-KEY": settings.TRON_API_KEY} if settings.TRON_API_KEY else None
+    response = http_client.get(f"{settings.TRON_API_URL.rstrip('/')}{path}", params=params, headers=headers)
+    if response.status_code != 200:
+        raise Exception(f"TronGrid request failed: {response.text}")
+    return response.json()
+
+def get_tron_account(address: str) -> TronAccount:
+    """TRX and TRC20 USDT balances of one address; lookup errors propagate."""
+    # One TronGrid account read carries both the TRX balance and every TRC20 balance
+    data = trongrid_get(f"/v1/accounts/{address}").get("data", [])
+    if not data:
+        return TronAccount(trx=0, usdt=0)  # Not activated on chain yet
+    account = data[0]
+    usdt = 0
+    for token in account.get("trc20", []):
+        if USDT_TRC20_CONTRACT in token:
+            usdt = int(token[USDT_TRC20_CONTRACT]) / 1e6
+    return TronAccount(trx=account.get("balance", 0) / 1e6, usdt=usdt)
+
+def get_tron_accounts(addresses: Iterable[str]) -> Dict[str, TronAccount]:
+    """TRX and TRC20 USDT balances for many addresses in one pass over the pooled connection."""
+    addresses = list(dict.fromkeys(addresses))
+    accounts: Dict[str, TronAccount] = {}
+    # A local pool, so this is safe to call from tasks already running on the shared executor
+    with ThreadPoolExecutor(max_workers=settings.TRON_READ_CONCURRENCY, thread_name_prefix="tron") as pool:
+        for address, future in [(address, pool.submit(get_tron_account, address)) for address in addresses]:
+            try:
+                accounts[address] = future.result()
+            except Exception as e:
+                print(f"Tron account lookup failed for {address}: {e}")
+    return accounts
+
+def get_transactions_page(address: str, limit: Optional[int] = None, fingerprint: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """One page of TronGrid account transactions and the fingerprint of the next page (None on the last one)."""
+    params = {"limit": limit or settings.TRONGRID_TX_LIMIT, "visible": "true"}
+    if fingerprint:
+        params["fingerprint"] = fingerprint
+    payload = trongrid_get(f"/v1/accounts/{address}/transactions", params)
+    return payload.get("data", []), payload.get("meta", {}).get("fingerprint")
+
+def _reset_after_fork():
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
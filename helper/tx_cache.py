@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from django.conf import settings
+from helper.tx_record import TxRecord
+
+# Permanent cache of parsed, finalized transactions. A finalized transaction never changes, so its
+# parsed TxRecord rows are kept in a bounded in-process LRU backed by an on-disk SQLite tier
+# shared by every worker. Entries are keyed by (chain, tx hash, address): the hash identifies the
+# content and the address only fixes the sent/received perspective the rows were parsed from.
+# Transactions that parse to no rows are cached as an empty list so they are not fetched again.
+# Only Solana fetches transactions one by one, and it reports finality itself (confirmationStatus).
+
+_memory: "OrderedDict[str, List[TxRecord]]" = OrderedDict()
+_memory_lock = threading.Lock()
+_local = threading.local()
+
+def _key(chain: str, tx_hash: str, address: str) -> str:
+    return f"{chain}:{tx_hash}:{address}"
+
+def _db() -> sqlite3.Connection:
+    # One connection per thread, reopened after a fork
+    if getattr(_local, "pid", None) != os.getpid():
+        conn = sqlite3.connect(settings.TX_CACHE_PATH, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS finalized_tx (key TEXT PRIMARY KEY, rows TEXT NOT NULL)")
+        _local.conn, _local.pid = conn, os.getpid()
+    return _local.conn
+
+def _remember(key: str, rows: List[TxRecord]):
+    with _memory_lock:
+        _memory[key] = rows
+        _memory.move_to_end(key)
+        while len(_memory) > settings.TX_CACHE_MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+def get(chain: str, tx_hash: str, address: str) -> Optional[List[TxRecord]]:
+    """Cached rows for a finalized transaction, or None when it has not been cached yet."""
+    key = _key(chain, tx_hash, address)
+    with _memory_lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    try:
+        found = _db().execute("SELECT rows FROM finalized_tx WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"Transaction cache read failed: {e}")
+        return None
+    if found is None:
+        return None
+    rows = [TxRecord(**row) for row in json.loads(found[0])]
+    _remember(key, rows)
+    return rows
+
+def put(chain: str, tx_hash: str, address: str, rows: List[TxRecord]):
+    """Cache the parsed rows of a transaction the caller has checked to be final."""
+    key = _key(chain, tx_hash, address)
+    _remember(key, rows)
+    try:
+        conn = _db()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO finalized_tx (key, rows) VALUES (?, ?)",
+                (key, json.dumps([row.as_dict() for row in rows])),
+            )
+    except sqlite3.Error as e:
+        print(f"Transaction cache write failed: {e}")
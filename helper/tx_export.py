@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from typing import Iterator, List
+from django.conf import settings
+from helper.pagination import TransactionPage
+from helper.tx_store import SCAN_SOURCES, get_history_page, scan_page, split_scan_page
+from helper.tx_record import TxRecord
+from home.wallet_schema import Symbols
+
+# Full-history export. Pages are pulled one at a time (from the local store when it is enabled) and
+# written out as they arrive, so memory stays bounded by one page whatever the history length.
+# Etherscan-style explorers stop serving page numbers at 10,000 rows, so without the store their
+# histories are walked by block range instead, always asking for the first page below `endblock`.
+
+CSV_FIELDS = ["hash", "transaction_type", "amount", "timestamp", "hashUrl"]
+
+def _iter_scan_pages(symbol: Symbols, address: str) -> Iterator[TransactionPage]:
+    end_block = None
+    while True:
+        rows, next_page, parser = scan_page(symbol, address, 1, "desc", settings.TRANSACTION_PAGE_MAX_LIMIT, **({"endblock": end_block} if end_block is not None else {}))
+        rows, end_block = split_scan_page(rows, next_page)
+        yield TransactionPage(parser(rows, address))
+        if end_block is None:
+            return
+
+def iter_transaction_pages(symbol: Symbols, address: str) -> Iterator[TransactionPage]:
+    if symbol in SCAN_SOURCES and not settings.TX_STORE_ENABLED:
+        yield from _iter_scan_pages(symbol, address)
+        return
+    cursor = None
+    while True:
+        page = get_history_page(symbol, address, settings.TRANSACTION_PAGE_MAX_LIMIT, cursor)
+        yield page
+        cursor = page.next_cursor
+        if cursor is None:
+            return
+
+def _ndjson_rows(page: List[TxRecord]) -> str:
+    return "".join(json.dumps(tx.as_dict()) + "\n" for tx in page)
+
+def _csv_rows(page: List[TxRecord]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for tx in page:
+        writer.writerow([tx.hash, tx.transaction_type.value, tx.amount, tx.timestamp, tx.hashUrl])
+    return buffer.getvalue()
+
+def _csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_FIELDS)
+    return buffer.getvalue()
+
+# format -> (content type, page writer, header)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", _ndjson_rows, ""),
+    "csv": ("text/csv", _csv_rows, _csv_header()),
+}
+
+def export_rows(symbol: Symbols, address: str, fmt: str) -> Iterator[str]:
+    """
+    Chunks of the full history in `fmt`. The first page is fetched before anything is yielded, so
+    upstream errors surface before a response starts. A later failure is re-raised so the server
+    aborts the chunked response and a truncated export never looks complete; NDJSON streams get an
+    {"error": ...} line first.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    _, write_page, header = EXPORT_FORMATS[fmt]
+    pages = iter_transaction_pages(symbol, address)
+    first_page = next(pages)
+
+    def stream():
+        if header:
+            yield header
+        yield write_page(first_page)
+        try:
+            for page in pages:
+                yield write_page(page)
+        except Exception as e:
+            print(f"Transaction export for {symbol.value} {address} stopped: {e}")
+            if fmt == "ndjson":
+                yield json.dumps({"error": str(e)}) + "\n"
+            raise
+
+    return stream()
@@ -0,0 +1,48 @@
+from typing import Any, Dict
+from ninja.renderers import JSONRenderer
+from ninja.responses import NinjaJSONEncoder
+from home.wallet_schema import Symbols, TransactionType
+
+# Parsed history rows. Histories are built by our own parsers, so rows skip pydantic validation:
+# TxRecord is a plain slotted object with the fields (and constructor) of TransactionsInfo, and
+# the API renderer writes it to JSON directly. TransactionsInfo stays the documented response schema.
+
+class TxRecord:
+    __slots__ = ("hash", "hashUrl", "transaction_type", "amount", "timestamp")
+
+    def __init__(self, hash: str, hashUrl: str, transaction_type, amount, timestamp):
+        self.hash = hash
+        self.hashUrl = hashUrl
+        self.transaction_type = TransactionType(transaction_type)
+        self.amount = float(amount)
+        self.timestamp = timestamp if isinstance(timestamp, str) else str(timestamp)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"hash": self.hash, "transaction_type": self.transaction_type.value, "amount": self.amount, "timestamp": self.timestamp, "hashUrl": self.hashUrl}
+
+    def __eq__(self, other):
+        return isinstance(other, TxRecord) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return f"TxRecord({self.as_dict()!r})"
+
+class ActivityRecord(TxRecord):
+    """A TxRecord tagged with the (symbol, address) whose history it came from."""
+    __slots__ = ("symbol", "address")
+
+    def __init__(self, record: TxRecord, symbol: Symbols, address: str):
+        super().__init__(record.hash, record.hashUrl, record.transaction_type, record.amount, record.timestamp)
+        self.symbol = symbol
+        self.address = address
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**super().as_dict(), "symbol": self.symbol.value, "address": self.address}
+
+class RecordJSONEncoder(NinjaJSONEncoder):
+    def default(self, o: Any) -> Any:
+        if isinstance(o, TxRecord):
+            return o.as_dict()
+        return super().default(o)
+
+class RecordJSONRenderer(JSONRenderer):
+    encoder_class = RecordJSONEncoder
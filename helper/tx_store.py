@@ -0,0 +1,248 @@
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from helper.api_keys import get_api_key
+from helper.pagination import TransactionPage, decode_cursor, encode_cursor, page_limit
+from helper.wallet_transaction import TRANSACTION_PAGE_HANDLERS, get_scan_page, get_transactions_page, parse_bscscan_transactions, parse_etherscan_transactions
+from helper.web3_registry import USDT_BEP20_CONTRACT
+from helper.tx_record import TxRecord
+from home.wallet_schema import Symbols
+from wallet.models import ChainTransaction, TransactionSyncState
+
+# Local, indexed transaction history. Each (chain, address) is synced in two directions:
+# the head (new transactions since the last sync) and a backfill towards the oldest transaction,
+# advanced one page at a time only when a client pages past what is stored. Reads are served
+# from ChainTransaction with keyset range queries on (timestamp, id).
+
+# Etherscan-style explorers expose block numbers, so their head sync asks only for startblock=last+1
+SCAN_SOURCES = {
+    Symbols.ETH: ("https://api.etherscan.io/api", "etherscan", {"module": "account", "action": "txlist"}, parse_etherscan_transactions),
+    Symbols.BNB: ("https://api.bscscan.com/api", "bscscan", {"module": "account", "action": "txlist"}, parse_bscscan_transactions),
+    Symbols.USDT: ("https://api.bscscan.com/api", "bscscan", {"module": "account", "action": "tokentx", "contractaddress": USDT_BEP20_CONTRACT}, parse_bscscan_transactions),
+}
+
+def to_epoch_seconds(value) -> Optional[int]:
+    """Normalize the timestamp formats the history APIs use (unix seconds or ms, ISO 8601) to unix seconds."""
+    if value in (None, "", "None"):
+        return None
+    try:
+        number = int(float(value))
+        return number // 1000 if number > 10**11 else number
+    except (TypeError, ValueError):
+        pass
+    try:
+        text = str(value).replace("Z", "+00:00")
+        # BlockCypher may report more fractional digits than datetime accepts
+        if "." in text:
+            head, _, tail = text.partition(".")
+            digits = "".join(ch for ch in tail if ch.isdigit())
+            text = f"{head}.{digits[:6]}{tail[len(digits):]}"
+        return int(datetime.fromisoformat(text).timestamp())
+    except ValueError:
+        return None
+
+def _store_address(symbol: Symbols, address: str) -> str:
+    return address.lower() if symbol in SCAN_SOURCES else address
+
+def record_transactions(symbol: Symbols, address: str, transactions: Iterable[TxRecord], blocks: Optional[Dict[str, int]] = None) -> int:
+    """
+    Persist fetched transactions; rows already stored are ignored. Returns how many were offered.
+    A BTC/DOGE transaction has a row per input or output of the address, numbered in upstream order;
+    a transaction never straddles two pages, so its rows always arrive together.
+    """
+    positions = Counter()
+    rows = []
+    for tx in transactions:
+        position = positions[tx.hash, tx.transaction_type]
+        positions[tx.hash, tx.transaction_type] += 1
+        rows.append(ChainTransaction(
+            chain=symbol.value,
+            address=_store_address(symbol, address),
+            tx_hash=tx.hash,
+            transaction_type=tx.transaction_type.value,
+            position=position,
+            block_number=(blocks or {}).get(tx.hash),
+            timestamp=to_epoch_seconds(tx.timestamp) or 0,
+            raw_timestamp=str(tx.timestamp or ""),
+            amount=Decimal(str(tx.amount)),
+            hash_url=tx.hashUrl or "",
+        ))
+    ChainTransaction.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+def _known_hashes(symbol: Symbols, address: str, hashes: List[str]) -> set:
+    return set(ChainTransaction.objects.filter(chain=symbol.value, address=_store_address(symbol, address), tx_hash__in=hashes).values_list("tx_hash", flat=True))
+
+def scan_page(symbol: Symbols, address: str, page: int, sort: str, limit: Optional[int] = None, **block_range):
+    base_url, provider, params, parser = SCAN_SOURCES[symbol]
+    rows, next_page = get_scan_page(base_url, get_api_key(provider), dict(params, address=address, **block_range), page, limit or settings.TX_SYNC_PAGE_SIZE, sort)
+    return rows, next_page, parser
+
+def split_scan_page(rows: List[Dict], next_page: Optional[int]):
+    """
+    The rows of a newest-first page to keep and the `endblock` of the next page (None on the last).
+    A full page may stop part-way through its lowest block, so that block is kept for the next page.
+    """
+    if next_page is None:
+        return rows, None
+    lowest = min(int(tx["blockNumber"]) for tx in rows)
+    complete_rows = [tx for tx in rows if int(tx["blockNumber"]) > lowest]
+    if complete_rows:
+        return complete_rows, lowest
+    # A single block fills the whole page: the rest of it is out of reach
+    return rows, lowest - 1
+
+def _sync_scan_head(symbol: Symbols, address: str, state: TransactionSyncState):
+    """Pull everything after the last stored block, oldest first."""
+    start_block, page = state.last_block + 1, 1
+    for _ in range(settings.TX_SYNC_MAX_PAGES):
+        rows, next_page, parser = scan_page(symbol, address, page, "asc", startblock=start_block)
+        record_transactions(symbol, address, parser(rows, address), {tx["hash"]: int(tx["blockNumber"]) for tx in rows})
+        if rows:
+            # A full page may stop part-way through its highest block: only the blocks below it are complete
+            highest = max(int(tx["blockNumber"]) for tx in rows)
+            state.last_block = max(state.last_block, highest if next_page is None else highest - 1)
+        if next_page is None:
+            break
+        page = next_page
+
+def _backfill_scan(symbol: Symbols, address: str, state: TransactionSyncState):
+    """Store the next older page, newest first, bounded by the lowest block stored so far."""
+    end_block = json.loads(state.backfill_cursor) if state.backfill_cursor else None
+    rows, next_page, parser = scan_page(symbol, address, 1, "desc", **({"endblock": end_block} if end_block is not None else {}))
+    blocks = {tx["hash"]: int(tx["blockNumber"]) for tx in rows}
+    if rows and state.last_block is None:
+        state.last_block = max(blocks.values())
+    rows, end_block = split_scan_page(rows, next_page)
+    if end_block is None:
+        state.backfill_complete = True
+    else:
+        state.backfill_cursor = json.dumps(end_block)
+    record_transactions(symbol, address, parser(rows, address), blocks)
+
+def _walk_paged(symbol: Symbols, address: str, position, pages: int):
+    """
+    Store pages from `position` until one contains an already stored transaction or history ends.
+    Returns where to continue (None once the walk is done), how many of `pages` are left and the
+    upstream error that stopped the walk, if any.
+    """
+    while pages:
+        try:
+            transactions, next_position = TRANSACTION_PAGE_HANDLERS[symbol](address, settings.TX_SYNC_PAGE_SIZE, position)
+        except Exception as e:
+            return position, 0, e
+        known = _known_hashes(symbol, address, [tx.hash for tx in transactions])
+        record_transactions(symbol, address, transactions)
+        pages -= 1
+        if known or next_position is None:
+            return None, pages, None
+        position = next_position
+    return position, pages, None
+
+def _sync_paged_head(symbol: Symbols, address: str, state: TransactionSyncState):
+    """
+    Walk from the newest page until a page contains an already stored transaction. A walk that runs
+    out of TX_SYNC_MAX_PAGES first leaves its position in head_gaps, and later syncs continue it with
+    the pages the head walk leaves over, until it reaches what was stored before.
+    """
+    if state.synced_at is None and not state.backfill_cursor:
+        # The first head page doubles as the start of the backfill
+        transactions, next_position = TRANSACTION_PAGE_HANDLERS[symbol](address, settings.TX_SYNC_PAGE_SIZE, None)
+        record_transactions(symbol, address, transactions)
+        state.backfill_cursor = json.dumps(next_position) if next_position is not None else None
+        state.backfill_complete = next_position is None
+        return
+    position, pages, error = _walk_paged(symbol, address, None, settings.TX_SYNC_MAX_PAGES)
+    gaps = [position] if position is not None else []
+    for position in json.loads(state.head_gaps) if state.head_gaps else []:
+        if pages:
+            position, pages, error = _walk_paged(symbol, address, position, pages)
+        if position is not None:
+            gaps.append(position)
+    state.head_gaps = json.dumps(gaps) if gaps else None
+    if error is not None:
+        # A failed sync is not saved, but the rows stored so far would stop the next head walk early
+        TransactionSyncState.objects.filter(pk=state.pk).update(head_gaps=state.head_gaps)
+        raise error
+
+def _backfill_paged(symbol: Symbols, address: str, state: TransactionSyncState):
+    position = json.loads(state.backfill_cursor) if state.backfill_cursor else None
+    transactions, next_position = TRANSACTION_PAGE_HANDLERS[symbol](address, settings.TX_SYNC_PAGE_SIZE, position)
+    record_transactions(symbol, address, transactions)
+    state.backfill_cursor = json.dumps(next_position) if next_position is not None else None
+    state.backfill_complete = next_position is None
+
+def sync_head(symbol: Symbols, address: str, state: TransactionSyncState):
+    if symbol in SCAN_SOURCES:
+        if state.last_block is None:
+            _backfill_scan(symbol, address, state)
+        else:
+            _sync_scan_head(symbol, address, state)
+    else:
+        _sync_paged_head(symbol, address, state)
+    state.synced_at = timezone.now()
+    state.save()
+
+def backfill(symbol: Symbols, address: str, state: TransactionSyncState):
+    if symbol in SCAN_SOURCES:
+        _backfill_scan(symbol, address, state)
+    else:
+        _backfill_paged(symbol, address, state)
+    state.save()
+
+def _to_record(row: ChainTransaction) -> TxRecord:
+    return TxRecord(hash=row.tx_hash, hashUrl=row.hash_url, transaction_type=row.transaction_type, amount=row.amount, timestamp=row.raw_timestamp)
+
+def get_stored_transactions_page(symbol: Symbols, address: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> TransactionPage:
+    """
+    A page of history served from the local store. The head is synced at most once per TX_SYNC_INTERVAL,
+    and older pages are backfilled from upstream only when the store runs out before `limit` rows.
+    """
+    if symbol not in TRANSACTION_PAGE_HANDLERS:
+        raise ValueError(f"Transaction history is not supported for {symbol}")
+    limit = page_limit(limit)
+    cursor_chain = f"store:{symbol.value}"
+    position = decode_cursor(cursor_chain, cursor)
+
+    state, _ = TransactionSyncState.objects.get_or_create(chain=symbol.value, address=_store_address(symbol, address))
+    if state.synced_at is None or timezone.now() - state.synced_at > timedelta(seconds=settings.TX_SYNC_INTERVAL):
+        try:
+            sync_head(symbol, address, state)
+        except Exception as e:
+            if state.synced_at is None:
+                raise
+            # Upstream trouble: serve what is stored, the head is retried on the next request
+            print(f"Transaction sync failed for {symbol.value} {address}, serving stored rows: {e}")
+            state.refresh_from_db()
+
+    query = ChainTransaction.objects.filter(chain=symbol.value, address=_store_address(symbol, address)).order_by("-timestamp", "-id")
+    if position is not None:
+        timestamp, row_id = position
+        query = query.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=row_id))
+
+    rows = list(query[:limit + 1])
+    for _ in range(settings.TX_SYNC_MAX_PAGES):
+        if len(rows) > limit or state.backfill_complete:
+            break
+        try:
+            backfill(symbol, address, state)
+        except Exception as e:
+            if not rows:
+                raise
+            print(f"Transaction backfill failed for {symbol.value} {address}, serving stored rows: {e}")
+            state.refresh_from_db()
+            break
+        rows = list(query[:limit + 1])
+
+    next_cursor = encode_cursor(cursor_chain, [rows[limit - 1].timestamp, rows[limit - 1].id]) if len(rows) > limit else None
+    return TransactionPage([_to_record(row) for row in rows[:limit]], next_cursor=next_cursor)
+
+def get_history_page(symbol: Symbols, address: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> TransactionPage:
+    """A page of history from the local store when TX_STORE_ENABLED, otherwise straight from upstream."""
+    fetch_page = get_stored_transactions_page if settings.TX_STORE_ENABLED else get_transactions_page
+    return fetch_page(symbol, address, limit, cursor)
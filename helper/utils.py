@@ -4,10 +4,9 @@ from google.oauth2 import id_token
 from ninja_jwt.tokens import RefreshToken
 from helper.helper import decrypt, encrypt
 from wallet.models import Wallets
-from web3 import Web3
+from helper.web3_registry import get_web3
 from eth_account import Account
 from mnemonic import Mnemonic
-from django.conf import settings
 
 def create_jwt_token(user) -> dict:
     tokens = RefreshToken.for_user(user)
@@ -24,11 +23,8 @@ class Google:
         except:
             return "Token is not verified"
 
-infura_url = 'https://mainnet.infura.io/v3/'+settings.INFURA
-# infura_url = 'HTTP://127.0.0.1:7545'
-web3 = Web3(Web3.HTTPProvider(infura_url))
-
 def generate_user_wallet_address(user):
+    web3 = get_web3("ETH")
     mnemo = Mnemonic("english")
     phrase = mnemo.generate(strength=256)
     print(phrase)
@@ -0,0 +1,179 @@
+import operator
+from datetime import timedelta
+from functools import reduce
+from typing import Dict, List, Optional, Tuple
+from bitcoin import compress, privkey_to_pubkey, pubkey_to_address
+from blockcypher import make_tx_signatures, verify_unsigned_tx
+from blockcypher.constants import COIN_SYMBOL_MAPPINGS
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from helper import http_client
+from helper.api_keys import get_api_key
+from wallet.models import UnspentOutput, UtxoSyncState
+
+# Local UTXO set per DOGE address this service sends from. An address joins the index on its
+# first send; balance reads only use the index for addresses already in it, so polled and imported
+# addresses never trigger a sync. A sync asks BlockCypher only for unspent outputs confirmed above
+# the last synced height (unspentOnly + after); the address totals in the same response tell whether
+# any stored output was spent elsewhere, in which case the set is rebuilt. Coin selection then reads
+# the local set, and a send costs BlockCypher two calls: building the transaction from the chosen
+# inputs and relaying the locally signed result.
+#
+# The balance is BlockCypher's final_balance as of the last sync (confirmed plus unconfirmed, net of
+# pending spends), the same figure the non-indexed path returns. Only confirmed outputs are spent.
+#
+# Inputs are signed as P2PKH, like blockcypher.simple_spend. The BTC wallets this service derives
+# are P2WPKH (m/84', bech32), so BTC stays on the simple_spend path and only DOGE is indexed.
+
+BLOCKCYPHER_ADDRS_LIMIT = 2000  # Most txrefs BlockCypher returns per /addrs page
+FEE_PREFERENCE = "high"  # As blockcypher.simple_spend
+UTXO_COINS = ("doge",)
+
+def _coin(coin) -> str:
+    return getattr(coin, "value", coin)
+
+def _blockcypher(method: str, path: str, **kwargs) -> Dict:
+    token = get_api_key("blockcypher")
+    params = dict(kwargs.pop("params", None) or {}, **({"token": token} if token else {}))
+    data = http_client.request(method, f"https://api.blockcypher.com/v1/{path}", params=params, **kwargs).json()
+    if data.get("error") or data.get("errors"):
+        raise Exception(f"BlockCypher error: {data.get('error') or data.get('errors')}")
+    return data
+
+def _fetch_unspent(coin: str, address: str, after: Optional[int]) -> Tuple[List[Dict], List[Dict], Dict]:
+    """
+    Confirmed unspent txrefs above `after` (every page), unconfirmed outputs, and the address totals.
+    `before` is exclusive and a page may stop part-way through its lowest block, so that block is
+    left out and requested again, whole, as the start of the next page (as split_blockcypher_page).
+    """
+    confirmed: Dict[Tuple[str, int], Dict] = {}
+    first, before = None, None
+    while True:
+        params = {"unspentOnly": "true", "limit": BLOCKCYPHER_ADDRS_LIMIT}
+        if after is not None:
+            params["after"] = after
+        if before is not None:
+            params["before"] = before
+        data = _blockcypher("GET", f"{coin}/main/addrs/{address}", params=params)
+        first = first or data
+        page = data.get("txrefs", [])
+        if not data.get("hasMore") or not page:
+            keep, before = page, None
+        else:
+            lowest = min(ref["block_height"] for ref in page)
+            keep = [ref for ref in page if ref["block_height"] != lowest]
+            # A single block filling the whole page: the rest of it is out of reach
+            keep, before = (keep, lowest + 1) if keep else (page, lowest)
+        confirmed.update({(ref["tx_hash"], ref.get("tx_output_n", -1)): ref for ref in keep})
+        if before is None:
+            break
+    unconfirmed = [ref for ref in first.get("unconfirmed_txrefs", []) if ref.get("tx_output_n", -1) >= 0 and not ref.get("spent")]
+    return list(confirmed.values()), unconfirmed, first
+
+def _outputs(coin: str, address: str, refs: List[Dict], confirmed: bool) -> List[UnspentOutput]:
+    return [
+        UnspentOutput(chain=coin, address=address, tx_hash=ref["tx_hash"], output_index=ref["tx_output_n"], value=ref["value"], block_height=ref["block_height"] if confirmed else -1)
+        for ref in refs
+        if ref.get("tx_output_n", -1) >= 0
+    ]
+
+def sync_utxos(coin, address: str) -> UtxoSyncState:
+    coin = _coin(coin)
+    state, _ = UtxoSyncState.objects.get_or_create(chain=coin, address=address)
+    full = state.last_height is None
+    confirmed, unconfirmed, totals = _fetch_unspent(coin, address, state.last_height)
+    owned = UnspentOutput.objects.filter(chain=coin, address=address)
+
+    with transaction.atomic():
+        # Unconfirmed outputs are replaced on every sync; confirmed ones come back through `after`
+        owned.filter(block_height=-1).delete()
+        if full:
+            owned.delete()
+        UnspentOutput.objects.bulk_create(_outputs(coin, address, confirmed, True) + _outputs(coin, address, unconfirmed, False), ignore_conflicts=True)
+        state.last_height = max([ref["block_height"] for ref in confirmed] + [state.last_height or 0])
+
+        # final_balance nets pending spends and receipts, as the local set does once our own sends are removed
+        stored = owned.aggregate(total=Sum("value"))["total"] or 0
+        if not full and stored != totals.get("final_balance", stored):
+            # Something we hold was spent outside this service: rebuild the set from scratch
+            print(f"UTXO set of {coin} {address} out of step ({stored} != {totals.get('final_balance')}), resyncing")
+            confirmed, unconfirmed, totals = _fetch_unspent(coin, address, None)
+            owned.delete()
+            UnspentOutput.objects.bulk_create(_outputs(coin, address, confirmed, True) + _outputs(coin, address, unconfirmed, False), ignore_conflicts=True)
+            state.last_height = max([ref["block_height"] for ref in confirmed] + [0])
+        state.final_balance = totals.get("final_balance", stored)
+        state.synced_at = timezone.now()
+        state.save()
+    return state
+
+def _synced_state(coin: str, address: str) -> UtxoSyncState:
+    """The address's sync state, synced first when older than UTXO_SYNC_INTERVAL."""
+    state = UtxoSyncState.objects.filter(chain=coin, address=address).first()
+    if state is None or state.synced_at is None or timezone.now() - state.synced_at > timedelta(seconds=settings.UTXO_SYNC_INTERVAL):
+        state = sync_utxos(coin, address)
+    return state
+
+def is_indexed(coin, address: str) -> bool:
+    """Whether the address has been sent from, and so has a local UTXO set."""
+    return UtxoSyncState.objects.filter(chain=_coin(coin), address=address).exists()
+
+def get_utxos(coin, address: str) -> List[UnspentOutput]:
+    coin = _coin(coin)
+    _synced_state(coin, address)
+    return list(UnspentOutput.objects.filter(chain=coin, address=address))
+
+def get_utxo_balance(coin, address: str) -> float:
+    """BlockCypher's final_balance at the last sync, in whole coins."""
+    return _synced_state(_coin(coin), address).final_balance / 1e8
+
+def select_utxos(coin, utxos: List[UnspentOutput], amount: int) -> List[UnspentOutput]:
+    """
+    Largest-first selection of confirmed outputs covering `amount` plus an estimated fee. Unconfirmed
+    outputs count towards the balance but are not spent. The estimate only decides how many inputs
+    to use; BlockCypher sets the real fee and returns the rest as change.
+    """
+    fee_per_byte = settings.UTXO_FEE_PER_BYTE[_coin(coin)]
+    selected, total = [], 0
+    for output in sorted((u for u in utxos if u.block_height >= 0), key=lambda u: u.value, reverse=True):
+        selected.append(output)
+        total += output.value
+        # P2PKH size: ~148 bytes per input, 34 per output (payment and change), 10 overhead
+        if total >= amount + (10 + 148 * len(selected) + 34 * 2) * fee_per_byte:
+            return selected
+    raise ValueError(f"Insufficient confirmed {_coin(coin).upper()} to send {amount / 1e8}")
+
+def spend_utxos(coin, private_key: str, from_address: str, to_address: str, amount: int) -> str:
+    """Send `amount` satoshis using inputs picked from the local index; returns the transaction hash."""
+    coin = _coin(coin)
+    if coin not in UTXO_COINS:
+        raise ValueError(f"The UTXO index does not support {coin.upper()}")
+    # Checked before the address joins the index: the key signs every input taken from it
+    public_key = compress(privkey_to_pubkey(private_key))
+    if pubkey_to_address(public_key, magicbyte=COIN_SYMBOL_MAPPINGS[coin]["vbyte_pubkey"]) != from_address:
+        raise ValueError("Private key does not match from_address")
+    inputs = select_utxos(coin, get_utxos(coin, from_address), amount)
+    skeleton = {
+        "inputs": [{"prev_hash": output.tx_hash, "output_index": output.output_index} for output in inputs],
+        "outputs": [{"addresses": [to_address], "value": amount}],
+        "change_address": from_address,
+        "preference": FEE_PREFERENCE,
+    }
+    unsigned = _blockcypher("POST", f"{coin}/main/txs/new", params={"includeToSignTx": "true"}, json=skeleton)
+    # As simple_spend: the hashes to sign must come from a transaction paying exactly what was asked
+    verified, error = verify_unsigned_tx(unsigned_tx=unsigned, outputs=[{"address": to_address, "value": amount}], change_address=from_address, coin_symbol=coin)
+    if not verified:
+        raise Exception(f"TX Verification Error: {error}")
+
+    # Signed locally; the private key never leaves this process
+    count = len(unsigned["tosign"])
+    signatures = make_tx_signatures(txs_to_sign=unsigned["tosign"], privkey_list=[private_key] * count, pubkey_list=[public_key] * count)
+    sent = _blockcypher("POST", f"{coin}/main/txs/send", json={**unsigned, "signatures": signatures, "pubkeys": [public_key] * count})
+
+    # The inputs are gone; the change output comes back as unconfirmed on the next sync
+    spent = [Q(tx_hash=item["prev_hash"], output_index=item["output_index"]) for item in sent["tx"].get("inputs", [])]
+    if spent:
+        UnspentOutput.objects.filter(reduce(operator.or_, spent), chain=coin).delete()
+    UtxoSyncState.objects.filter(chain=coin, address=from_address).update(synced_at=None)
+    return sent["tx"]["hash"]
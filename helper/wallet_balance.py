@@ -1,41 +1,41 @@
-import requests
+from functools import partial
+from helper import http_client
+from helper.api_keys import get_api_key
+from helper.concurrency import TaskOutcome
+from helper.single_flight import single_flight
+from helper.evm_multicall import BalanceCall, get_evm_balances, get_transaction_counts
+from helper.solana_rpc import get_sol_balances as get_sol_lamports, get_sol_used
+from helper.tron_client import get_tron_account, get_tron_accounts
+from helper.utxo_index import get_utxo_balance, is_indexed
+from helper.web3_registry import USDT_BEP20_CONTRACT, WDODGE_CONTRACT, get_contract, get_web3
 from django.conf import settings
 from web3 import Web3
 from xrpl.clients import JsonRpcClient
 from xrpl.account import get_balance
-from tronpy import Tron
+from home.wallet_schema import Symbols
 
 # Get wallet balance of each coin
 
 # BTC
 
+@single_flight
 def get_btc_balance_and_history(address):
-    api_url = f"https://api.blockcypher.com/v1/btc/main/addrs/{address}/full"
-    response = requests.get(api_url)
-    data = response.json()
-    balance = data.get("final_balance", 0) / 1e8  # Convert satoshis to BTC
+    # The light /balance endpoint; /full would also download the whole transaction list
+    summary = _get_blockcypher_summaries("btc", [address]).get(address, {})
+    balance = summary.get("final_balance", 0) / 1e8  # Convert satoshis to BTC
     return balance
 
+@single_flight
 def get_eth_balance_and_history(address):
-    
-    infura_url = 'https://mainnet.infura.io/v3/'+settings.INFURA
-    # infura_url = 'HTTP://127.0.0.1:7545'
-    web3 = Web3(Web3.HTTPProvider(infura_url))
-    balance = web3.eth.get_balance(address)
+    balance = get_web3("ETH").eth.get_balance(address)
     return int(balance) / 1e18
 
+@single_flight
 def get_sol_balance_and_history(address):
-    # Get balance
-    payload_balance = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getBalance",
-        "params": [address]
-    }
-    balance_response = requests.post("https://api.mainnet-beta.solana.com", json=payload_balance)
-    print(balance_response.json())
-    balance = balance_response.json()["result"]["value"] / 1e9  # Convert lamports to SOL
-    return balance
+    balances = get_sol_lamports([address])
+    if address not in balances:
+        raise ValueError(f"Invalid Solana address: {address}")
+    return balances[address] / 1e9  # Convert lamports to SOL
 
 
 def get_xrp_balance_and_history(address):
@@ -49,10 +49,11 @@ def get_xrp_balance_and_history(address):
 
     return balance
 
+@single_flight
 def get_bnb_balance_and_history(address):
     try:
-        balance_url = f"https://api.bscscan.com/api?module=account&action=balance&address={address}&apikey={settings.BNB_API_KEY}"
-        balance_response = requests.get(balance_url)
+        balance_url = f"https://api.bscscan.com/api?module=account&action=balance&address={address}&apikey={get_api_key('bscscan')}"
+        balance_response = http_client.get(balance_url)
         response_data = balance_response.json()
 
         # Check API response status
@@ -69,38 +70,23 @@ def get_bnb_balance_and_history(address):
         print(f"Balance retrieval error: {e}")
         return 0
 
+@single_flight
 def get_dodge_balance(address):
-  response = requests.get(f"https://api.blockcypher.com/v1/doge/main/addrs/{address}/full")
-  data = response.json()
-  balance = data.get("final_balance", 0) / 1e8  # Convert satoshis to BTC
+  if settings.UTXO_INDEX_ENABLED and is_indexed("doge", address):
+    return get_utxo_balance("doge", address)
+  summary = _get_blockcypher_summaries("doge", [address]).get(address, {})
+  balance = summary.get("final_balance", 0) / 1e8  # Convert satoshis to DOGE
   return balance
 
+@single_flight
 def get_wdodge_balance(address):
     """
     Get WDODGE (Wrapped Dogecoin) balance for an address
     WDODGE is an ERC-20 token on Ethereum (and potentially other EVM chains)
     """
     try:
-        # Initialize Web3
-        infura_url = 'https://mainnet.infura.io/v3/'+settings.INFURA
-        web3 = Web3(Web3.HTTPProvider(infura_url))
-        
         # WDODGE contract address (mainnet example - verify actual address)
-        WDODGE_CONTRACT = Web3.to_checksum_address("0x7B4328c127B85369D9f82ca0503B000D09CF9180")
-        
-        # ERC-20 ABI (simplified for balance check)
-        ERC20_ABI = [
-            {
-                "constant": True,
-                "inputs": [{"name": "_owner", "type": "address"}],
-                "name": "balanceOf",
-                "outputs": [{"name": "balance", "type": "uint256"}],
-                "type": "function"
-            }
-        ]
-        
-        # Create contract instance
-        contract = web3.eth.contract(address=WDODGE_CONTRACT, abi=ERC20_ABI)
+        contract = get_contract("ETH", WDODGE_CONTRACT)
         
         # Get balance (in smallest units)
         balance = contract.functions.balanceOf(Web3.to_checksum_address(address)).call()
@@ -112,45 +98,210 @@ def get_wdodge_balance(address):
         print(f"Error fetching WDODGE balance: {e}")
         return 0
 
+@single_flight
 def get_tron_balance(address):
-  client = Tron()
-
-  balance = client.get_account_balance(address)
-  return balance
+  return get_tron_account(address).trx
 
 # def get_usdt_balance(address):
 #     url = f"https://api.bscscan.com/api?module=account&action=balance&contractaddress=0xdAC17F958D2ee523a2206206994597C13D831ec7&address={address}&apikey={settings.BNB_API_KEY}"
 #     response = requests.get(url)
 #     return int(response.json()["result"]) / 1e6  # Assuming 6 decimals for USDT
 
+@single_flight
 def get_usdt_balance(address):
-    # Connect to BSC node
-    rpc_url = 'https://bsc-dataseed.binance.org/'  # Binance Smart Chain mainnet
-    web3 = Web3(Web3.HTTPProvider(rpc_url))
-
     # Ensure the address is checksummed
     checksum_address = Web3.to_checksum_address(address)
 
-    # USDT BEP20 Contract address (BSC)
-    usdt_bep20_contract = "0x55d398326f99059fF775485246999027B3197955"
-
-    # Minimal ABI for balanceOf
-    abi = [
-        {
-            "constant": True,
-            "inputs": [{"name": "_owner", "type": "address"}],
-            "name": "balanceOf",
-            "outputs": [{"name": "balance", "type": "uint256"}],
-            "type": "function"
-        }
-    ]
-
-    # Create contract instance
-    token_contract = web3.eth.contract(address=Web3.to_checksum_address(usdt_bep20_contract), abi=abi)
+    # USDT BEP20 Contract on Binance Smart Chain mainnet
+    token_contract = get_contract("BNB", USDT_BEP20_CONTRACT)
 
     # Call balanceOf function
     raw_balance = token_contract.functions.balanceOf(checksum_address).call()
 
     # Convert using correct decimal for USDT (6)
     readable_balance = raw_balance / (10 ** 18)
-    return readable_balance
\ No newline at end of file
+    return readable_balance
+
+
+# Batched balance lookups: one upstream call per chunk of addresses
+
+BLOCKCYPHER_BATCH_SIZE = 50
+BSCSCAN_BATCH_SIZE = 20
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _get_blockcypher_summaries(coin, addresses):
+    """Return the BlockCypher /balance summary (final_balance, n_tx, ...) for every address."""
+    summaries = {}
+    for chunk in _chunks(list(addresses), BLOCKCYPHER_BATCH_SIZE):
+        token = get_api_key("blockcypher")
+        params = {"token": token} if token else None
+        response = http_client.get(f"https://api.blockcypher.com/v1/{coin}/main/addrs/{';'.join(chunk)}/balance", params=params)
+        data = response.json()
+        for item in data if isinstance(data, list) else [data]:
+            if "error" in item:
+                print(f"BlockCypher balance error: {item['error']}")
+                continue
+            summaries[item["address"]] = item
+    return summaries
+
+def get_btc_balances(addresses):
+    return {address: item.get("final_balance", 0) / 1e8 for address, item in _get_blockcypher_summaries("btc", addresses).items()}
+
+def get_dodge_balances(addresses):
+    return {address: item.get("final_balance", 0) / 1e8 for address, item in _get_blockcypher_summaries("doge", addresses).items()}
+
+def get_sol_balances(addresses):
+    return {address: lamports / 1e9 for address, lamports in get_sol_lamports(addresses).items()}
+
+def get_trx_balances(addresses):
+    return {address: account.trx for address, account in get_tron_accounts(addresses).items()}
+
+def get_bnb_balances(addresses):
+    balances = {}
+    for chunk in _chunks(list(addresses), BSCSCAN_BATCH_SIZE):
+        params = {"module": "account", "action": "balancemulti", "address": ",".join(chunk), "tag": "latest", "apikey": get_api_key("bscscan")}
+        response_data = http_client.get("https://api.bscscan.com/api", params=params).json()
+        if response_data.get('status') != '1':
+            print(f"BSCScan API Error: {response_data.get('message', 'Unknown error')}")
+            continue
+        # BscScan may echo addresses back in a different case
+        requested = {address.lower(): address for address in chunk}
+        for item in response_data.get("result", []):
+            balances[requested.get(item["account"].lower(), item["account"])] = int(item.get("balance", 0)) / 1e18
+    return balances
+
+# EVM balances resolved through Multicall3: symbol -> (chain, token contract or None for native, decimals)
+EVM_BALANCE_SOURCES = {
+    Symbols.ETH: ("ETH", None, 18),
+    Symbols.WDODGE: ("ETH", WDODGE_CONTRACT, 8),
+    Symbols.USDT: ("BNB", USDT_BEP20_CONTRACT, 18),
+}
+
+def get_evm_balances_multi(addresses_by_symbol):
+    """
+    Resolve {symbol: [address, ...]} for every Multicall3-backed symbol, grouping the pairs by chain
+    so native and token balances on the same chain share aggregate3 calls.
+    """
+    calls_by_chain = {}
+    for symbol, addresses in addresses_by_symbol.items():
+        chain, token, _ = EVM_BALANCE_SOURCES[symbol]
+        calls_by_chain.setdefault(chain, []).extend(BalanceCall(address, token) for address in addresses)
+
+    raw = {}
+    for chain, calls in calls_by_chain.items():
+        raw.update(get_evm_balances(chain, calls))
+
+    balances = {}
+    for symbol, addresses in addresses_by_symbol.items():
+        _, token, decimals = EVM_BALANCE_SOURCES[symbol]
+        balances[symbol] = {
+            address: raw[BalanceCall(address, token)] / 10**decimals
+            for address in addresses if BalanceCall(address, token) in raw
+        }
+    return balances
+
+def get_eth_balances(addresses):
+    return get_evm_balances_multi({Symbols.ETH: addresses})[Symbols.ETH]
+
+def get_wdodge_balances(addresses):
+    return get_evm_balances_multi({Symbols.WDODGE: addresses})[Symbols.WDODGE]
+
+def get_usdt_balances(addresses):
+    return get_evm_balances_multi({Symbols.USDT: addresses})[Symbols.USDT]
+
+BATCH_BALANCE_HANDLERS = {
+    Symbols.BTC: get_btc_balances,
+    Symbols.DODGE: get_dodge_balances,
+    Symbols.BNB: get_bnb_balances,
+    Symbols.SOL: get_sol_balances,
+    Symbols.TRON: get_trx_balances,
+    Symbols.ETH: get_eth_balances,
+    Symbols.WDODGE: get_wdodge_balances,
+    Symbols.USDT: get_usdt_balances,
+}
+
+SINGLE_BALANCE_HANDLERS = {
+    Symbols.BTC: get_btc_balance_and_history,
+    Symbols.ETH: get_eth_balance_and_history,
+    Symbols.SOL: get_sol_balance_and_history,
+    Symbols.DODGE: get_dodge_balance,
+    Symbols.WDODGE: get_wdodge_balance,
+    Symbols.BNB: get_bnb_balance_and_history,
+    Symbols.TRON: get_tron_balance,
+    Symbols.USDT: get_usdt_balance,
+}
+
+def get_balances_batch(symbol, addresses):
+    """
+    Look up balances for many addresses of one chain, using the chain's batch endpoint when it has one.
+    Addresses that could not be resolved are left out of the returned dict.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    if symbol in BATCH_BALANCE_HANDLERS:
+        return BATCH_BALANCE_HANDLERS[symbol](addresses)
+
+    balances = {}
+    for address in addresses:
+        try:
+            balances[address] = SINGLE_BALANCE_HANDLERS[symbol](address)
+        except Exception as e:
+            print(f"Balance retrieval error for {address}: {e}")
+    return balances
+
+EVM_BALANCE_TASK = "evm"
+
+def balance_lookup_tasks(addresses_by_symbol):
+    """
+    One task per chain lookup for run_with_deadline: Multicall3-backed symbols share a single task
+    so native and token reads on a chain share aggregate3 calls; every other symbol gets its own.
+    """
+    evm_addresses = {symbol: addresses for symbol, addresses in addresses_by_symbol.items() if symbol in EVM_BALANCE_SOURCES}
+    tasks = {symbol: partial(get_balances_batch, symbol, addresses) for symbol, addresses in addresses_by_symbol.items() if symbol not in evm_addresses}
+    if evm_addresses:
+        tasks[EVM_BALANCE_TASK] = partial(get_evm_balances_multi, evm_addresses)
+    return tasks
+
+def unpack_balance_outcomes(outcomes, symbols):
+    """Split the shared EVM outcome from balance_lookup_tasks back into one outcome per symbol."""
+    outcomes = dict(outcomes)
+    evm_outcome = outcomes.pop(EVM_BALANCE_TASK, None)
+    if evm_outcome is not None:
+        for symbol in symbols:
+            if symbol in EVM_BALANCE_SOURCES:
+                outcomes[symbol] = TaskOutcome(ok=True, value=evm_outcome.value[symbol]) if evm_outcome.ok else evm_outcome
+    return outcomes
+
+BLOCKCYPHER_COINS = {
+    Symbols.BTC: "btc",
+    Symbols.DODGE: "doge",
+}
+
+# EVM chain whose nonce tells whether an address of the symbol was ever used (tokens share their host chain's key)
+NONCE_CHAINS = {
+    Symbols.ETH: "ETH",
+    Symbols.WDODGE: "ETH",
+    Symbols.BNB: "BNB",
+    Symbols.USDT: "BNB",
+}
+
+def get_address_activity(symbol, addresses):
+    """
+    Return {address: (balance, used)} for a window of addresses in one batched lookup.
+    BlockCypher chains count past transactions, EVM chains also check the nonce (an emptied address
+    must have sent) and Solana checks for any signature. TRON has no batched history lookup, so
+    there a non-zero balance alone marks an address as used.
+    """
+    if symbol in BLOCKCYPHER_COINS:
+        summaries = _get_blockcypher_summaries(BLOCKCYPHER_COINS[symbol], addresses)
+        return {address: (item.get("final_balance", 0) / 1e8, item.get("n_tx", 0) > 0) for address, item in summaries.items()}
+    balances = get_balances_batch(symbol, addresses)
+    if symbol in NONCE_CHAINS:
+        counts = get_transaction_counts(NONCE_CHAINS[symbol], addresses)
+        return {address: (balance, balance > 0 or counts.get(address, 0) > 0) for address, balance in balances.items()}
+    if symbol == Symbols.SOL:
+        used = get_sol_used(addresses)
+        return {address: (balance, balance > 0 or used.get(address, False)) for address, balance in balances.items()}
+    return {address: (balance, balance > 0) for address, balance in balances.items()}
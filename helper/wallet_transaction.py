@@ -1,109 +1,150 @@
-from typing import List
-import requests
+from functools import partial
+from typing import List, Optional, Tuple
+from helper import http_client, tx_cache
+from helper.api_keys import get_api_key
+from helper.pagination import TransactionPage, decode_cursor, encode_cursor, page_limit
+from helper.single_flight import single_flight
+from helper.solana_rpc import rpc_batch, rpc_call
+from helper.tx_record import TxRecord
+from helper.tron_client import get_transactions_page as get_trongrid_transactions_page
+from helper.web3_registry import USDT_BEP20_CONTRACT
 from django.conf import settings
 
-from home.wallet_schema import TransactionType, TransactionsInfo
-
-def get_btc_transactions(address)->List[TransactionsInfo]:
-  api_url = f"https://api.blockcypher.com/v1/btc/main/addrs/{address}/full"
-  response = requests.get(api_url)
-  data = response.json()
-
-  transactions:List[TransactionsInfo] = []
+from home.wallet_schema import Symbols, TransactionType
+
+BLOCKCYPHER_EXPLORERS = {
+  "btc": "https://www.blockchain.com/btc/tx",
+  "doge": "https://dogechain.info/tx",
+}
+
+def get_blockcypher_full(coin, address, limit=None, before=None):
+  """
+  One page of BlockCypher /addrs/{address}/full: the balance summary plus up to `limit` transactions
+  (BlockCypher caps this at 50), optionally only those confirmed below block height `before`.
+  """
+  params = {"limit": limit or settings.BLOCKCYPHER_TX_LIMIT}
+  if before is not None:
+    params["before"] = before
+  token = get_api_key("blockcypher")
+  if token:
+    params["token"] = token
+  response = http_client.get(f"https://api.blockcypher.com/v1/{coin}/main/addrs/{address}/full", params=params)
+  return response.json()
+
+def parse_blockcypher_transactions(data, address, coin)->List[TxRecord]:
+  transactions:List[TxRecord] = []
   for tx in data.get("txs", []):
-      txHashUrl = f"https://www.blockchain.com/btc/tx/{tx['hash']}"
+      txHashUrl = f"{BLOCKCYPHER_EXPLORERS[coin]}/{tx['hash']}"
       for output in tx.get("outputs", []):
             addresses = output.get("addresses")
             if addresses and address in addresses:  # Ensure addresses is not None
-                val = TransactionsInfo(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=TransactionType.RECEIVED, amount=output["value"] / 1e8, timestamp=tx.get("confirmed", None))
+                val = TxRecord(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=TransactionType.RECEIVED, amount=output["value"] / 1e8, timestamp=tx.get("confirmed") or tx.get("received"))
                 transactions.append(val)
 
       # Check inputs for sent transactions
       for input_tx in tx.get("inputs", []):
           addresses = input_tx.get("addresses")
           if addresses and address in addresses:  # Ensure addresses is not None
-              val = TransactionsInfo(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=TransactionType.SENT, amount=input_tx["output_value"] / 1e8, timestamp=tx.get("confirmed", None))
+              val = TxRecord(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=TransactionType.SENT, amount=input_tx["output_value"] / 1e8, timestamp=tx.get("confirmed") or tx.get("received"))
               transactions.append(val)
 
   return transactions
 
-def get_dodge_transactions(address)->List[TransactionsInfo]:
-  api_url = f"https://api.blockcypher.com/v1/doge/main/addrs/{address}/full"
-  response = requests.get(api_url)
-  data = response.json()
-
-  transactions:List[TransactionsInfo] = []
-  for tx in data.get("txs", []):
-      txHashUrl = f'https://dogechain.info/tx/{tx[hash]}'
-      for output in tx.get("outputs", []):
-            addresses = output.get("addresses")
-            if addresses and address in addresses:  # Ensure addresses is not None
-                val = TransactionsInfo(hash=tx["hash"], hashUrl= txHashUrl, transaction_type=TransactionType.RECEIVED, amount=output["value"] / 1e8, timestamp=tx.get("confirmed", None))
-                transactions.append(val)
-
-      # Check inputs for sent transactions
-      for input_tx in tx.get("inputs", []):
-          addresses = input_tx.get("addresses")
-          if addresses and address in addresses:  # Ensure addresses is not None
-              val = TransactionsInfo(hash=tx["hash"], hashUrl= txHashUrl, transaction_type=TransactionType.SENT, amount=input_tx["output_value"] / 1e8, timestamp=tx.get("confirmed", None))
-              transactions.append(val)
-
+# `before` for the page after one holding only unconfirmed transactions: every confirmed transaction
+BLOCKCYPHER_ALL_CONFIRMED = 2**31 - 1
+BLOCKCYPHER_MAX_LIMIT = 50
+
+def _fills_one_block(data):
+  # Unconfirmed transactions (height -1) count as one block here: they have no `before` of their own either
+  return bool(data.get("hasMore")) and len({tx.get("block_height", -1) for tx in data.get("txs", [])}) == 1
+
+def split_blockcypher_page(data):
+  """
+  The transactions of a /full page to return now and the block height to pass as `before` for the next
+  page (None on the last one). `before` is exclusive and a page may stop part-way through its lowest
+  block, so that block is left out here and requested again, whole, as the start of the next page.
+  """
+  txs = data.get("txs", [])
+  if not data.get("hasMore") or not txs:
+    return txs, None
+  heights = [tx["block_height"] for tx in txs if tx.get("block_height", -1) > 0]
+  if not heights:
+    return txs, BLOCKCYPHER_ALL_CONFIRMED
+  lowest = min(heights)
+  complete = [tx for tx in txs if tx.get("block_height", -1) != lowest]
+  if complete:
+    return complete, lowest + 1
+  # A single block fills the whole page even at BLOCKCYPHER_MAX_LIMIT: the rest of it is out of reach
+  return txs, lowest
+
+@single_flight
+def get_blockcypher_transactions_page(coin, address, limit=None, before=None)->Tuple[List[TxRecord], Optional[int]]:
+  data = get_blockcypher_full(coin, address, limit, before)
+  if _fills_one_block(data) and (limit or settings.BLOCKCYPHER_TX_LIMIT) < BLOCKCYPHER_MAX_LIMIT:
+    # Widen the page so the whole block comes back at once
+    data = get_blockcypher_full(coin, address, BLOCKCYPHER_MAX_LIMIT, before)
+  txs, next_before = split_blockcypher_page(data)
+  return parse_blockcypher_transactions({"txs": txs}, address, coin), next_before
+
+def get_btc_transactions(address)->List[TxRecord]:
+  transactions, _ = get_blockcypher_transactions_page("btc", address)
   return transactions
 
-def get_eth_transactions(address)->List[TransactionsInfo]:
-    tx_url = f"https://api.etherscan.io/api"
-    params = {
-        "module": "account",
-        "action": "txlist",
-        "address": address,
-        "startblock": 0,  # Fetch transactions from the beginning of the blockchain
-        "endblock": 99999999,  # Until the latest block
-        "sort": "desc",  # Sort transactions in descending order (latest first)
-        "apikey": settings.ETH_API_KEY,
-    }
-
-    response = requests.get(tx_url, params=params)
-    data = response.json()
-    transactions:List[TransactionsInfo] = []
+def get_dodge_transactions(address)->List[TxRecord]:
+  transactions, _ = get_blockcypher_transactions_page("doge", address)
+  return transactions
 
-    transactions_data = data["result"][:10]  # Limit the number of transactions
+def get_scan_page(base_url, apikey, params, page, limit, sort="desc"):
+  """
+  One page of an Etherscan-style account listing (newest first by default). Returns the rows and the
+  next page number, or None once a short page shows there is nothing more. The explorers refuse
+  requests past page × offset = 10,000 rows, so whole-history walks page by endblock instead
+  (tx_store.split_scan_page).
+  """
+  params = dict(params, page=page or 1, offset=limit, sort=sort, apikey=apikey)
+  data = http_client.get(base_url, params=params).json()
+  if data.get("status") != "1":
+    # An empty history is reported as status 0 with "No transactions found"
+    if isinstance(data.get("result"), list):
+      return [], None
+    raise Exception(f"Explorer API error: {data.get('message')} {data.get('result')}")
+  rows = data["result"]
+  return rows, (page or 1) + 1 if len(rows) == limit else None
+
+def parse_etherscan_transactions(rows, address)->List[TxRecord]:
+    transactions:List[TxRecord] = []
 
     min_value_in_eth = 0.00001  # Minimum ETH threshold
-    for tx in transactions_data:
+    for tx in rows:
         value_eth = int(tx["value"]) / 1e18
         txHashUrl = f'https://etherscan.io/tx/{tx["hash"]}'
         if value_eth >= min_value_in_eth:
             tx_type = TransactionType.RECEIVED if tx["to"].lower() == address.lower() else TransactionType.SENT
-            val = TransactionsInfo(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=tx_type, amount=value_eth, timestamp=tx["timeStamp"])
+            val = TxRecord(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=tx_type, amount=value_eth, timestamp=tx["timeStamp"])
             transactions.append(val)
 
     return transactions
 
-def parse_transaction(tx, address):
+@single_flight
+def get_eth_transactions_page(address, limit=None, page=None)->Tuple[List[TxRecord], Optional[int]]:
+    rows, next_page = get_scan_page("https://api.etherscan.io/api", get_api_key("etherscan"), {"module": "account", "action": "txlist", "address": address}, page, limit or settings.TRANSACTION_PAGE_LIMIT)
+    return parse_etherscan_transactions(rows, address), next_page
+
+def get_eth_transactions(address)->List[TxRecord]:
+    transactions, _ = get_eth_transactions_page(address)
+    return transactions
+
+def parse_transaction(tx, tx_details, address):
     """Parse individual transaction to determine type, amount, and timestamp."""
     tx_signature = tx["signature"]
-    url = f"https://api.mainnet-beta.solana.com/"
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getTransaction",
-        "params": [tx_signature, {"encoding": "jsonParsed"}]
-    }
-    headers = {"Content-Type": "application/json"}
-    response = requests.post(url, json=payload, headers=headers)
-
-    if response.status_code != 200:
-        print(f"Failed to fetch transaction details for {tx_signature}")
-        return None
-
-    tx_details = response.json().get("result")
     if not tx_details:
         print(f"No details found for transaction {tx_signature}")
         return None
 
-    meta = tx_details.get("meta", {})
+    meta = tx_details.get("meta") or {}
     message = tx_details.get("transaction", {}).get("message", {})
-    account_keys = message.get("accountKeys", [])
+    # jsonParsed account keys are objects carrying the pubkey
+    account_keys = [key.get("pubkey") if isinstance(key, dict) else key for key in message.get("accountKeys", [])]
 
     # Locate the wallet address index
     if address not in account_keys:
@@ -129,50 +170,47 @@ def parse_transaction(tx, address):
     else:
         return None
     txHashUrl = f'https://explorer.solana.com/tx/{tx_signature}'
-    return TransactionsInfo(hash=tx_signature, hashUrl=txHashUrl, transaction_type=transaction_type, amount=amount / 10**9, timestamp=tx.get("blockTime"))
-
-
-def get_sol_transactions(address)->List[TransactionsInfo]:
+    return TxRecord(hash=tx_signature, hashUrl=txHashUrl, transaction_type=transaction_type, amount=amount / 10**9, timestamp=str(tx.get("blockTime")))
+
+@single_flight
+def get_sol_transactions_page(address, limit=None, before=None)->Tuple[List[TxRecord], Optional[str]]:
+    """
+    A page of Solana history: the signatures come from getSignaturesForAddress and the details of those
+    not already in the finalized-transaction cache from one batched getTransaction request.
+    Also returns the `before` signature of the next page.
+    """
+    options = {"limit": limit or settings.SOLANA_TX_LIMIT}
+    if before:
+        options["before"] = before
+    tx_list = rpc_call("getSignaturesForAddress", [address, options])
+    cached = [tx_cache.get("sol", tx["signature"], address) for tx in tx_list]
+    missing = [tx for tx, rows in zip(tx_list, cached) if rows is None]
+    details = rpc_batch([
+        ("getTransaction", [tx["signature"], {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}])
+        for tx in missing
+    ])
+    fetched = iter(details)
+
+    parsed_transactions:List[TxRecord] = []
+    for tx, rows in zip(tx_list, cached):
+        if rows is None:
+            tx_details = next(fetched)
+            parsed_tx = parse_transaction(tx, tx_details, address)
+            rows = [parsed_tx] if parsed_tx else []
+            if tx_details and tx.get("confirmationStatus") == "finalized":
+                tx_cache.put("sol", tx["signature"], address, rows)
+        parsed_transactions.extend(rows)
+
+    next_before = tx_list[-1]["signature"] if len(tx_list) == options["limit"] else None
+    return parsed_transactions, next_before
+
+def get_sol_transactions(address, limit=None, before=None)->List[TxRecord]:
     """Fetch and parse transactions for a given Solana wallet address."""
-    try:
-        url = f"https://api.mainnet-beta.solana.com/"
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getSignaturesForAddress",
-            "params": [address, {"limit": 10}]
-        }
-        headers = {"Content-Type": "application/json"}
-        response = requests.post(url, json=payload, headers=headers)
-
-        if response.status_code != 200:
-            raise Exception("Failed to fetch transactions for address")
-
-        tx_list = response.json().get("result", [])
-        parsed_transactions:List[TransactionsInfo] = []
-
-        for tx in tx_list:
-            parsed_tx = parse_transaction(tx, address)
-            if parsed_tx:
-                parsed_transactions.append(parsed_tx)
-
-        return parsed_transactions
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        raise Exception(str(e))
-
-def get_trx_transactions(address)->List[TransactionsInfo]:
-    base_url = "https://api.trongrid.io"
-    tx_url = f"{base_url}/v1/accounts/{address}/transactions"
-    response = requests.get(tx_url)
-
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch transactions: {response.text}")
-
-    data = response.json().get("data", [])
+    transactions, _ = get_sol_transactions_page(address, limit, before)
+    return transactions
 
-    transactions:List[TransactionsInfo] = []
+def parse_trx_transactions(data, address)->List[TxRecord]:
+    transactions:List[TxRecord] = []
     for tx in data:
         # Safely check for required keys
 
@@ -182,6 +220,7 @@ def get_trx_transactions(address)->List[TransactionsInfo]:
 
         contract = raw_data.get("contract")
 
+        # Requested with visible=true, so addresses are base58 like `address`
         parameter = contract[0].get("parameter", {}).get("value", {})
         to_address = parameter.get("to_address")
         from_address = parameter.get("owner_address")
@@ -189,37 +228,66 @@ def get_trx_transactions(address)->List[TransactionsInfo]:
         txHashUrl = f'https://tronscan.org/#/transaction/{tx.get("txID")}'
 
         if to_address and from_address:
-            tx_type = TransactionType.RECEIVED if address in to_address else TransactionType.SENT
-            val = TransactionsInfo(hash=tx.get("txID"), hashUrl=txHashUrl, transaction_type=tx_type,amount=int(amount)/1e6, timestamp=tx.get("block_timestamp"))
+            tx_type = TransactionType.RECEIVED if to_address == address else TransactionType.SENT
+            val = TxRecord(hash=tx.get("txID"), hashUrl=txHashUrl, transaction_type=tx_type,amount=int(amount)/1e6, timestamp=str(tx.get("block_timestamp")))
             transactions.append(val)
 
     return transactions
 
-def get_bnb_transactions(address)->List[TransactionsInfo]:
-    # BscScan API endpoint for transaction history
-    tx_url = f"https://api.bscscan.com/api?module=account&action=txlist&address={address}&sort=desc&apikey={settings.BNB_API_KEY}"
-    response = requests.get(tx_url)
-    transactions = response.json().get("result", [])
+@single_flight
+def get_trx_transactions_page(address, limit=None, fingerprint=None)->Tuple[List[TxRecord], Optional[str]]:
+    """A page of TRX history plus TronGrid's fingerprint for the next page (None when there is no more)."""
+    data, next_fingerprint = get_trongrid_transactions_page(address, limit, fingerprint)
+    return parse_trx_transactions(data, address), next_fingerprint
 
-    formatted_transactions:List[TransactionsInfo] = []
+def get_trx_transactions(address)->List[TxRecord]:
+    transactions, _ = get_trx_transactions_page(address)
+    return transactions
 
-    for tx in transactions:
+def parse_bscscan_transactions(rows, address)->List[TxRecord]:
+    formatted_transactions:List[TxRecord] = []
+    for tx in rows:
         txHashUrl = f'https://bscscan.com/tx/{tx["hash"]}'
         tx_type = TransactionType.SENT if tx["from"].lower() == address.lower() else TransactionType.RECEIVED
-        val = TransactionsInfo(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=tx_type, amount=int(tx["value"]) / 1e18, timestamp=tx["timeStamp"])
+        val = TxRecord(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=tx_type, amount=int(tx["value"]) / 1e18, timestamp=tx["timeStamp"])
         formatted_transactions.append(val)
+    return formatted_transactions
 
-    return formatted_transactions[:10]
+@single_flight
+def get_bnb_transactions_page(address, limit=None, page=None)->Tuple[List[TxRecord], Optional[int]]:
+    # BscScan API endpoint for transaction history
+    rows, next_page = get_scan_page("https://api.bscscan.com/api", get_api_key("bscscan"), {"module": "account", "action": "txlist", "address": address}, page, limit or settings.TRANSACTION_PAGE_LIMIT)
+    return parse_bscscan_transactions(rows, address), next_page
 
-def get_usdt_transactions(address)->List[TransactionsInfo]:
-    url = f"https://api.bscscan.com/api?module=account&action=tokentx&contractaddress=0x55d398326f99059fF775485246999027B3197955&address={address}&apikey={settings.BNB_API_KEY}"
-    response = requests.get(url)
-    transactions = response.json().get("result", [])
+def get_bnb_transactions(address)->List[TxRecord]:
+    transactions, _ = get_bnb_transactions_page(address)
+    return transactions
 
-    formatted_transactions:List[TransactionsInfo] = []
-    for tx in transactions:
-        txHashUrl = f'https://bscscan.com/tx/{tx["hash"]}'
-        tx_type = TransactionType.SENT if tx["from"].lower() == address.lower() else TransactionType.RECEIVED
-        val = TransactionsInfo(hash=tx["hash"], hashUrl=txHashUrl, transaction_type=tx_type, amount=int(tx["value"]) / 1e18, timestamp=tx["timeStamp"])
-        formatted_transactions.append(val)
-    return formatted_transactions
\ No newline at end of file
+@single_flight
+def get_usdt_transactions_page(address, limit=None, page=None)->Tuple[List[TxRecord], Optional[int]]:
+    params = {"module": "account", "action": "tokentx", "contractaddress": USDT_BEP20_CONTRACT, "address": address}
+    rows, next_page = get_scan_page("https://api.bscscan.com/api", get_api_key("bscscan"), params, page, limit or settings.TRANSACTION_PAGE_LIMIT)
+    return parse_bscscan_transactions(rows, address), next_page
+
+def get_usdt_transactions(address)->List[TxRecord]:
+    transactions, _ = get_usdt_transactions_page(address)
+    return transactions
+
+# Native paging per chain: (symbol) -> page function taking (address, limit, position)
+TRANSACTION_PAGE_HANDLERS = {
+    Symbols.BTC: partial(get_blockcypher_transactions_page, "btc"),
+    Symbols.DODGE: partial(get_blockcypher_transactions_page, "doge"),
+    Symbols.ETH: get_eth_transactions_page,
+    Symbols.BNB: get_bnb_transactions_page,
+    Symbols.USDT: get_usdt_transactions_page,
+    Symbols.SOL: get_sol_transactions_page,
+    Symbols.TRON: get_trx_transactions_page,
+}
+
+def get_transactions_page(symbol, address, limit=None, cursor=None)->TransactionPage:
+    """One page of history for any supported chain; `cursor` is the next_cursor of the previous page."""
+    if symbol not in TRANSACTION_PAGE_HANDLERS:
+        raise ValueError(f"Transaction history is not supported for {symbol}")
+    limit = page_limit(limit)
+    transactions, position = TRANSACTION_PAGE_HANDLERS[symbol](address, limit, decode_cursor(symbol.value, cursor))
+    return TransactionPage(transactions, next_cursor=encode_cursor(symbol.value, position))
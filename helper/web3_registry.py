@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+from web3 import Web3
+from django.conf import settings
+from helper import http_client
+
+# Process-wide Web3 clients, one per RPC endpoint, sharing the pooled HTTP sessions
+
+WEB3_PROVIDER_URLS = {
+    "ETH": f"https://mainnet.infura.io/v3/{settings.INFURA}",
+    "BNB": "https://bsc-dataseed.binance.org/",
+    "MATIC": "https://polygon-rpc.com",
+    "SEPOLIA": f"https://sepolia.infura.io/v3/{settings.INFURA}",
+    "BSC_TEST": "https://data-seed-prebsc-1-s1.binance.org:8545/",
+    "USDT": f"https://mainnet.infura.io/v3/{settings.INFURA}",
+    "USDC": f"https://mainnet.infura.io/v3/{settings.INFURA}",
+    "DAI": f"https://mainnet.infura.io/v3/{settings.INFURA}",
+    "SOL": "https://api.mainnet-beta.solana.com",
+    "DODGE": "https://bsc-dataseed.binance.org/",
+    "AVAX": "https://api.avax.network/ext/bc/C/rpc",
+    "FTM": "https://rpc.ftm.tools",
+    "ARB": "https://arb1.arbitrum.io/rpc",
+    "OP": "https://mainnet.optimism.io",
+    "BTC": f"https://mainnet.infura.io/v3/{settings.INFURA}",
+}
+
+# Token contracts read and written by the helpers
+USDT_BEP20_CONTRACT = "0x55d398326f99059fF775485246999027B3197955"
+WDODGE_CONTRACT = "0x7B4328c127B85369D9f82ca0503B000D09CF9180"
+
+ERC20_ABI = [
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "_to", "type": "address"},
+            {"name": "_value", "type": "uint256"}
+        ],
+        "name": "transfer",
+        "outputs": [{"name": "", "type": "bool"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "type": "function"
+    }
+]
+
+_clients: Dict[str, Web3] = {}
+_contracts: Dict[Tuple[str, str, str], object] = {}
+_health: Dict[str, bool] = {}
+_lock = threading.Lock()
+_health_thread = None
+
+def provider_url(chain_or_url: str) -> str:
+    """Resolve a chain name such as "ETH" to its RPC URL; URLs are returned unchanged."""
+    if "://" in chain_or_url:
+        return chain_or_url
+    return WEB3_PROVIDER_URLS.get(chain_or_url.upper(), WEB3_PROVIDER_URLS["ETH"])
+
+def get_web3(chain_or_url: str) -> Web3:
+    """Return the shared Web3 client for a chain name or RPC URL."""
+    url = provider_url(chain_or_url)
+    client = _clients.get(url)
+    if client is None:
+        with _lock:
+            client = _clients.get(url)
+            if client is None:
+                provider = Web3.HTTPProvider(
+                    url,
+                    session=http_client.get_session(url),
+                    request_kwargs={"timeout": (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)},
+                )
+                client = _clients[url] = Web3(provider)
+        _ensure_health_monitor()
+    return client
+
+def get_contract(chain_or_url: str, address: str, abi: List[Dict] = ERC20_ABI):
+    """Return a cached contract object for `address` and `abi` on the given chain."""
+    url = provider_url(chain_or_url)
+    key = (url, address.lower(), json.dumps(abi, sort_keys=True))
+    contract = _contracts.get(key)
+    if contract is None:
+        contract = get_web3(url).eth.contract(address=Web3.to_checksum_address(address), abi=abi)
+        _contracts[key] = contract
+    return contract
+
+def is_healthy(chain_or_url: str) -> bool:
+    """Last status seen by the background health check; endpoints not yet probed count as healthy."""
+    return _health.get(provider_url(chain_or_url), True)
+
+def _health_loop():
+    while True:
+        for url, client in list(_clients.items()):
+            try:
+                _health[url] = client.is_connected()
+            except Exception:
+                _health[url] = False
+        time.sleep(settings.WEB3_HEALTH_INTERVAL)
+
+def _ensure_health_monitor():
+    global _health_thread
+    if _health_thread is None:
+        with _lock:
+            if _health_thread is None:
+                _health_thread = threading.Thread(target=_health_loop, name="web3-health", daemon=True)
+                _health_thread.start()
+
+def _reset_after_fork():
+    global _lock, _health_thread
+    _clients.clear()
+    _contracts.clear()
+    _health.clear()
+    _lock = threading.Lock()
+    _health_thread = None
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,6 +1,7 @@
 from typing import Dict, Optional
 from typing import Dict, Optional
 import requests
+from helper import http_client
 from decimal import Decimal
 from django.conf import settings
 from home.wallet_schema import HTTPStatusCode
@@ -172,7 +173,7 @@ def process_paybis_transaction(
             'content-type': 'application/json'
         }
         
-        quote_response = requests.post(
+        quote_response = http_client.post(
             'https://widget-api.sandbox.paybis.com/v2/quote',
             headers=headers,
             json=quote_payload
@@ -189,7 +190,7 @@ def process_paybis_transaction(
         quote_data = quote_response.json()
         
         # Create transaction
-        request_response = requests.post(
+        request_response = http_client.post(
             'https://widget-api.sandbox.paybis.com/v2/request',
             headers=headers,
             json={
@@ -2,8 +2,9 @@ from django.urls import path, include
 from ninja import NinjaAPI
 from .views import wallet_system
 from provider.views import provider_system
+from helper.tx_record import RecordJSONRenderer
 # from swap.swap_views import swap_router
-api = NinjaAPI()
+api = NinjaAPI(renderer=RecordJSONRenderer())
 
 api.add_router('wallet/', wallet_system)
 api.add_router('provider/', provider_system)
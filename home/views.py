@@ -1,7 +1,6 @@
 from typing import Dict, List, Optional
 from ninja import Router
 from decimal import Decimal
-from django.conf import settings
 from helper.api_documentation import (
     first_description, second_description, 
     third_description, fourth_description, 
@@ -10,15 +9,20 @@ from helper.api_documentation import (
     eight_description, ninth_description
 )
 from helper.coingeko_api import get_coins_value
+from helper.web3_registry import WEB3_PROVIDER_URLS
 from home.wallet_schema import (
-    PhraseRequest, SendTransactionDTO, Symbols, 
+    PhraseRequest, BatchPhraseRequest, BatchWalletResult, SendTransactionDTO,
+    DiscoveryRequest, ChainDiscoveryResult, Symbols, 
+    PortfolioRequest, PortfolioResponse, ActivityRequest, ActivityEntry,
     TransactionsInfo, WalletInfoResponse, WalletResponseDTO,
     SwapQuoteRequest, SwapExecuteRequest, HTTPStatusCode,
     PaybisTransactionRequest, TransakTransactionRequest, MoonPayTransactionRequest
 )
 from home.wallet_services import (
-    generate_secrete_phrases, import_from_phrases,
-    get_wallet_balance, get_all_transactions_history,
+    generate_secrete_phrases, import_from_phrases, import_from_phrases_batch,
+    discover_from_phrases,
+    get_wallet_balance, get_wallet_portfolio, get_wallet_activity, get_all_transactions_history,
+    export_transactions_history,
     send_crypto_transaction, get_swap_quote, prepare_swap,
     process_swap, get_swap_status, get_swap_quote,
 )
@@ -30,24 +34,6 @@ from home.buy_sell import (
 wallet_system = Router(tags=["Wallet Management"])
 
 
-# Add this constant at the top of your file
-WEB3_PROVIDER_URLS = {
-    "ETH": f"https://mainnet.infura.io/v3/{settings.INFURA}",
-    "BNB": "https://bsc-dataseed.binance.org/",
-    "MATIC": "https://polygon-rpc.com",
-    "SEPOLIA": f"https://sepolia.infura.io/v3/{settings.INFURA}",
-    "BSC_TEST": "https://data-seed-prebsc-1-s1.binance.org:8545/",
-    "USDT": f"https://mainnet.infura.io/v3/{settings.INFURA}",
-    "USDC": f"https://mainnet.infura.io/v3/{settings.INFURA}",
-    "DAI": f"https://mainnet.infura.io/v3/{settings.INFURA}",
-    "SOL": "https://api.mainnet-beta.solana.com",
-    "DODGE": "https://bsc-dataseed.binance.org/",
-    "AVAX": "https://api.avax.network/ext/bc/C/rpc",
-    "FTM": "https://rpc.ftm.tools",
-    "ARB": "https://arb1.arbitrum.io/rpc",
-    "OP": "https://mainnet.optimism.io",
-    "BTC": f"https://mainnet.infura.io/v3/{settings.INFURA}",
-}
 
 @wallet_system.get('/')
 def test_ping(request):
@@ -63,7 +49,21 @@ def generate_wallet_phrase(request):
 @wallet_system.post('generate_wallet/', response=WalletResponseDTO[List[WalletInfoResponse]], 
                    description=second_description, summary="Generate Wallet")
 def generate_wallet(request, req: PhraseRequest):
-    res = import_from_phrases(req.phrase)
+    res = import_from_phrases(req.phrase, req.chains, req.include)
+    return wallet_system.api.create_response(request, res, status=res.status_code)
+
+@wallet_system.post('generate_wallet/batch/', response=WalletResponseDTO[List[BatchWalletResult]],
+                   description="Import many wallet phrases in one job; balances are looked up once per chain",
+                   summary="Batch Generate Wallets")
+def generate_wallet_batch(request, req: BatchPhraseRequest):
+    res = import_from_phrases_batch(req.phrases, req.chains, req.include)
+    return wallet_system.api.create_response(request, res, status=res.status_code)
+
+@wallet_system.post('generate_wallet/discover/', response=WalletResponseDTO[List[ChainDiscoveryResult]],
+                   description="Find every used account and address of a restored wallet using the BIP44 gap limit ; gap_limit and max_accounts are capped server-side. An address counts as used once it has transactions, except on TRON where only a non-zero balance is checked, so emptied TRON addresses are not found",
+                   summary="Discover Wallet Accounts")
+def discover_wallet(request, req: DiscoveryRequest):
+    res = discover_from_phrases(req.phrase, req.chains, req.gap_limit, req.max_accounts)
     return wallet_system.api.create_response(request, res, status=res.status_code)
 
 @wallet_system.get('get_balance/', response=WalletResponseDTO[float], 
@@ -72,12 +72,34 @@ def get_balance(request, symbol: Symbols, address: str):
     res = get_wallet_balance(symbol, address)
     return wallet_system.api.create_response(request, res, status=res.status_code)
 
+@wallet_system.post('get_portfolio/', response=WalletResponseDTO[PortfolioResponse],
+                   description="Balances and USD value for many (symbol, address) pairs; each chain is looked up once, concurrently",
+                   summary="Get Portfolio")
+def get_portfolio_balances(request, req: PortfolioRequest):
+    res = get_wallet_portfolio(req.items)
+    return wallet_system.api.create_response(request, res, status=res.status_code)
+
+@wallet_system.post('get_activity/', response=WalletResponseDTO[List[ActivityEntry]],
+                   description="Transactions of many (symbol, address) pairs merged into one newest-first feed; pass next_cursor back as `cursor` for the next page",
+                   summary="Get Activity Feed")
+def get_activity(request, req: ActivityRequest):
+    val = get_wallet_activity(req.items, req.limit, req.cursor)
+    return wallet_system.api.create_response(request, val, status=val.status_code)
+
 @wallet_system.get('get_transaction/', response=WalletResponseDTO[List[TransactionsInfo]], 
                   description=fourth_description, summary="Get Transactions")
-def get_transactions(request, symbol: Symbols, address: str):
-    val = get_all_transactions_history(symbol, address)
+def get_transactions(request, symbol: Symbols, address: str, limit: Optional[int] = None, cursor: Optional[str] = None):
+    val = get_all_transactions_history(symbol, address, limit, cursor)
     return wallet_system.api.create_response(request, val, status=val.status_code)
 
+@wallet_system.get('get_transaction/export/',
+                  description="Stream the full transaction history as NDJSON (default) or CSV (`fmt=csv`)", summary="Export Transactions")
+def export_transactions(request, symbol: Symbols, address: str, fmt: str = "ndjson"):
+    val = export_transactions_history(symbol, address, fmt)
+    if isinstance(val, WalletResponseDTO):
+        return wallet_system.api.create_response(request, val, status=val.status_code)
+    return val
+
 @wallet_system.post("send_transaction/", response=WalletResponseDTO[str], 
                    description=fifth_description, summary="Send Transactions")
 def send_transactions(request, symbol: Symbols, req: SendTransactionDTO):
@@ -10,6 +10,8 @@ T = TypeVar("T")
 
 class PhraseRequest(Schema):
   phrase: str
+  chains: Optional[List["Symbols"]] = None
+  include: Optional[List["WalletEnrichment"]] = None
 
 class UserRequest(Schema):
   userId: str
@@ -33,6 +35,11 @@ class Symbols(str, Enum):
   USDT = "usdt"
   USD = "usd" 
 
+class WalletEnrichment(str, Enum):
+  BALANCES = "balances"
+  PRICES = "prices"
+  KEYS = "keys"
+
 class HTTPStatusCode(int, Enum):
     OK = 200
     SUCCESS = 200
@@ -49,18 +56,72 @@ class WalletResponseDTO(Schema, Generic[T]):
   status_code:HTTPStatusCode = HTTPStatusCode.OK
   success:bool = True
   message:str
+  cache_age: Optional[float] = None  # seconds since `data` was fetched upstream, when served from cache
+  next_cursor: Optional[str] = None  # pass back as `cursor` for the next page of a paged listing
 
 class WalletInfoResponse(Schema):
   name:str
   address:str
-  private_key: str
-  balance:float
+  private_key: Optional[str] = None
+  balance: Optional[float] = None
   symbols: Symbols
-  price: float
-  changes: float
-  volume: float
+  price: Optional[float] = None
+  changes: Optional[float] = None
+  volume: Optional[float] = None
   idName: str
   icon_url: str
+  balance_available: Optional[bool] = True
+
+class BatchPhraseRequest(Schema):
+  phrases: List[str]
+  chains: Optional[List[Symbols]] = None
+  include: Optional[List[WalletEnrichment]] = None
+
+class BatchWalletResult(Schema):
+  index: int
+  success: bool = True
+  wallets: Optional[List[WalletInfoResponse]] = None
+  error: Optional[str] = None
+
+class DiscoveryRequest(Schema):
+  phrase: str
+  chains: Optional[List[Symbols]] = None
+  gap_limit: Optional[int] = None
+  max_accounts: Optional[int] = None
+
+class DiscoveredAddress(Schema):
+  symbol: Symbols
+  account: int
+  index: int
+  address: str
+  balance: float
+
+class ChainDiscoveryResult(Schema):
+  symbol: Symbols
+  addresses: List[DiscoveredAddress] = []
+  success: bool = True
+  error: Optional[str] = None
+
+class PortfolioItem(Schema):
+  symbol: Symbols
+  address: str
+
+class PortfolioRequest(Schema):
+  items: List[PortfolioItem]
+
+class PortfolioEntry(Schema):
+  symbol: Symbols
+  address: str
+  balance: Optional[float] = None
+  price: Optional[float] = None  # USD per coin from the shared CoinGecko snapshot
+  value: Optional[float] = None  # balance * price
+  success: bool = True
+  error: Optional[str] = None
+
+class PortfolioResponse(Schema):
+  items: List[PortfolioEntry]
+  total_value: float = 0
+  prices_available: bool = True
 
 class TransactionType(str, Enum):
   SENT = "sent"
@@ -73,6 +134,15 @@ class TransactionsInfo(Schema):
   timestamp: str
   hashUrl:str
 
+class ActivityRequest(Schema):
+  items: List[PortfolioItem]
+  limit: Optional[int] = None
+  cursor: Optional[str] = None  # next_cursor of the previous feed page, for the same items
+
+class ActivityEntry(TransactionsInfo):
+  symbol: Symbols
+  address: str
+
 # Swap schemas
 
 class BuySellProvider(str, Enum):
@@ -1,16 +1,26 @@
 from typing import Dict, List, Optional, Callable, Union
-import requests
+from helper import http_client
+from helper.api_keys import get_api_key
+from helper.single_flight import single_flight
 from decimal import Decimal
 from enum import Enum
 import time
 from web3 import Web3
+from helper.web3_registry import get_web3, is_healthy
+from helper.balance_cache import cached_balance, evict_after_send
+from helper.swr_cache import CachedValue
+from helper.pagination import TransactionPage
 from http import HTTPStatus
 from django.conf import settings
 from home.wallet_schema import (
     Symbols, SendTransactionDTO, WalletResponseDTO, HTTPStatusCode,
-    TransactionsInfo, WalletInfoResponse, BuySellProvider
+    TransactionsInfo, WalletInfoResponse, BuySellProvider,
+    PortfolioItem, PortfolioResponse, ActivityEntry
 )
-from helper.generate_wallet import generate_mnemonic, generate_wallets_from_seed
+from helper.generate_wallet import generate_mnemonic, generate_wallets_from_seed, generate_wallets_from_seeds
+from helper.discovery import discover_wallets_from_seed
+from helper.portfolio import get_portfolio
+from helper.activity_feed import get_activity_feed
 import json
 from helper.send_transaction.send_sol import send_sol
 from helper.send_transaction.send_bnb import send_bnb
@@ -25,11 +35,10 @@ from helper.wallet_balance import (
     get_dodge_balance, get_eth_balance_and_history,
     get_sol_balance_and_history, get_tron_balance, get_usdt_balance
 )
-from helper.wallet_transaction import (
-    get_bnb_transactions, get_btc_transactions,
-    get_dodge_transactions, get_eth_transactions,
-    get_sol_transactions, get_trx_transactions, get_usdt_transactions
-)
+from helper.tx_store import get_history_page
+from helper.tx_export import EXPORT_FORMATS, export_rows
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
 
 class FiatCurrency(str, Enum):
     USD = "USD"
@@ -125,6 +134,10 @@ def handle_wallet_response(func: Callable, *args, **kwargs) -> WalletResponseDTO
     """Generic handler for wallet operations."""
     try:
         data = func(*args, **kwargs)
+        if isinstance(data, CachedValue):
+            return WalletResponseDTO(data=data.value, cache_age=round(data.age, 3), message=f"{func.__name__} successful")
+        if isinstance(data, TransactionPage):
+            return WalletResponseDTO(data=list(data), next_cursor=data.next_cursor, message=f"{func.__name__} successful")
         return WalletResponseDTO(data=data, message=f"{func.__name__} successful")
     except Exception as ex:
         return WalletResponseDTO(
@@ -145,7 +158,9 @@ def get_token_config(symbol: Union[Symbols, str]) -> Dict:
 
 # Wallet Core Functions (unchanged)
 generate_secrete_phrases = lambda: handle_wallet_response(generate_mnemonic)
-import_from_phrases = lambda phrase: handle_wallet_response(generate_wallets_from_seed, phrase)
+import_from_phrases = lambda phrase, chains=None, include=None: handle_wallet_response(generate_wallets_from_seed, phrase, chains, include)
+import_from_phrases_batch = lambda phrases, chains=None, include=None: handle_wallet_response(generate_wallets_from_seeds, phrases, chains, include)
+discover_from_phrases = lambda phrase, chains=None, gap_limit=None, max_accounts=None: handle_wallet_response(discover_wallets_from_seed, phrase, chains, gap_limit, max_accounts)
 
 def get_wallet_balance(symbol: Union[Symbols, str], address: str) -> WalletResponseDTO[float]:
     try:
@@ -166,9 +181,17 @@ def get_wallet_balance(symbol: Union[Symbols, str], address: str) -> WalletRespo
         Symbols.TRON: get_tron_balance,
         Symbols.USDT: get_usdt_balance,
     }
-    return handle_wallet_response(handlers.get(symbol), address=address)
+    return handle_wallet_response(cached_balance(symbol, handlers.get(symbol)), address=address)
+
+def get_wallet_portfolio(items: List[PortfolioItem]) -> WalletResponseDTO[PortfolioResponse]:
+    """Balances and USD value for many (symbol, address) pairs in one response."""
+    return handle_wallet_response(get_portfolio, items)
 
-def get_all_transactions_history(symbol: Union[Symbols, str], address: str) -> WalletResponseDTO[List[TransactionsInfo]]:
+def get_wallet_activity(items: List[PortfolioItem], limit: Optional[int] = None, cursor: Optional[str] = None) -> WalletResponseDTO[List[ActivityEntry]]:
+    """One newest-first history across many (symbol, address) pairs, paged with next_cursor."""
+    return handle_wallet_response(get_activity_feed, items, limit, cursor)
+
+def get_all_transactions_history(symbol: Union[Symbols, str], address: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> WalletResponseDTO[List[TransactionsInfo]]:
     try:
         symbol = convert_to_symbol(symbol)
     except ValueError as e:
@@ -178,16 +201,24 @@ def get_all_transactions_history(symbol: Union[Symbols, str], address: str) -> W
             status_code=HTTPStatusCode.BAD_REQUEST
         )
     
-    handlers = {
-        Symbols.BTC: get_btc_transactions,
-        Symbols.ETH: get_eth_transactions,
-        Symbols.SOL: get_sol_transactions,
-        Symbols.DODGE: get_dodge_transactions,
-        Symbols.BNB: get_bnb_transactions,
-        Symbols.TRON: get_trx_transactions,
-        Symbols.USDT: get_usdt_transactions,
-    }
-    return handle_wallet_response(handlers.get(symbol), address)
+    return handle_wallet_response(get_history_page, symbol, address, limit, cursor)
+
+def export_transactions_history(symbol: Union[Symbols, str], address: str, fmt: str = "ndjson") -> Union[StreamingHttpResponse, WalletResponseDTO]:
+    """Stream the full history as NDJSON or CSV; errors before the first page are returned as a WalletResponseDTO."""
+    try:
+        symbol = convert_to_symbol(symbol)
+        rows = export_rows(symbol, address, fmt)
+    except Exception as ex:
+        return WalletResponseDTO(
+            message=str(ex),
+            success=False,
+            status_code=HTTPStatusCode.BAD_REQUEST
+        )
+
+    response = StreamingHttpResponse(rows, content_type=EXPORT_FORMATS[fmt][0])
+    # The address comes from the caller: let Django quote and escape the filename
+    response["Content-Disposition"] = content_disposition_header(True, f"{symbol.value}-{address}.{fmt}")
+    return response
 
 def send_crypto_transaction(symbol: Union[Symbols, str], req: SendTransactionDTO) -> WalletResponseDTO[str]:
     try:
@@ -205,17 +236,20 @@ def send_crypto_transaction(symbol: Union[Symbols, str], req: SendTransactionDTO
         Symbols.SOL: lambda: send_sol(req),
         Symbols.DODGE: lambda: send_doge(req, symbol),
         Symbols.BNB: lambda: send_bnb(req),
-        Symbols.TRON: lambda: send_tron(req),
+        Symbols.TRON: lambda: send_trx(req),
         Symbols.USDT: lambda: send_usdt(req),
     }
-    return handle_wallet_response(handlers.get(symbol))
+    response = handle_wallet_response(handlers.get(symbol))
+    if response.success:
+        evict_after_send(symbol, req.from_address, req.to_address)
+    return response
 
 # Simplified Li.Fi Integration
 def api_request_handler(url: str, method: str = "get", headers: Dict = None, 
                        payload: Dict = None, params: Dict = None) -> Dict:
     """Generic API request handler."""
     try:
-        response = requests.request(method, url, headers=headers, json=payload, params=params)
+        response = http_client.request(method, url, headers=headers, json=payload, params=params)
         if response.status_code == 200:
             return {"success": True, "data": response.json()}
         return {"success": False, "message": f"API error: {response.text}", "status_code": response.status_code}
@@ -248,6 +282,7 @@ def validate_token_amount(amount: Union[str, float, Decimal], symbol: str) -> Di
     except Exception as e:
         return {"valid": False, "message": f"Validation error: {str(e)}"}
 
+@single_flight
 def get_swap_quote(
     from_symbol: str,
     to_symbol: str,
@@ -311,8 +346,9 @@ def get_swap_quote(
         }
         
         # Add API key if configured
-        if hasattr(settings, 'LIFI_API_KEY') and settings.LIFI_API_KEY:
-            headers["x-lifi-api-key"] = settings.LIFI_API_KEY
+        lifi_key = get_api_key("lifi")
+        if lifi_key:
+            headers["x-lifi-api-key"] = lifi_key
         
         # Make the API request with detailed error handling
         result = api_request_handler("https://li.quest/v1/quote", "get", headers=headers, params=params)
@@ -416,11 +452,12 @@ def prepare_swap(
             "Content-Type": "application/json"
         }
         
-        if hasattr(settings, 'LIFI_API_KEY') and settings.LIFI_API_KEY:
-            headers["x-lifi-api-key"] = settings.LIFI_API_KEY
+        lifi_key = get_api_key("lifi")
+        if lifi_key:
+            headers["x-lifi-api-key"] = lifi_key
 
         # Make the API request to get transaction data
-        response = requests.post(
+        response = http_client.post(
             "https://li.quest/v1/advanced/stepTransaction",
             headers=headers,
             json=step_data
@@ -553,11 +590,12 @@ def process_swap(
             "Content-Type": "application/json"
         }
         
-        if hasattr(settings, 'LIFI_API_KEY') and settings.LIFI_API_KEY:
-            headers["x-lifi-api-key"] = settings.LIFI_API_KEY
+        lifi_key = get_api_key("lifi")
+        if lifi_key:
+            headers["x-lifi-api-key"] = lifi_key
 
         # Get transaction data from LiFi
-        response = requests.post(
+        response = http_client.post(
             "https://li.quest/v1/advanced/stepTransaction",
             headers=headers,
             json=step_data
@@ -648,7 +686,6 @@ def _execute_solana_transaction(
 ) -> Dict:
     """Execute Solana transaction using HTTP requests to Solana RPC."""
     try:
-        import requests
         import json
         import base64
         import base58
@@ -660,7 +697,7 @@ def _execute_solana_transaction(
         
         # Validate RPC connection
         try:
-            health_response = requests.post(
+            health_response = http_client.post(
                 rpc_url,
                 json={"id": 1, "jsonrpc": "2.0", "method": "getHealth"},
                 timeout=10
@@ -762,7 +799,7 @@ def _execute_solana_transaction(
                 ]
             }
             
-            response = requests.post(
+            response = http_client.post(
                 rpc_url,
                 json=send_request,
                 timeout=30,
@@ -817,7 +854,7 @@ def _execute_solana_transaction(
                     ]
                 }
                 
-                status_response = requests.post(rpc_url, json=status_request, timeout=10)
+                status_response = http_client.post(rpc_url, json=status_request, timeout=10)
                 status_data = status_response.json()
                 
                 if 'result' in status_data and status_data['result']['value']:
@@ -891,9 +928,9 @@ def _execute_evm_transaction(
                 "quote_data": quote_data
             }
             
-        # Initialize Web3 connection
-        w3 = Web3(Web3.HTTPProvider(web3_provider_url))
-        if not w3.is_connected():
+        # Shared Web3 client for this endpoint; health is tracked in the background
+        w3 = get_web3(web3_provider_url)
+        if not is_healthy(web3_provider_url):
             return {
                 "success": False,
                 "message": "Failed to connect to Web3 provider",
@@ -974,6 +1011,7 @@ def _execute_evm_transaction(
             "quote_data": quote_data
         }
 
+@single_flight
 def get_swap_status(tx_hash: str) -> Dict:
     """Get the status of a swap transaction using LiFi API."""
     try:
@@ -989,8 +1027,9 @@ def get_swap_status(tx_hash: str) -> Dict:
         }
 
         # Add API key if configured
-        if hasattr(settings, 'LIFI_API_KEY') and settings.LIFI_API_KEY:
-            headers["x-lifi-api-key"] = settings.LIFI_API_KEY
+        lifi_key = get_api_key("lifi")
+        if lifi_key:
+            headers["x-lifi-api-key"] = lifi_key
 
         params = {
             "txHash": tx_hash
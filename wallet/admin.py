@@ -1,6 +1,10 @@
 from django.contrib import admin
-from .models import Wallets, Transaction
+from .models import Wallets, Transaction, ChainTransaction, TransactionSyncState, UnspentOutput, UtxoSyncState
 
 # Register your models here.
 admin.site.register(Wallets)
-admin.site.register(Transaction)
\ No newline at end of file
+admin.site.register(Transaction)
+admin.site.register(ChainTransaction)
+admin.site.register(TransactionSyncState)
+admin.site.register(UnspentOutput)
+admin.site.register(UtxoSyncState)
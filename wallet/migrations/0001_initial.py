@@ -0,0 +1,52 @@
+# Generated by Django 5.1.5 on 2026-10-17 01:47
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Wallets',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('address', models.CharField(max_length=255, unique=True)),
+                ('private_key', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('amount', models.DecimalField(decimal_places=10, default=0.0, max_digits=19)),
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='wallets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Wallet',
+                'verbose_name_plural': 'Wallet Addresses',
+            },
+        ),
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('tx_hash', models.CharField(max_length=255)),
+                ('from_address', models.CharField(max_length=42)),
+                ('to_address', models.CharField(max_length=42)),
+                ('amount', models.DecimalField(decimal_places=8, max_digits=18)),
+                ('token', models.CharField(default='ETH', max_length=20)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(default='pending', max_length=10)),
+                ('gas_fee', models.DecimalField(decimal_places=8, default=0, max_digits=18)),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='wallet.wallets')),
+            ],
+            options={
+                'verbose_name': 'Transaction',
+                'verbose_name_plural': 'Transactions',
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.5 on 2026-10-17 01:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain', models.CharField(max_length=10)),
+                ('address', models.CharField(max_length=128)),
+                ('tx_hash', models.CharField(max_length=128)),
+                ('transaction_type', models.CharField(max_length=10)),
+                ('block_number', models.BigIntegerField(blank=True, null=True)),
+                ('timestamp', models.BigIntegerField(default=0)),
+                ('raw_timestamp', models.CharField(blank=True, max_length=64)),
+                ('amount', models.DecimalField(decimal_places=18, max_digits=38)),
+                ('hash_url', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Chain Transaction',
+                'verbose_name_plural': 'Chain Transactions',
+                'indexes': [models.Index(fields=['chain', 'address', '-timestamp', '-id'], name='chain_tx_address_time'), models.Index(fields=['chain', 'address', '-block_number'], name='chain_tx_address_block')],
+                'constraints': [models.UniqueConstraint(fields=('chain', 'address', 'tx_hash', 'transaction_type'), name='unique_chain_address_tx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TransactionSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain', models.CharField(max_length=10)),
+                ('address', models.CharField(max_length=128)),
+                ('last_block', models.BigIntegerField(blank=True, null=True)),
+                ('backfill_cursor', models.CharField(blank=True, max_length=512, null=True)),
+                ('backfill_complete', models.BooleanField(default=False)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Transaction Sync State',
+                'verbose_name_plural': 'Transaction Sync States',
+                'constraints': [models.UniqueConstraint(fields=('chain', 'address'), name='unique_sync_chain_address')],
+            },
+        ),
+    ]
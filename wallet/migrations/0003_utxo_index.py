@@ -0,0 +1,47 @@
+# Generated by Django 5.1.5 on 2026-10-17 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0002_transaction_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnspentOutput',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain', models.CharField(max_length=10)),
+                ('address', models.CharField(max_length=128)),
+                ('tx_hash', models.CharField(max_length=128)),
+                ('output_index', models.IntegerField()),
+                ('value', models.BigIntegerField()),
+                ('block_height', models.BigIntegerField(default=-1)),
+            ],
+            options={
+                'verbose_name': 'Unspent Output',
+                'verbose_name_plural': 'Unspent Outputs',
+                'indexes': [models.Index(fields=['chain', 'address'], name='utxo_chain_address')],
+                'constraints': [models.UniqueConstraint(fields=('chain', 'tx_hash', 'output_index'), name='unique_chain_outpoint')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UtxoSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain', models.CharField(max_length=10)),
+                ('address', models.CharField(max_length=128)),
+                ('last_height', models.BigIntegerField(blank=True, null=True)),
+                ('final_balance', models.BigIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'UTXO Sync State',
+                'verbose_name_plural': 'UTXO Sync States',
+                'constraints': [models.UniqueConstraint(fields=('chain', 'address'), name='unique_utxo_chain_address')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.5 on 2026-10-17 02:04
+
+from django.db import migrations, models
+
+
+def drop_utxo_histories(apps, schema_editor):
+    # BTC/DOGE rows were stored one per transaction type, losing all but one input or output:
+    # drop them with their sync state so the store syncs those histories again from scratch
+    for model in ("ChainTransaction", "TransactionSyncState"):
+        apps.get_model("wallet", model).objects.filter(chain__in=["btc", "doge"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0003_utxo_index'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='chaintransaction',
+            name='unique_chain_address_tx',
+        ),
+        migrations.AddField(
+            model_name='chaintransaction',
+            name='position',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='chaintransaction',
+            constraint=models.UniqueConstraint(fields=('chain', 'address', 'tx_hash', 'transaction_type', 'position'), name='unique_chain_address_tx_row'),
+        ),
+        migrations.RunPython(drop_utxo_histories, migrations.RunPython.noop),
+    ]
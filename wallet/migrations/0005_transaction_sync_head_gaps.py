@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-17 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0004_chain_transaction_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transactionsyncstate',
+            name='head_gaps',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
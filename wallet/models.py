@@ -43,3 +43,95 @@ class Transaction(models.Model):
 
     def get_absolute_url(self):
         return reverse("transaction_detail", kwargs={"pk": self.pk})
+
+
+class ChainTransaction(models.Model):
+    """A transaction as seen from one address, synced from the chain's history API."""
+    chain = models.CharField(max_length=10)  # Symbols value
+    address = models.CharField(max_length=128)
+    tx_hash = models.CharField(max_length=128)
+    transaction_type = models.CharField(max_length=10)  # sent / received
+    position = models.IntegerField(default=0)  # Among the tx's rows of this type: one per BTC/DOGE input or output
+    block_number = models.BigIntegerField(null=True, blank=True)  # Known for Etherscan-style chains
+    timestamp = models.BigIntegerField(default=0)  # Unix seconds, for ordering and range queries
+    raw_timestamp = models.CharField(max_length=64, blank=True)  # As reported upstream
+    amount = models.DecimalField(max_digits=38, decimal_places=18)
+    hash_url = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = _("Chain Transaction")
+        verbose_name_plural = _("Chain Transactions")
+        constraints = [
+            models.UniqueConstraint(fields=["chain", "address", "tx_hash", "transaction_type", "position"], name="unique_chain_address_tx_row"),
+        ]
+        indexes = [
+            models.Index(fields=["chain", "address", "-timestamp", "-id"], name="chain_tx_address_time"),
+            models.Index(fields=["chain", "address", "-block_number"], name="chain_tx_address_block"),
+        ]
+
+    def __str__(self):
+        return f'{self.chain} {self.transaction_type} {self.tx_hash}'
+
+
+class TransactionSyncState(models.Model):
+    """How far the local history of one (chain, address) has been synced in each direction."""
+    chain = models.CharField(max_length=10)
+    address = models.CharField(max_length=128)
+    last_block = models.BigIntegerField(null=True, blank=True)  # Highest block stored (Etherscan-style chains)
+    backfill_cursor = models.CharField(max_length=512, null=True, blank=True)  # Native position of the next older page
+    head_gaps = models.TextField(null=True, blank=True)  # JSON list of native positions where head walks ran out of pages, newest first
+    backfill_complete = models.BooleanField(default=False)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Transaction Sync State")
+        verbose_name_plural = _("Transaction Sync States")
+        constraints = [
+            models.UniqueConstraint(fields=["chain", "address"], name="unique_sync_chain_address"),
+        ]
+
+    def __str__(self):
+        return f'{self.chain} {self.address}'
+
+
+
+class UnspentOutput(models.Model):
+    """An unspent BTC/DOGE output owned by a watched address, synced from BlockCypher."""
+    chain = models.CharField(max_length=10)  # btc / doge
+    address = models.CharField(max_length=128)
+    tx_hash = models.CharField(max_length=128)
+    output_index = models.IntegerField()
+    value = models.BigIntegerField()  # Satoshis
+    block_height = models.BigIntegerField(default=-1)  # -1 while unconfirmed
+
+    class Meta:
+        verbose_name = _("Unspent Output")
+        verbose_name_plural = _("Unspent Outputs")
+        constraints = [
+            models.UniqueConstraint(fields=["chain", "tx_hash", "output_index"], name="unique_chain_outpoint"),
+        ]
+        indexes = [
+            models.Index(fields=["chain", "address"], name="utxo_chain_address"),
+        ]
+
+    def __str__(self):
+        return f'{self.chain} {self.tx_hash}:{self.output_index}'
+
+
+class UtxoSyncState(models.Model):
+    """Block height up to which the UTXO set of one (chain, address) is synced."""
+    chain = models.CharField(max_length=10)
+    address = models.CharField(max_length=128)
+    last_height = models.BigIntegerField(null=True, blank=True)
+    final_balance = models.BigIntegerField(default=0)  # Satoshis, BlockCypher's final_balance at the last sync
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("UTXO Sync State")
+        verbose_name_plural = _("UTXO Sync States")
+        constraints = [
+            models.UniqueConstraint(fields=["chain", "address"], name="unique_utxo_chain_address"),
+        ]
+
+    def __str__(self):
+        return f'{self.chain} {self.address}'